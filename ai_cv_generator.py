@@ -24,10 +24,34 @@ import logging
 import traceback
 import platform
 import subprocess
-from typing import Dict, List, Any, Optional, Tuple, Union, Literal
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple, Union, Literal
 from datetime import datetime
 from pathlib import Path
 
+from cv_schema import load_validated_json, validate_database
+from cv_dedupe import DEFAULT_THRESHOLD as DEFAULT_DEDUPE_THRESHOLD, cluster_representatives
+from cv_ann_index import load_ann_index
+from cv_batch_api import (BATCH_PRICE_FACTOR, DEFAULT_POLL_INTERVAL as DEFAULT_BATCH_POLL_INTERVAL, BatchClient,
+                          BatchPending, BatchRequestError, BatchStore, batch_backend, wait_for_batch)
+from cv_posting_cleaner import DEFAULT_PATTERNS_PATH, BoilerplatePatterns, clean_posting, format_report
+from cv_posting_index import DEFAULT_REUSE_THRESHOLD, PostingIndex, entry_digest, reusable_scores
+from cv_run_checkpoint import DEFAULT_RUNS_DIR, RunCheckpoint
+from cv_api_recorder import RecordingClient, ReplayClient, read_recording
+from cv_model_cascade import (DEFAULT_CHEAP_CLAUDE_MODEL, DEFAULT_CHEAP_OPENAI_MODEL, DEFAULT_ESCALATION_MARGIN,
+                              UsageMeter, cascade_report, escalation_candidates)
+from cv_markup_codec import PLACEHOLDER_INSTRUCTIONS, decode_descriptions, decode_markup, encode_descriptions
+from cv_prompt_view import (VIEW_LEGEND, build_prompt_view, entry_id, estimate_tokens, restore_entries, restore_from_view,
+                            restore_skills, restore_text_blocks, serialize_view, view_entry_ids)
+from cv_relevance_matrix import (DEFAULT_MATRIX_CHUNK_CELLS, MATRIX_SCALE, chunk_columns, coverage, coverage_summary,
+                                 entry_scores, fill_columns, matrix_entry, new_matrix, parse_matrix_rows,
+                                 requirement_rows, save_matrix)
+from cv_html_renderer import write_html
+from cv_text_renderer import TEXT_FORMATS, write_text
+
 # Third-party imports
 
 # Import rich for colorful output
@@ -58,6 +82,22 @@ except ImportError:
 # Load environment variables from .env file
 load_dotenv()
 
+# Entries kept per section when --entries-per-section is not given
+DEFAULT_MAX_ENTRIES_PER_SECTION = {
+    "current_position": 2,
+    "education": 2,
+    "research_positions": 3,
+    "awards_and_honors": 3,
+    "teaching_positions": 2,
+    "academic_articles": 3,
+    "software": 3,
+    "invited_speaker": 2,
+    "mentorship": 2
+}
+
+# Entries scoring below this are never selected
+MIN_RELEVANCE_SCORE = 3
+
 # Configure logging
 def setup_logging(verbose=False):
     """Configure logging based on verbosity level"""
@@ -126,13 +166,8 @@ if not openai_key_present and not claude_key_present:
     print("Continuing without API keys (you'll be prompted later)...")
 
 def load_json_data(json_path: str) -> Dict:
-    """Load and parse the JSON data from the specified file."""
-    try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading JSON file: {e}")
-        sys.exit(1)
+    """Load, parse and schema-validate the JSON data from the specified file."""
+    return load_validated_json(json_path)
 
 def read_job_posting(file_path: str) -> str:
     """Read a job posting from a text file."""
@@ -479,6 +514,14 @@ def run_render_script(template_path: str, output_name: str, html_too: bool = Fal
         print(f"Error running render script: {e}")
         return False
 
+def find_original_summary(cv_data: Dict) -> str:
+    """Return the summary text a tailored summary replaces: the professional_summary block, or the intro block."""
+    for block_id in ("professional_summary", "intro"):
+        block = next((block for block in cv_data.get("text_blocks", []) if block.get("id") == block_id), None)
+        if block and block.get("content"):
+            return block["content"]
+    return ""
+
 def create_job_specific_summary(ai_client: Any, cv_data: Dict, job_analysis: Dict, service: str = "openai", openai_model: str = "gpt-4o", claude_model: str = "claude-3-7-sonnet-20250219", temperature: float = 0.7, verbose: bool = False) -> str:
     """Create a tailored professional summary for the CV/resume based on job posting analysis."""
     # Extract existing text blocks
@@ -700,13 +743,15 @@ def score_entry_relevance(ai_client: Any, entry: Dict, job_analysis: Dict, servi
     Returns:
         Tuple of (score, reasoning, improved_descriptions)
     """
-    # Create a condensed version of the entry
+    # Create a condensed version of the entry, with links and markup replaced by placeholders
+    encoded_descriptions, _ = encode_descriptions(entry.get('descriptions', []))
+    numbered_descriptions = '\n    '.join(f"{number}. {text}" for number, text in enumerate(encoded_descriptions, 1))
     entry_text = f"""
     Title: {entry.get('title', '')}
     Section: {entry.get('section', '')}
     Institution: {entry.get('institution', '')}
     Descriptions:
-    - {' '.join(entry.get('descriptions', []))}
+    {numbered_descriptions}
     Tags: {', '.join(entry.get('tags', []))}
     """
     
@@ -719,18 +764,21 @@ def score_entry_relevance(ai_client: Any, entry: Dict, job_analysis: Dict, servi
     Soft Skills: {', '.join(job_analysis.get('Soft skills emphasized', []))}
     """
     
-    system_prompt = """
+    system_prompt = f"""
     You are an expert career counselor and resume specialist. Score the relevance of this CV/resume entry 
     for the job described. Return a JSON object with:
-    {
+    {{
         "score": <score between 0 and 10, where 10 is extremely relevant>,
         "reasoning": "<brief explanation for the score>",
         "improved_descriptions": [
-            "<suggestion for improved description 1>",
-            "<suggestion for improved description 2>",
+            "<improved version of description 1>",
+            "<improved version of description 2>",
             ...
         ]
-    }
+    }}
+    
+    Give exactly one improved description per numbered description, in the same order.
+    {PLACEHOLDER_INSTRUCTIONS}
     
     Focus on relevance, not just quality. An impressive entry that's irrelevant should score low.
     """
@@ -774,8 +822,9 @@ def score_entry_relevance(ai_client: Any, entry: Dict, job_analysis: Dict, servi
             if verbose:
                 logging.debug(f"OpenAI Response:\n{json.dumps(response_data, indent=2)}")
             
-            # Return the extracted data
-            return float(response_data.get("score", 0)), response_data.get("reasoning", ""), response_data.get("improved_descriptions", [])
+            # Return the extracted data, with the original links and markup restored
+            improved_descriptions = restore_description_markup(ai_client, entry.get('descriptions', []), response_data.get("improved_descriptions", []), service, openai_model, claude_model, temperature, verbose)
+            return float(response_data.get("score", 0)), response_data.get("reasoning", ""), improved_descriptions
             
         elif service == "claude":
             prompt = f"Resume Entry:\n{entry_text}\n\nJob Details:\n{job_text}"
@@ -815,8 +864,9 @@ def score_entry_relevance(ai_client: Any, entry: Dict, job_analysis: Dict, servi
                 if verbose:
                     logging.debug(f"Claude Parsed Response:\n{json.dumps(response_data, indent=2)}")
                 
-                # Return the extracted data
-                return float(response_data.get("score", 0)), response_data.get("reasoning", ""), response_data.get("improved_descriptions", [])
+                # Return the extracted data, with the original links and markup restored
+                improved_descriptions = restore_description_markup(ai_client, entry.get('descriptions', []), response_data.get("improved_descriptions", []), service, openai_model, claude_model, temperature, verbose)
+                return float(response_data.get("score", 0)), response_data.get("reasoning", ""), improved_descriptions
             except json.JSONDecodeError as e:
                 # If we get here, the response wasn't valid JSON
                 print(f"Error parsing Claude response as JSON: {e}")
@@ -831,6 +881,252 @@ def score_entry_relevance(ai_client: Any, entry: Dict, job_analysis: Dict, servi
         print(f"Error scoring entry relevance: {e}")
         return (0, f"Error: {str(e)}", [])
 
+def restore_description_markup(
+    ai_client: Any,
+    originals: List[str],
+    rewritten: List[str],
+    service: str = "openai",
+    openai_model: str = "gpt-4o",
+    claude_model: str = "claude-3-7-sonnet-20250219",
+    temperature: float = 0.0,
+    verbose: bool = False
+) -> List[str]:
+    """
+    Put the links and markup back into rewritten descriptions.
+    
+    The rewrites were made from placeholder-encoded descriptions
+    (cv_markup_codec.py). Descriptions whose placeholders did not survive are
+    requested once more in a single call; any that are still damaged keep
+    their original text.
+    
+    Args:
+        ai_client: AI client (OpenAI or Claude)
+        originals: The descriptions as stored in the database
+        rewritten: The model's rewrites, one per original
+        
+    Returns:
+        Final descriptions (empty if the model did not rewrite any)
+    """
+    if not rewritten or not isinstance(rewritten, list):
+        return []
+    rewritten = [text if isinstance(text, str) else "" for text in rewritten]
+    decoded, damaged = decode_descriptions(originals, rewritten)
+    if damaged:
+        encoded, tables = encode_descriptions(originals)
+        system_prompt = f"""You are an expert resume editor. Each item holds a CV description and a rewrite of it
+    that lost or changed some placeholders. Rewrite each description again for the same purpose.
+    {PLACEHOLDER_INSTRUCTIONS}
+    
+    Respond with a JSON object of the form {{"descriptions": ["<rewritten description>", ...]}}, one per item, in the same order.
+    """
+        items = [{"description": encoded[position],
+                  "rewrite": rewritten[position] if position < len(rewritten) else ""} for position in damaged]
+        user_prompt = json.dumps(items, ensure_ascii=False)
+        try:
+            response = request_json_response(
+                ai_client, system_prompt, user_prompt, service,
+                openai_model=openai_model, claude_model=claude_model,
+                temperature=temperature, verbose=verbose,
+                prompt_type="Description Placeholder Repair", max_tokens=2000
+            )
+            retried = response.get("descriptions", []) if isinstance(response, dict) else []
+        except Exception as e:
+            print(f"  - Error repairing descriptions: {e}")
+            retried = []
+        still_damaged = 0
+        for position, text in zip(damaged, retried + [None] * len(damaged)):
+            if isinstance(text, str):
+                decoded[position] = decode_markup(text, tables[position])[0]
+            if decoded[position] is None:
+                still_damaged += 1
+        print(f"  - Repaired markup in {len(damaged) - still_damaged} of {len(damaged)} rewritten descriptions"
+              + (f"; {still_damaged} keep their original text" if still_damaged else ""))
+    return [text if text is not None else original for text, original in zip(decoded, originals)]
+
+def score_entries_locally(cv_data: Dict, cv_data_path: str, job_analysis: Dict, max_entries_per_section: Dict[str, int]) -> List[Tuple[float, str, List[str]]]:
+    """
+    Score entries against the job analysis with the local embedding cache.
+    
+    This replaces one API call per entry with nearest-neighbor queries: for
+    each section, the entries and bullets closest to the job requirements are
+    retrieved with top_k, and an entry's similarity is the mean of its
+    whole-entry similarity and its best bullet's. Entries that are not among
+    the nearest neighbors of their section score 0. Similarities are rescaled
+    so the best entry scores 10, matching the 0-10 scale of score_entry_relevance.
+    
+    Args:
+        cv_data: The CV/resume JSON data
+        cv_data_path: Path of the database file (the cache is stored next to it)
+        job_analysis: Analysis of the job posting
+        max_entries_per_section: Entries kept per section (sets how many neighbors are retrieved)
+        
+    Returns:
+        List of (score, reasoning, improved_descriptions) tuples in entry order
+    """
+    index = load_ann_index(cv_data, cv_data_path)
+    if index is None:
+        print("Local scoring requires numpy. Install with:")
+        print("pip install numpy")
+        sys.exit(1)
+    
+    query = " ".join(item for items in job_analysis.values() if isinstance(items, list) for item in items if isinstance(item, str))
+    entries = cv_data.get("entries", [])
+    whole = [0.0] * len(entries)
+    best_bullet = [0.0] * len(entries)
+    
+    for section in dict.fromkeys(entry.get("section", "") for entry in entries):
+        # Retrieve enough neighbors to fill the section several times over, with their bullets
+        k = 20 * max(max_entries_per_section.get(section, 2), 1)
+        for item, similarity in index.top_k(query, k, section=section):
+            if item["kind"] == "entry":
+                whole[item["entry"]] = max(whole[item["entry"]], similarity)
+            else:
+                best_bullet[item["entry"]] = max(best_bullet[item["entry"]], similarity)
+    
+    similarities = [(w + b) / 2 for w, b in zip(whole, best_bullet)]
+    best = max(similarities, default=0.0)
+    results = []
+    for similarity in similarities:
+        score = round(10.0 * similarity / best, 1) if best > 0 else 0.0
+        results.append((score, f"Local similarity {similarity:.3f} to the job requirements", []))
+    return results
+
+def score_entries_with_matrix(
+    ai_client: Any,
+    cv_data: Dict,
+    job_analysis: Dict,
+    entry_indexes: List[int],
+    service: str = "openai",
+    openai_model: str = "gpt-4o",
+    claude_model: str = "claude-3-7-sonnet-20250219",
+    verbose: bool = False,
+    weights: Optional[Dict[str, float]] = None,
+    chunk_cells: int = DEFAULT_MATRIX_CHUNK_CELLS,
+    max_workers: int = 4
+) -> Tuple[Dict[int, Tuple[float, str, List[str]]], Dict]:
+    """
+    Score entries from a requirement-by-entry relevance matrix (cv_relevance_matrix.py).
+    
+    The model rates every requirement of the job analysis against a chunk of
+    entries per request; the requests run concurrently. Entry scores are
+    computed locally from the ratings with the category weights.
+    
+    Args:
+        ai_client: AI client (OpenAI or Claude)
+        cv_data: The CV/resume JSON data
+        job_analysis: Analysis of the job posting
+        entry_indexes: Database positions of the entries to rate (one per near-duplicate cluster)
+        weights: Requirement category weights overriding the defaults
+        chunk_cells: Matrix cells (requirements x entries) per request
+        max_workers: Number of requests sent concurrently
+        
+    Returns:
+        Tuple of (database position -> (score, reasoning, []), the matrix)
+    """
+    requirements = requirement_rows(job_analysis)
+    matrix = new_matrix(requirements, cv_data, entry_indexes)
+    chunks = chunk_columns(entry_indexes, len(requirements), chunk_cells)
+    entries = cv_data.get("entries", [])
+    
+    system_prompt = f"""You are an expert career counselor and resume specialist. Rate how well each CV/resume entry shows each job requirement:
+    0 = not at all, 1 = weakly, 2 = partly, {MATRIX_SCALE} = strongly.
+    You receive the requirements (ID -> requirement) and the entries (id=entry ID, t=title, i=institution, d=descriptions).
+    
+    Respond with a JSON object of the form {{"rows": {{"<requirement ID>": [<rating>, ...], ...}}}} with one row per
+    requirement and, in each row, one rating per entry in the order the entries are given.
+    """
+    
+    def rate_chunk(chunk: List[int]) -> Tuple[List[str], Dict[str, List[int]], int]:
+        column_ids = [entry_id(index) for index in chunk]
+        payload = {"requirements": {r["id"]: r["text"] for r in requirements},
+                   "entries": [matrix_entry(index, entries[index]) for index in chunk]}
+        user_prompt = f"""```json
+    {serialize_view(payload)}
+    ```
+    
+    Rate all {len(requirements)} requirements against these {len(chunk)} entries ({', '.join(column_ids)})."""
+        response = request_json_response(
+            ai_client, system_prompt, user_prompt, service,
+            openai_model=openai_model, claude_model=claude_model,
+            temperature=0.0, verbose=verbose,
+            prompt_type="Relevance Matrix"
+        )
+        rows, invalid = parse_matrix_rows(response, requirements, column_ids)
+        return column_ids, rows, invalid
+    
+    print(f"Rating {len(requirements)} requirements x {len(entry_indexes)} entries in {len(chunks)} requests "
+          f"with up to {max_workers} concurrent requests...")
+    invalid_rows = 0
+    failed_chunks = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in as_completed([executor.submit(rate_chunk, chunk) for chunk in chunks]):
+            try:
+                column_ids, rows, invalid = future.result()
+            except Exception as e:
+                # The entries of a failed chunk keep ratings of 0
+                print(f"  - Error rating a chunk of entries: {e}")
+                failed_chunks += 1
+                continue
+            fill_columns(matrix, column_ids, rows)
+            invalid_rows += invalid
+    if failed_chunks or invalid_rows:
+        print(f"  - {failed_chunks} failed requests and {invalid_rows} malformed rows were rated 0")
+    
+    matrix["weights"] = weights or {}
+    scores = entry_scores(matrix, weights)
+    return {index: scores[entry_id(index)] + ([],) for index in entry_indexes}, matrix
+
+def select_top_entries(
+    scored: Iterable[Tuple[int, str, int, float]],
+    max_entries_per_section: Dict[str, int],
+    min_score: float = MIN_RELEVANCE_SCORE,
+    released: Optional[Callable[[int], None]] = None
+) -> List[int]:
+    """
+    Select the best entries of each section from a stream of scored entries.
+    
+    Each section keeps a bounded min-heap of its quota of entries, so memory
+    and time grow with the section quotas instead of the database size.
+    Entries below min_score never enter a heap. Variants of a near-duplicate
+    cluster share their representative's score, so a variant whose cluster is
+    already in the heap is no better than the one kept (and an evicted variant
+    means every later one would be evicted too).
+    
+    Args:
+        scored: (database position, section, cluster representative, score) of each entry, in database order
+        max_entries_per_section: Entries kept per section (2 for sections not listed)
+        min_score: Minimum relevance score of a selected entry
+        released: Called with a cluster whenever none of its entries so far is
+            kept in any heap (after a rejection or an eviction)
+        
+    Returns:
+        Database positions of the selected entries: sections in order of first
+        appearance, entries by score (highest first), ties in database order
+    """
+    heaps = {}
+    # Heap slots held by each cluster (variants can be kept in several sections)
+    held = {}
+    for position, section, cluster, score in scored:
+        heap = heaps.setdefault(section, [])
+        quota = max_entries_per_section.get(section, 2)
+        dropped = cluster
+        if score >= min_score and quota > 0 and not any(kept_cluster == cluster for _, _, kept_cluster in heap):
+            # The heap's smallest item is the weakest kept entry: lowest score, then latest position
+            item = ((score, -position), position, cluster)
+            if len(heap) < quota:
+                heapq.heappush(heap, item)
+                dropped = None
+            elif item > heap[0]:
+                dropped = heapq.heapreplace(heap, item)[2]
+                held[dropped] -= 1
+            if dropped != cluster:
+                held[cluster] = held.get(cluster, 0) + 1
+        if dropped is not None and not held.get(dropped):
+            held.pop(dropped, None)
+            if released:
+                released(dropped)
+    return [position for heap in heaps.values() for _, position, _ in sorted(heap, reverse=True)]
+
 def create_tailored_json(
     cv_data: Dict, 
     job_analysis: Dict, 
@@ -842,12 +1138,27 @@ def create_tailored_json(
     openai_model: str = "gpt-4o",
     claude_model: str = "claude-3-7-sonnet-20250219",
     temperature: float = 0.0,
-    verbose: bool = False
+    verbose: bool = False,
+    dedupe_threshold: Optional[float] = DEFAULT_DEDUPE_THRESHOLD,
+    local_scoring: bool = False,
+    cv_data_path: str = "cv_database.json",
+    score_cache: Optional[Dict[str, Dict]] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+    cascade_model: Optional[str] = None,
+    escalation_margin: float = DEFAULT_ESCALATION_MARGIN,
+    matrix_scoring: bool = False,
+    matrix_weights: Optional[Dict[str, float]] = None,
+    matrix_chunk_cells: int = DEFAULT_MATRIX_CHUNK_CELLS,
+    max_workers: int = 4
 ) -> None:
     """
     Create a tailored version of the CV/resume JSON file with entries
     scored and filtered based on relevance to the job posting.
     
+    Near-duplicate entries (e.g. company-specific variants of the same
+    position) are scored once per cluster, and only the best variant of a
+    cluster is kept in each section.
+    
     Args:
         cv_data: The original CV/resume JSON data
         job_analysis: Analysis of the job posting
@@ -855,6 +1166,24 @@ def create_tailored_json(
         output_path: Path to save the tailored JSON
         max_entries_per_section: Dictionary mapping sections to max number of entries to include
         improve_descriptions: Whether to improve descriptions with AI suggestions
+        dedupe_threshold: Similarity for grouping near-duplicate entries (None to score every entry)
+        local_scoring: Score entries with the local embedding cache instead of one API call per entry
+        cv_data_path: Path of the database file, used to locate the embedding cache
+        score_cache: Scores from an earlier run keyed by entry digest, as
+            {"result": [score, reasoning, improved_descriptions], "model": ...};
+            reused for unchanged entries and updated with the new scores
+        checkpoint: Run checkpoint; every entry scored by the AI service is saved
+            to it, and entries it already holds are not scored again
+        cascade_model: Cheap model that scores every entry first; only entries
+            near a selection boundary are scored again with the strong model
+            (cv_model_cascade.py)
+        escalation_margin: Score distance from a boundary that triggers escalation
+        matrix_scoring: Score entries from a requirement-by-entry relevance
+            matrix requested in chunks instead of one API call per entry; the
+            matrix is saved next to the output as <name>_matrix.json
+        matrix_weights: Requirement category weights for matrix scoring
+        matrix_chunk_cells: Matrix cells per request for matrix scoring
+        max_workers: Number of concurrent requests for matrix scoring
     """
     # Create a deep copy of the CV data
     tailored_data = {
@@ -874,61 +1203,167 @@ def create_tailored_json(
     
     # Default max entries per section if not provided
     if max_entries_per_section is None:
-        max_entries_per_section = {
-            "current_position": 2,
-            "education": 2,
-            "research_positions": 3,
-            "awards_and_honors": 3,
-            "teaching_positions": 2,
-            "academic_articles": 3,
-            "software": 3,
-            "invited_speaker": 2,
-            "mentorship": 2
-        }
+        max_entries_per_section = DEFAULT_MAX_ENTRIES_PER_SECTION
     
-    # Process and score each entry
-    scored_entries = []
-    print("\nScoring CV/resume entries for relevance...")
-    for idx, entry in enumerate(cv_data.get("entries", [])):
-        print(f"Processing entry {idx+1}/{len(cv_data.get('entries', []))}: {entry.get('title', '')}")
-        score, reasoning, improved_descriptions = score_entry_relevance(ai_client, entry, job_analysis, service, openai_model, claude_model, verbose)
-        
-        # Create a copy of the entry with score information
-        scored_entry = entry.copy()
-        scored_entry["relevance_score"] = score
-        scored_entry["relevance_reasoning"] = reasoning
-        
-        # Update descriptions if improvement is enabled and suggestions are available
-        if improve_descriptions and improved_descriptions:
-            print(f"  - Improving descriptions for: {entry.get('title', '')}")
-            scored_entry["original_descriptions"] = entry.get("descriptions", []).copy()
-            scored_entry["descriptions"] = improved_descriptions
-        
-        scored_entries.append(scored_entry)
-        print(f"  - Score: {score}/10 - {reasoning[:50]}...")
-    
-    # Group entries by section
-    section_entries = {}
-    for entry in scored_entries:
-        section = entry.get("section", "other")
-        if section not in section_entries:
-            section_entries[section] = []
-        section_entries[section].append(entry)
-    
-    # Sort entries by relevance score and select top entries for each section
+    # Group near-duplicate entries so each cluster is scored only once
+    all_entries = cv_data.get("entries", [])
+    if dedupe_threshold is not None:
+        representatives = cluster_representatives(all_entries, dedupe_threshold)
+    else:
+        representatives = list(range(len(all_entries)))
+    # Full results only of clusters that are kept in a section heap or still have
+    # entries to come; every other cluster keeps just its score
+    cluster_results = {}
+    cluster_scores = {}
+    remaining = Counter(representatives)
+    reused_scores = 0
+    local_results = score_entries_locally(cv_data, cv_data_path, job_analysis, max_entries_per_section) if local_scoring else None
+    matrix = None
+    if matrix_scoring and not local_scoring:
+        local_results, matrix = score_entries_with_matrix(
+            ai_client, cv_data, job_analysis, sorted(set(representatives)), service, openai_model, claude_model,
+            verbose, matrix_weights, matrix_chunk_cells, max_workers
+        )
+    if local_results is not None:
+        # The cascade only applies to entries scored one by one
+        cascade_model = None
+    checkpointed = checkpoint.entry_records() if checkpoint else {}
+    resumed_scores = 0
+    
+    # In a model cascade, the first pass uses the cheap model and usage is metered per model
+    strong_model = openai_model if service == "openai" else claude_model
+    scoring_openai_model, scoring_claude_model = openai_model, claude_model
+    if cascade_model:
+        ai_client = UsageMeter(ai_client)
+        if service == "openai":
+            scoring_openai_model = cascade_model
+        else:
+            scoring_claude_model = cascade_model
+    api_scored = set()
+    # Clusters with a cheap score saved before a resumed run stopped or reused from an
+    # earlier posting (whose selection boundaries may differ); they can still be escalated
+    restored_cheap = set()
+    # Clusters whose scoring request waits for a provider batch (--batch-api)
+    pending = set()
+    scoring_started = time.monotonic()
+    
+    def score_entries():
+        """Score each entry in database order and yield (position, cluster) as soon as its score is known."""
+        nonlocal reused_scores, resumed_scores
+        print("\nScoring CV/resume entries for relevance...")
+        for idx, entry in enumerate(all_entries):
+            print(f"Processing entry {idx+1}/{len(all_entries)}: {entry.get('title', '')}")
+            representative = representatives[idx]
+            if representative in pending:
+                continue
+            if representative in cluster_scores:
+                print(f"  - Near-duplicate of entry {representative + 1}, reusing its score")
+            elif local_results is not None:
+                cluster_results[representative] = local_results[idx]
+            elif entry_digest(entry) in checkpointed:
+                print("  - Already scored before the run was resumed")
+                record = checkpointed[entry_digest(entry)]
+                cluster_results[representative] = tuple(record['result'])
+                if cascade_model and record.get('model') == cascade_model:
+                    restored_cheap.add(representative)
+                resumed_scores += 1
+            elif score_cache is not None and entry_digest(entry) in score_cache:
+                print("  - Reusing score from a similar earlier posting")
+                cached = score_cache[entry_digest(entry)]
+                cluster_results[representative] = tuple(cached['result'])
+                if cascade_model and cached.get('model') == cascade_model:
+                    restored_cheap.add(representative)
+                reused_scores += 1
+            else:
+                try:
+                    result = score_entry_relevance(ai_client, entry, job_analysis, service, scoring_openai_model, scoring_claude_model, verbose)
+                except BatchPending:
+                    # Collect the requests of all entries for the same batch instead of stopping at the first
+                    print("  - Waiting for a provider batch")
+                    pending.add(representative)
+                    continue
+                cluster_results[representative] = result
+                api_scored.add(representative)
+                # A failed call is neither checkpointed nor cached, so a later run scores the entry again
+                if not result[1].startswith("Error:"):
+                    if checkpoint is not None:
+                        checkpoint.save_entry(entry_digest(entry), list(result), cascade_model or strong_model)
+                    if score_cache is not None:
+                        score_cache[entry_digest(entry)] = {'result': list(result), 'model': cascade_model or strong_model}
+            score, reasoning, improved_descriptions = cluster_results[representative]
+            cluster_scores[representative] = score
+            if improve_descriptions and improved_descriptions:
+                print(f"  - Improving descriptions for: {entry.get('title', '')}")
+            print(f"  - Score: {score}/10 - {reasoning[:50]}...")
+            remaining[representative] -= 1
+            yield idx, representative
+        if pending:
+            raise BatchPending(f"{len(pending)} entries wait for a provider batch")
+    
+    scored = score_entries()
+    
+    # Score the entries whose selection is in doubt again with the strong model
+    if cascade_model:
+        # The cascade needs every cheap score to find the boundaries, so the stream is consumed first
+        scored = list(scored)
+        cheap_seconds = time.monotonic() - scoring_started
+        escalation_started = time.monotonic()
+        ranked = ({"section": all_entries[idx].get("section", "other"), "_cluster": representative,
+                   "relevance_score": cluster_scores[representative]} for idx, representative in scored)
+        escalate = sorted(escalation_candidates(ranked, max_entries_per_section, escalation_margin, MIN_RELEVANCE_SCORE) & (api_scored | restored_cheap))
+        if escalate:
+            print(f"\nEscalating {len(escalate)} entries near a selection boundary to {strong_model}...")
+        for representative in escalate:
+            entry = all_entries[representative]
+            cheap_score, _, cheap_descriptions = cluster_results[representative]
+            try:
+                score, reasoning, improved_descriptions = score_entry_relevance(ai_client, entry, job_analysis, service, openai_model, claude_model, verbose)
+            except BatchPending:
+                pending.add(representative)
+                continue
+            if reasoning.startswith("Error:"):
+                print(f"  - {entry.get('title', '')}: keeping the {cascade_model} score {cheap_score}/10")
+                continue
+            print(f"  - {entry.get('title', '')}: {cheap_score}/10 -> {score}/10")
+            # Descriptions improved by the cheap model are kept if the strong model suggests none
+            cluster_results[representative] = (score, reasoning, improved_descriptions or cheap_descriptions)
+            cluster_scores[representative] = score
+            if checkpoint is not None:
+                checkpoint.save_entry(entry_digest(entry), [score, reasoning, improved_descriptions], strong_model)
+            if score_cache is not None:
+                score_cache[entry_digest(entry)] = {'result': [score, reasoning, improved_descriptions], 'model': strong_model}
+        if pending:
+            raise BatchPending(f"{len(pending)} escalated entries wait for a provider batch")
+        cascade_lines = cascade_report(ai_client, cascade_model, strong_model, len(api_scored), len(escalate),
+                                       cheap_seconds, time.monotonic() - escalation_started)
+    
+    def release(representative: int) -> None:
+        # A cluster with no kept entry and no entry to come is never selected: drop its reasoning and descriptions
+        if not remaining[representative]:
+            cluster_results.pop(representative, None)
+    
+    # Keep the top entries of each section as scores arrive; only the survivors are copied
+    selected = select_top_entries(
+        ((idx, all_entries[idx].get("section", "other"), representative, cluster_scores[representative])
+         for idx, representative in scored),
+        max_entries_per_section,
+        released=release
+    )
     tailored_entries = []
-    for section, entries in section_entries.items():
-        # Sort by relevance score (highest first)
-        entries.sort(key=lambda e: e.get("relevance_score", 0), reverse=True)
-        
-        # Get the maximum number of entries for this section
-        max_entries = max_entries_per_section.get(section, 2)
-        
-        # Take top entries but ensure we don't take very low-scoring entries
-        selected_entries = [e for e in entries[:max_entries] if e.get("relevance_score", 0) >= 3]
+    for idx in selected:
+        entry = all_entries[idx]
+        score, reasoning, improved_descriptions = cluster_results[representatives[idx]]
+        tailored_entry = entry.copy()
+        tailored_entry["relevance_score"] = score
+        tailored_entry["relevance_reasoning"] = reasoning
         
-        # Add to our tailored entries list
-        tailored_entries.extend(selected_entries)
+        # Update descriptions if improvement is enabled and suggestions are available;
+        # the suggestions were written for the cluster's representative, so other
+        # variants share its score and reasoning but keep their own descriptions
+        if improve_descriptions and improved_descriptions and idx == representatives[idx]:
+            tailored_entry["original_descriptions"] = entry.get("descriptions", []).copy()
+            tailored_entry["descriptions"] = list(improved_descriptions)
+        tailored_entries.append(tailored_entry)
     
     # Add the tailored entries to our output data
     tailored_data["entries"] = tailored_entries
@@ -938,7 +1373,221 @@ def create_tailored_json(
         json.dump(tailored_data, f, indent=2)
     
     print(f"\nTailored JSON file created: {output_path}")
-    print(f"Selected {len(tailored_entries)} entries out of {len(cv_data.get('entries', []))} original entries")
+    print(f"Selected {len(tailored_entries)} entries out of {len(all_entries)} original entries")
+    if reused_scores:
+        print(f"Reused {reused_scores} entry scores from a similar earlier posting")
+    if resumed_scores:
+        print(f"Resumed {resumed_scores} entry scores saved before the run stopped")
+    if local_scoring:
+        print("Scored all entries locally with the embedding cache (no per-entry API calls)")
+    elif matrix is not None:
+        matrix_path = os.path.splitext(output_path)[0] + "_matrix.json"
+        save_matrix(matrix, matrix_path)
+        print(f"Scored {len(matrix['entries'])} entries from a relevance matrix of {len(matrix['requirements'])} requirements (saved to {matrix_path})")
+        for line in coverage_summary(coverage(matrix, [entry_id(representatives[idx]) for idx in selected])):
+            print(line)
+    elif len(cluster_scores) < len(all_entries):
+        print(f"Scored {len(cluster_scores)} entry clusters instead of {len(all_entries)} entries ({len(all_entries) - len(cluster_scores)} API calls saved)")
+    if cascade_model:
+        for line in cascade_lines:
+            print(line)
+
+def request_json_response(
+    ai_client: Any,
+    system_prompt: str,
+    user_prompt: str,
+    service: str = "openai",
+    openai_model: str = "gpt-4o",
+    claude_model: str = "claude-3-7-sonnet-20250219",
+    temperature: float = 0.7,
+    verbose: bool = False,
+    prompt_type: str = "CV Tailoring (Prompt-Only)",
+    max_tokens: int = 4000
+) -> Any:
+    """
+    Send a prompt that must be answered with JSON and parse the response.
+    
+    Claude responses are cleaned up (code blocks, trailing commas, single
+    quotes) before parsing; unparseable responses raise json.JSONDecodeError.
+    
+    Args:
+        ai_client: AI client (OpenAI or Claude)
+        system_prompt: System prompt
+        user_prompt: User prompt
+        prompt_type: Label used in the logs
+        max_tokens: Maximum response length for Claude
+        
+    Returns:
+        The parsed JSON response
+    """
+    if service == "openai":
+        logging.info(f"{prompt_type} with OpenAI using {openai_model}")
+        response = ai_client.chat.completions.create(
+            model=openai_model,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+        response_json = response.choices[0].message.content
+
+        # Log the complete API interaction
+        log_api_interaction(
+            service="openai", 
+            model=openai_model, 
+            prompt_type=prompt_type, 
+            system_prompt=system_prompt,
+            user_prompt=user_prompt, 
+            response_text=response_json
+        )
+
+        if verbose:
+            logging.debug(f"OpenAI response (first 500 chars):\n{response_json[:500]}...")
+
+    elif service == "claude":
+        logging.info(f"{prompt_type} with Claude using {claude_model}")
+        response = ai_client.messages.create(
+            model=claude_model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt + "\nYour entire response must be valid JSON only. Do not include markdown code blocks or explanations. Respond with just the raw JSON object.",
+            messages=[
+                {"role": "user", "content": user_prompt + "\n\nYou MUST respond with valid JSON only. Your entire response must be valid JSON with no other text."}
+            ]
+        )
+        # Get the raw response text
+        raw_response = response.content[0].text
+
+        # Log the complete API interaction
+        log_api_interaction(
+            service="claude", 
+            model=claude_model, 
+            prompt_type=prompt_type, 
+            system_prompt=system_prompt + "\nYour entire response must be valid JSON only. Do not include markdown code blocks or explanations. Respond with just the raw JSON object.",
+            user_prompt=user_prompt + "\n\nYou MUST respond with valid JSON only. Your entire response must be valid JSON with no other text.", 
+            response_text=raw_response
+        )
+
+        if verbose:
+            logging.debug(f"Claude Raw Response (first 500 chars):\n{raw_response[:500]}...")
+
+        # Add more comprehensive JSON extraction and validation
+        import re
+        cleaned_response = raw_response
+
+        # First check for code blocks and extract content if present
+        if "```json" in cleaned_response or "```" in cleaned_response:
+            # Extract content from code blocks 
+            json_blocks = re.findall(r'```(?:json)?\n(.+?)\n```', cleaned_response, re.DOTALL)
+            if json_blocks:
+                cleaned_response = json_blocks[0]
+                logging.debug(f"Extracted JSON from code block, length: {len(cleaned_response)}")
+
+        # Look for JSON object patterns as a fallback
+        if not cleaned_response.strip().startswith('{'):
+            potential_json = re.search(r'(\{.+\})', cleaned_response, re.DOTALL)
+            if potential_json:
+                cleaned_response = potential_json.group(1)
+                logging.debug(f"Extracted JSON object using regex, length: {len(cleaned_response)}")
+
+        # Clean up common issues that break JSON parsing
+        def fix_json_string(json_str):
+            # Handle trailing commas in arrays/objects which are invalid in JSON
+            json_str = re.sub(r',\s*([\}\]])', r'\1', json_str)
+
+            # Fix mismatched quotes, ensuring strings are properly quoted
+            # This is a simple fix and won't catch all issues
+            json_str = re.sub(r'([\{,:]\s*)(\w+):\s*', r'\1"\2":', json_str)
+
+            # Replace single quotes with double quotes for JSON compliance
+            # This is tricky and can break content with apostrophes, so we're careful
+            in_string = False
+            in_single_quote = False
+            fixed_str = []
+            i = 0
+
+            while i < len(json_str):
+                char = json_str[i]
+
+                # Handle escaped characters
+                if char == '\\' and i + 1 < len(json_str):
+                    fixed_str.append(char)
+                    fixed_str.append(json_str[i+1])
+                    i += 2
+                    continue
+
+                # Track string state with double quotes
+                if char == '"' and not in_single_quote:
+                    in_string = not in_string
+
+                # Replace single quotes only when not inside a double-quoted string
+                if char == "'" and not in_string:
+                    fixed_str.append('"')
+                else:
+                    fixed_str.append(char)
+
+                i += 1
+
+            return ''.join(fixed_str)
+
+        # Apply JSON fixes
+        response_json = fix_json_string(cleaned_response)
+        logging.debug(f"Attempting to parse JSON of length {len(response_json)}")
+
+        # For debugging - log a snippet of the JSON
+        json_preview = response_json[:500] + '...' if len(response_json) > 500 else response_json
+        logging.debug(f"JSON preview: {json_preview}")
+
+    # Parse with better error reporting
+    try:
+        result = json.loads(response_json)
+    except json.JSONDecodeError as e:
+        # Show detailed debugging info
+        error_context = response_json[max(0, e.pos-50):min(len(response_json), e.pos+50)]
+        logging.error(f"JSON Error at position {e.pos}: {e.msg}")
+        logging.error(f"Error context: ...{error_context}...")
+
+        # Try fixing with a more permissive parser if available
+        try:
+            import ast
+            logging.info("Attempting to repair JSON with ast.literal_eval")
+            # Use ast to evaluate as Python literal - works for some malformed JSON
+            result = ast.literal_eval(response_json)
+            logging.info("Successfully repaired JSON!")
+        except:
+            # Last resort: try a very permissive JSON parser
+            try:
+                import demjson3
+                logging.info("Attempting to repair JSON with demjson3")
+                result = demjson3.decode(response_json)
+                logging.info("Successfully repaired JSON with demjson3!")
+            except ImportError:
+                logging.info("demjson3 not available for JSON repair")
+                raise e  # Re-raise the original error
+            except Exception as demjson_error:
+                logging.error(f"Failed to repair JSON: {demjson_error}")
+                raise e  # Re-raise the original error
+    
+    return result
+
+def prompt_entry_indexes(cv_data: Dict, dedupe_threshold: Optional[float]) -> List[int]:
+    """Database positions of the entries sent in prompts: one per near-duplicate cluster."""
+    entries = cv_data.get("entries", [])
+    if dedupe_threshold is None:
+        return list(range(len(entries)))
+    representatives = cluster_representatives(entries, dedupe_threshold)
+    indexes = [index for index, representative in enumerate(representatives) if representative == index]
+    if len(indexes) < len(entries):
+        print(f"Collapsed {len(entries) - len(indexes)} near-duplicate entries out of the prompt")
+    return indexes
+
+def report_prompt_tokens(cv_data: Dict, view_text: str) -> None:
+    """Print the tokens of the compact prompt view against the full indented JSON."""
+    before = estimate_tokens(json.dumps(cv_data, indent=2))
+    after = estimate_tokens(view_text)
+    print(f"Prompt view of the CV: {after} tokens instead of {before} ({100 * (1 - after / max(before, 1)):.0f}% fewer)")
 
 def create_tailored_cv_with_prompt(
     ai_client: Any, 
@@ -949,7 +1598,8 @@ def create_tailored_cv_with_prompt(
     openai_model: str = "gpt-4o",
     claude_model: str = "claude-3-7-sonnet-20250219",
     temperature: float = 0.7,
-    verbose: bool = False
+    verbose: bool = False,
+    dedupe_threshold: Optional[float] = DEFAULT_DEDUPE_THRESHOLD
 ):
     """
     Create a tailored version of the CV directly using a structured prompt.
@@ -966,9 +1616,12 @@ def create_tailored_cv_with_prompt(
         openai_model: The OpenAI model to use
         claude_model: The Claude model to use
         verbose: Whether to enable verbose logging
+        dedupe_threshold: Similarity for collapsing near-duplicate entries in the prompt (None to send every entry)
     """
-    # Convert CV data to a string representation
-    cv_json_str = json.dumps(cv_data, indent=2)
+    # Send a compact view with one copy of each near-duplicate cluster to keep the prompt small
+    view = build_prompt_view(cv_data, prompt_entry_indexes(cv_data, dedupe_threshold))
+    cv_json_str = serialize_view(view)
+    report_prompt_tokens(cv_data, cv_json_str)
     
     # Update meta information in the CV data for correct attribution
     if 'meta' not in cv_data:
@@ -981,25 +1634,34 @@ def create_tailored_cv_with_prompt(
     }
     
     # Create a system prompt instructing the AI how to tailor the CV with comprehensive editing guidance
-    system_prompt = """You are an expert CV/resume tailoring assistant. Your task is to create a tailored version of the CV/resume for a specific job posting.
+    system_prompt = f"""You are an expert CV/resume tailoring assistant. Your task is to create a tailored version of the CV/resume for a specific job posting.
     
     Follow these steps:
     1. Analyze the job posting to identify key requirements, skills, and qualifications
     2. Review the CV/resume to find relevant experience and accomplishments
     3. Create a comprehensive tailored version that emphasizes fit for the specific position
     
-    Your output must be a valid JSON object following the same structure as the input CV data, but with:
+    The CV is given in a compact form: "entries" maps each section to its entries, "text_blocks" maps
+    text block IDs to their text, and "skills" maps skill categories to skill names. Entry fields: {VIEW_LEGEND}.
+    
+    Your output must be a valid JSON object of the form
+    {{"entries": [{{"id": "<entry ID>", "d": ["<rewritten description>", ...]}}, ...],
+     "text_blocks": {{"<text block ID>": "<rewritten text>", ...}},
+     "skills": {{"<category>": ["<skill name>", ...], ...}}}}
+    listing the selected entries by their IDs, with exactly one rewritten description per original
+    description, in the same order. {PLACEHOLDER_INSTRUCTIONS}
+    
+    Tailor the CV with:
     
     1. COMPREHENSIVE TAILORING across ALL sections, including:
        - A completely rewritten professional summary/intro that highlights qualifications
-       - Every selected entry's title, descriptions, and content rewritten to emphasize relevance
-       - Skills section reorganized to prioritize the most relevant skills
+       - Every selected entry's descriptions rewritten to emphasize relevance
+       - Skill categories and skills reordered to prioritize the most relevant skills
        - Any text_blocks updated to reflect job-specific messaging
     
     2. STRATEGIC ENTRY SELECTION:
        - Include only the most relevant entries (generally 2-3 per section)
        - Ensure all critical qualifications from the job posting are addressed
-       - For each entry, add notes explaining relevance when appropriate
     
     3. DESCRIPTION ENHANCEMENT:
        - Rewrite ALL descriptions using active language and quantifiable achievements
@@ -1008,7 +1670,7 @@ def create_tailored_cv_with_prompt(
        - Add specific technical details when they match job requirements
     
     4. FORMATTING CONSIDERATION: 
-       - Maintain proper JSON structure with all field names preserved
+       - Use the entry IDs, text block IDs, category names and skill names exactly as given
        - Ensure there's no unnecessary repetition across sections
        - Keep descriptions concise but impactful
     
@@ -1028,7 +1690,7 @@ def create_tailored_cv_with_prompt(
     
     Analyze the job posting and CV database, then create a tailored version of the CV that highlights the most relevant skills and experience for this job.
     
-    Your response must be only the valid JSON object for the tailored CV, following the same structure as the input.
+    Your response must be only the valid JSON object for the tailored CV, in the form described above.
     """
     
     # Log the prompts being used
@@ -1039,174 +1701,19 @@ def create_tailored_cv_with_prompt(
         logging.debug(f"User prompt (first 500 chars):\n{user_prompt[:500]}...")
     
     try:
-        # Compress CV data by limiting entry descriptions to conserve tokens
-        def compress_cv_data(cv_data):
-            """Reduce size of CV by limiting entry descriptions to save tokens"""
-            compressed = cv_data.copy()
-            
-            # If entries exist, truncate long descriptions
-            if "entries" in compressed:
-                for entry in compressed["entries"]:
-                    # Truncate descriptions longer than 300 characters
-                    if "description" in entry and isinstance(entry["description"], str):
-                        if len(entry["description"]) > 300:
-                            entry["description"] = entry["description"][:300] + "..."
-                            
-            return compressed
-        
-        # Reduce size of CV by limiting descriptions
-        compressed_cv = compress_cv_data(cv_data)
-        cv_json_str = json.dumps(compressed_cv)
-        
-        if service == "openai":
-            logging.info(f"Creating tailored CV with OpenAI using {openai_model}")
-            response = ai_client.chat.completions.create(
-                model=openai_model,
-                temperature=temperature,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            tailored_cv_json = response.choices[0].message.content
-            
-            # Log the complete API interaction
-            log_api_interaction(
-                service="openai", 
-                model=openai_model, 
-                prompt_type="CV Tailoring (Prompt-Only)", 
-                system_prompt=system_prompt,
-                user_prompt=user_prompt, 
-                response_text=tailored_cv_json
-            )
-            
-            if verbose:
-                logging.debug(f"OpenAI response (first 500 chars):\n{tailored_cv_json[:500]}...")
-            
-        elif service == "claude":
-            logging.info(f"Creating tailored CV with Claude using {claude_model}")
-            response = ai_client.messages.create(
-                model=claude_model,
-                max_tokens=4000,
-                temperature=temperature,
-                system=system_prompt + "\nYour entire response must be valid JSON only. Do not include markdown code blocks or explanations. Respond with just the raw JSON object.",
-                messages=[
-                    {"role": "user", "content": user_prompt + "\n\nYou MUST respond with valid JSON only. Your entire response must be valid JSON with no other text."}
-                ]
-            )
-            # Get the raw response text
-            raw_response = response.content[0].text
-            
-            # Log the complete API interaction
-            log_api_interaction(
-                service="claude", 
-                model=claude_model, 
-                prompt_type="CV Tailoring (Prompt-Only)", 
-                system_prompt=system_prompt + "\nYour entire response must be valid JSON only. Do not include markdown code blocks or explanations. Respond with just the raw JSON object.",
-                user_prompt=user_prompt + "\n\nYou MUST respond with valid JSON only. Your entire response must be valid JSON with no other text.", 
-                response_text=raw_response
-            )
-            
-            if verbose:
-                logging.debug(f"Claude Raw Response (first 500 chars):\n{raw_response[:500]}...")
-            
-            # Add more comprehensive JSON extraction and validation
-            import re
-            cleaned_response = raw_response
-            
-            # First check for code blocks and extract content if present
-            if "```json" in cleaned_response or "```" in cleaned_response:
-                # Extract content from code blocks 
-                json_blocks = re.findall(r'```(?:json)?\n(.+?)\n```', cleaned_response, re.DOTALL)
-                if json_blocks:
-                    cleaned_response = json_blocks[0]
-                    logging.debug(f"Extracted JSON from code block, length: {len(cleaned_response)}")
-            
-            # Look for JSON object patterns as a fallback
-            if not cleaned_response.strip().startswith('{'):
-                potential_json = re.search(r'(\{.+\})', cleaned_response, re.DOTALL)
-                if potential_json:
-                    cleaned_response = potential_json.group(1)
-                    logging.debug(f"Extracted JSON object using regex, length: {len(cleaned_response)}")
-            
-            # Clean up common issues that break JSON parsing
-            def fix_json_string(json_str):
-                # Handle trailing commas in arrays/objects which are invalid in JSON
-                json_str = re.sub(r',\s*([\}\]])', r'\1', json_str)
-                
-                # Fix mismatched quotes, ensuring strings are properly quoted
-                # This is a simple fix and won't catch all issues
-                json_str = re.sub(r'([\{,:]\s*)(\w+):\s*', r'\1"\2":', json_str)
-                
-                # Replace single quotes with double quotes for JSON compliance
-                # This is tricky and can break content with apostrophes, so we're careful
-                in_string = False
-                in_single_quote = False
-                fixed_str = []
-                i = 0
-                
-                while i < len(json_str):
-                    char = json_str[i]
-                    
-                    # Handle escaped characters
-                    if char == '\\' and i + 1 < len(json_str):
-                        fixed_str.append(char)
-                        fixed_str.append(json_str[i+1])
-                        i += 2
-                        continue
-                        
-                    # Track string state with double quotes
-                    if char == '"' and not in_single_quote:
-                        in_string = not in_string
-                    
-                    # Replace single quotes only when not inside a double-quoted string
-                    if char == "'" and not in_string:
-                        fixed_str.append('"')
-                    else:
-                        fixed_str.append(char)
-                    
-                    i += 1
-                
-                return ''.join(fixed_str)
-            
-            # Apply JSON fixes
-            tailored_cv_json = fix_json_string(cleaned_response)
-            logging.debug(f"Attempting to parse JSON of length {len(tailored_cv_json)}")
-            
-            # For debugging - log a snippet of the JSON
-            json_preview = tailored_cv_json[:500] + '...' if len(tailored_cv_json) > 500 else tailored_cv_json
-            logging.debug(f"JSON preview: {json_preview}")
+        response = request_json_response(
+            ai_client, system_prompt, user_prompt, service,
+            openai_model=openai_model, claude_model=claude_model,
+            temperature=temperature, verbose=verbose
+        )
+        if not isinstance(response, dict):
+            raise ValueError("Expected a JSON object in the response")
         
-        # Parse with better error reporting
-        try:
-            tailored_cv = json.loads(tailored_cv_json)
-        except json.JSONDecodeError as e:
-            # Show detailed debugging info
-            error_context = tailored_cv_json[max(0, e.pos-50):min(len(tailored_cv_json), e.pos+50)]
-            logging.error(f"JSON Error at position {e.pos}: {e.msg}")
-            logging.error(f"Error context: ...{error_context}...")
-            
-            # Try fixing with a more permissive parser if available
-            try:
-                import ast
-                logging.info("Attempting to repair JSON with ast.literal_eval")
-                # Use ast to evaluate as Python literal - works for some malformed JSON
-                tailored_cv = ast.literal_eval(tailored_cv_json)
-                logging.info("Successfully repaired JSON!")
-            except:
-                # Last resort: try a very permissive JSON parser
-                try:
-                    import demjson3
-                    logging.info("Attempting to repair JSON with demjson3")
-                    tailored_cv = demjson3.decode(tailored_cv_json)
-                    logging.info("Successfully repaired JSON with demjson3!")
-                except ImportError:
-                    logging.info("demjson3 not available for JSON repair")
-                    raise e  # Re-raise the original error
-                except Exception as demjson_error:
-                    logging.error(f"Failed to repair JSON: {demjson_error}")
-                    raise e  # Re-raise the original error
+        # Map the selected entry IDs back onto the full entries
+        tailored_cv = restore_from_view(
+            response, cv_data, view_entry_ids(view),
+            lambda originals, rewritten: restore_description_markup(ai_client, originals, rewritten, service, openai_model, claude_model, temperature, verbose)
+        )
         
         # Save the tailored CV
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -1233,6 +1740,227 @@ def create_tailored_cv_with_prompt(
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(minimal_cv, f, indent=2)
 
+def merge_tailored_sections(
+    cv_data: Dict,
+    section_results: Dict[str, List[Dict]],
+    profile: Optional[Dict],
+    max_entries_per_section: Dict[str, int]
+) -> Dict:
+    """
+    Merge per-section tailoring results into one tailored CV.
+    
+    The merge enforces the global structure: entries keep the section they
+    were sent in, entries that do not match the database schema are
+    dropped, every section is cut to its quota, and text blocks keep the IDs
+    (and the already tailored summary) of the original. Repeated entries are
+    already removed by restore_entries() (by ID), and distinct entries may
+    share a title (the same position at two sites), so titles are not compared.
+    
+    Args:
+        cv_data: The original CV/resume JSON data
+        section_results: Tailored entries returned for each section, in section order
+        profile: Tailored text blocks and skills, or None to keep the originals
+        max_entries_per_section: Dictionary mapping sections to max number of entries to include
+        
+    Returns:
+        The tailored CV data
+    """
+    entries = []
+    for section, results in section_results.items():
+        kept = []
+        for entry in results:
+            if not isinstance(entry, dict):
+                continue
+            entry = dict(entry, section=section)
+            if validate_database({"entries": [entry]}):
+                continue
+            kept.append(entry)
+        entries.extend(kept[:max_entries_per_section.get(section, 2)])
+    
+    # Text blocks: only IDs that exist in the original, the summary as already tailored
+    original_blocks = {block.get("id"): block for block in cv_data.get("text_blocks", [])}
+    tailored_blocks = {}
+    if profile and isinstance(profile.get("text_blocks"), list):
+        for block in profile["text_blocks"]:
+            if isinstance(block, dict) and block.get("id") in original_blocks and isinstance(block.get("content"), str):
+                tailored_blocks[block["id"]] = dict(original_blocks[block["id"]], content=block["content"])
+    text_blocks = []
+    for block_id, block in original_blocks.items():
+        if block_id in ("professional_summary", "intro"):
+            text_blocks.append(block)
+        else:
+            text_blocks.append(tailored_blocks.get(block_id, block))
+    
+    skills = cv_data.get("skills", [])
+    if profile and isinstance(profile.get("skills"), list) and not validate_database({"entries": [], "skills": profile["skills"]}):
+        skills = profile["skills"]
+    
+    return {
+        "meta": {
+            "last_updated": datetime.now().strftime("%Y-%m-%d"),
+            "generated_by": "ai_cv_generator.py",
+            "tailoring_method": "prompt-only (map-reduce)"
+        },
+        "contact_info": cv_data.get("contact_info", {}),
+        "text_blocks": text_blocks,
+        "skills": skills,
+        "entries": entries
+    }
+
+def create_tailored_cv_map_reduce(
+    ai_client: Any,
+    cv_data: Dict,
+    job_posting: str,
+    output_path: str,
+    service: str = "openai",
+    openai_model: str = "gpt-4o",
+    claude_model: str = "claude-3-7-sonnet-20250219",
+    temperature: float = 0.7,
+    verbose: bool = False,
+    dedupe_threshold: Optional[float] = DEFAULT_DEDUPE_THRESHOLD,
+    max_entries_per_section: Dict[str, int] = None,
+    max_workers: int = 4
+):
+    """
+    Create a tailored CV with the prompt-only approach, split into one request per section.
+    
+    Each section is tailored in its own request (together with the job
+    posting), and the text blocks and skills in one more; the requests run
+    concurrently. merge_tailored_sections() then assembles the results
+    locally, so no prompt has to hold the whole database and the wall time is
+    bounded by the largest section.
+    
+    Args:
+        ai_client: AI client (OpenAI or Claude)
+        cv_data: The original CV/resume JSON data (with the tailored summary already in place)
+        job_posting: The text of the job posting
+        output_path: Path to save the tailored JSON
+        dedupe_threshold: Similarity for collapsing near-duplicate entries in the prompts (None to send every entry)
+        max_entries_per_section: Dictionary mapping sections to max number of entries to include
+        max_workers: Number of requests sent concurrently
+    """
+    if max_entries_per_section is None:
+        max_entries_per_section = DEFAULT_MAX_ENTRIES_PER_SECTION
+    # Compact view of the whole CV; each request gets its own slice of it
+    view = build_prompt_view(cv_data, prompt_entry_indexes(cv_data, dedupe_threshold))
+    report_prompt_tokens(cv_data, serialize_view(view))
+    sections = view["entries"]
+    
+    system_prompt = f"""You are an expert CV/resume tailoring assistant. You receive a job posting and ONE section of a CV/resume database.
+    Entry fields: {VIEW_LEGEND}.
+    
+    Select the entries of this section that are most relevant to the job and tailor them:
+       - Keep at most the number of entries you are given, most relevant first
+       - Leave out entries that are not relevant to the job at all
+       - Rewrite descriptions using active language, quantifiable achievements and keywords from the job posting
+    
+    Respond with a JSON object of the form {{"entries": [{{"id": "<entry ID>", "d": ["<rewritten description>", ...]}}, ...]}}
+    holding the selected entries by their IDs, exactly as given, with one rewritten description per original
+    description in the same order. {PLACEHOLDER_INSTRUCTIONS}
+    """
+    profile_system_prompt = """You are an expert CV/resume tailoring assistant. You receive a job posting and the text blocks (ID -> text) and skills (category -> skill names) of a CV/resume.
+    
+    Tailor them for the job:
+       - Reorder skill categories and skills so the most relevant come first
+       - Update text blocks to reflect job-specific messaging
+       - Keep every text block ID, category name and skill name unchanged
+    
+    Respond with a JSON object of the form {"text_blocks": {"<ID>": "<text>", ...}, "skills": {"<category>": ["<skill name>", ...], ...}}.
+    """
+    
+    def tailor_section(section: str, entries: List[Dict]) -> List[Dict]:
+        quota = max_entries_per_section.get(section, 2)
+        user_prompt = f"""# Job Posting
+    
+    {job_posting}
+    
+    # CV Section: {section} ({len(entries)} entries)
+    
+    ```json
+    {serialize_view(entries)}
+    ```
+    
+    Select and tailor at most {quota} entries from this section."""
+        response = request_json_response(
+            ai_client, system_prompt, user_prompt, service,
+            openai_model=openai_model, claude_model=claude_model,
+            temperature=temperature, verbose=verbose,
+            prompt_type=f"CV Tailoring (Section: {section})"
+        )
+        selected = response.get("entries", []) if isinstance(response, dict) else response
+        return restore_entries(
+            selected, cv_data, {entry["id"] for entry in entries},
+            lambda originals, rewritten: restore_description_markup(ai_client, originals, rewritten, service, openai_model, claude_model, temperature, verbose)
+        )
+    
+    def tailor_profile() -> Dict:
+        profile = {"text_blocks": view["text_blocks"], "skills": view["skills"]}
+        user_prompt = f"""# Job Posting
+    
+    {job_posting}
+    
+    # Text Blocks and Skills
+    
+    ```json
+    {serialize_view(profile)}
+    ```"""
+        response = request_json_response(
+            ai_client, profile_system_prompt, user_prompt, service,
+            openai_model=openai_model, claude_model=claude_model,
+            temperature=temperature, verbose=verbose,
+            prompt_type="CV Tailoring (Text Blocks and Skills)"
+        )
+        if not isinstance(response, dict):
+            return None
+        return {"text_blocks": restore_text_blocks(response.get("text_blocks"), cv_data),
+                "skills": restore_skills(response.get("skills"), cv_data)}
+    
+    print(f"Tailoring {len(sections)} sections with up to {max_workers} concurrent requests...")
+    started = time.monotonic()
+    section_results = {}
+    section_times = {}
+    profile = None
+    
+    def timed(task, *task_args):
+        task_started = time.monotonic()
+        result = task(*task_args)
+        return result, time.monotonic() - task_started
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(timed, tailor_section, section, entries): section for section, entries in sections.items()}
+        futures[executor.submit(timed, tailor_profile)] = None
+        for future in as_completed(futures):
+            section = futures[future]
+            label = section or "text blocks and skills"
+            try:
+                result, elapsed = future.result()
+            except Exception as e:
+                print(f"  - Error tailoring {label}: {e}; keeping the original")
+                continue
+            section_times[label] = elapsed
+            print(f"  - Tailored {label} in {elapsed:.1f}s")
+            if section is None:
+                profile = result if isinstance(result, dict) else None
+            else:
+                section_results[section] = result if isinstance(result, list) else []
+    
+    # Sections whose request failed keep their first entries unchanged
+    ordered_results = {}
+    for section, entries in sections.items():
+        if section in section_results:
+            ordered_results[section] = section_results[section]
+        else:
+            ordered_results[section] = restore_entries([entry["id"] for entry in entries], cv_data, {entry["id"] for entry in entries})
+    
+    tailored_cv = merge_tailored_sections(cv_data, ordered_results, profile, max_entries_per_section)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(tailored_cv, f, indent=2)
+    
+    total = time.monotonic() - started
+    print(f"\nCreated tailored CV JSON: {output_path}")
+    print(f"Selected {len(tailored_cv['entries'])} entries from {len(sections)} sections in {total:.1f}s "
+          f"(longest request: {max(section_times.values(), default=0.0):.1f}s)")
+
 def log_api_interaction(service, model, prompt_type, system_prompt, user_prompt, response_text):
     """Log the complete API interaction to the API log file"""
     api_logger = logging.getLogger('api')
@@ -1262,25 +1990,64 @@ def create_directories():
         "logs": "./logs"
     }
 
-def main():
-    """Main function to generate a tailored CV/resume."""
-    parser = argparse.ArgumentParser(description="Generate a tailored CV/resume based on a job posting")
-    parser.add_argument("--job-posting", required=True, help="Path to the job posting text file")
+def build_arg_parser(parser_class: type = argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """
+    Build the command-line parser (also used by tailoring_server.py to validate job options).
+    
+    Args:
+        parser_class: ArgumentParser subclass to build, e.g. one whose error() raises instead of exiting
+    """
+    parser = parser_class(description="Generate a tailored CV/resume based on a job posting")
+    parser.add_argument("--job-posting", help="Path to the job posting text file (required unless --resume is given)")
     parser.add_argument("--cv-data", default="cv_database.json", help="Path to the CV/resume JSON data file")
     parser.add_argument("--output-name", help="Base name for output files (without extension)")
     parser.add_argument("--type", choices=["cv", "resume"], default="resume", help="Document type to generate")
     parser.add_argument("--improve-descriptions", action="store_true", help="Use AI to improve entry descriptions")
     parser.add_argument("--json-only", action="store_true", help="Only generate the JSON file, not the document")
     parser.add_argument("--html-too", action="store_true", help="Generate HTML version in addition to PDF")
+    parser.add_argument("--format", choices=["pdf", "html"] + TEXT_FORMATS, default="pdf", help="Output format: pdf renders with R; html, txt (ATS plain text) and md are written in-process from the tailored JSON without R (default: pdf)")
     parser.add_argument("--use-prompt-only", action="store_true", help="Use direct prompt for CV tailoring instead of entry-by-entry analysis")
+    parser.add_argument("--map-reduce", action="store_true", help="Prompt-only tailoring split into concurrent per-section requests for large databases (implies --use-prompt-only)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Maximum number of concurrent API requests (default: 4)")
     parser.add_argument("--ai-service", choices=["openai", "claude"], default="openai", help="AI service to use (openai or claude)")
     parser.add_argument("--openai-model", default="gpt-4o", help="OpenAI model to use (default: gpt-4o)")
     parser.add_argument("--claude-model", default="claude-3-7-sonnet-20250219", help="Claude model to use (default: claude-3-7-sonnet-20250219)")
     parser.add_argument("--temperature", type=float, default=0.7, help="Temperature setting for AI models (0.0-1.0). Lower values are more deterministic, higher values more creative (default: 0.7)")
     parser.add_argument("--entries-per-section", help="JSON string mapping sections to max entries (e.g., '{\"education\": 2}')")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging of prompts and API interactions")
-    
+    parser.add_argument("--dedupe-threshold", type=float, default=DEFAULT_DEDUPE_THRESHOLD, help=f"Similarity (0-1) above which entries are treated as variants of each other and scored once (default: {DEFAULT_DEDUPE_THRESHOLD})")
+    parser.add_argument("--no-dedupe", action="store_true", help="Score and send every entry, even near-duplicates")
+    parser.add_argument("--cascade", action="store_true", help="Score entries with a cheap model first and rescore only entries near a selection boundary with the main model")
+    parser.add_argument("--cheap-openai-model", default=DEFAULT_CHEAP_OPENAI_MODEL, help=f"Cheap OpenAI model for --cascade (default: {DEFAULT_CHEAP_OPENAI_MODEL})")
+    parser.add_argument("--cheap-claude-model", default=DEFAULT_CHEAP_CLAUDE_MODEL, help=f"Cheap Claude model for --cascade (default: {DEFAULT_CHEAP_CLAUDE_MODEL})")
+    parser.add_argument("--escalation-margin", type=float, default=DEFAULT_ESCALATION_MARGIN, help=f"With --cascade, entries within this many points of a section cutoff or of the minimum score are rescored (default: {DEFAULT_ESCALATION_MARGIN})")
+    parser.add_argument("--matrix-scoring", action="store_true", help="Score entries from a requirement-by-entry relevance matrix requested in chunks instead of one API call per entry")
+    parser.add_argument("--matrix-weights", help="JSON string mapping job analysis categories to weights for --matrix-scoring (e.g., '{\"Soft skills emphasized\": 0}')")
+    parser.add_argument("--matrix-chunk-cells", type=int, default=DEFAULT_MATRIX_CHUNK_CELLS, help=f"Requirement x entry cells per --matrix-scoring request (default: {DEFAULT_MATRIX_CHUNK_CELLS})")
+    parser.add_argument("--local-scoring", action="store_true", help="Score entries with the local embedding cache instead of one API call per entry (requires numpy)")
+    parser.add_argument("--keep-boilerplate", action="store_true", help="Send the job posting as is, without removing company boilerplate, EEO statements and repeated lines")
+    parser.add_argument("--boilerplate-patterns", default=DEFAULT_PATTERNS_PATH, help=f"Learned boilerplate patterns (see cv_posting_cleaner.py --learn) (default: {DEFAULT_PATTERNS_PATH})")
+    parser.add_argument("--no-reuse", action="store_true", help="Do not reuse the analysis and entry scores of a similar earlier posting")
+    parser.add_argument("--reuse-threshold", type=float, default=DEFAULT_REUSE_THRESHOLD, help=f"Similarity (0-1) an earlier posting needs for its results to be reused (default: {DEFAULT_REUSE_THRESHOLD})")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a stopped run from its checkpoints, skipping completed stages and entries")
+    parser.add_argument("--runs-dir", default=DEFAULT_RUNS_DIR, help=f"Directory for run checkpoints (default: {DEFAULT_RUNS_DIR})")
+    parser.add_argument("--batch-api", metavar="DIR", help="Send every request through provider batch jobs (OpenAI Batch, Anthropic Message Batches) at batch prices; state is kept in DIR, so running the same command again continues the run")
+    parser.add_argument("--batch-poll-interval", type=float, default=DEFAULT_BATCH_POLL_INTERVAL, help=f"With --batch-api, seconds between checks of a submitted batch (default: {DEFAULT_BATCH_POLL_INTERVAL:.0f})")
+    parser.add_argument("--record", metavar="DIR", help="Record every API request and response, with timing and token usage, to DIR")
+    parser.add_argument("--replay", metavar="DIR", help="Answer API requests from a recording made with --record instead of calling the AI service")
+    parser.add_argument("--replay-latency", action="store_true", help="With --replay, wait as long as each recorded call originally took")
+    return parser
+
+def main():
+    """Main function to generate a tailored CV/resume."""
+    parser = build_arg_parser()
     args = parser.parse_args()
+    if not args.job_posting and not args.resume and not args.replay:
+        parser.error("--job-posting is required unless --resume or --replay is given")
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+    if args.batch_api and (args.replay or args.resume):
+        parser.error("--batch-api cannot be combined with --replay or --resume; run the same --batch-api command again to continue")
     
     # Setup logging
     if RICH_AVAILABLE:
@@ -1305,6 +2072,84 @@ def main():
             border_style="blue"
         ))
     
+    try:
+        if args.batch_api:
+            run_batch_pipeline(args)
+        else:
+            run_tailoring_pipeline(args)
+    except (KeyboardInterrupt, SystemExit) as e:
+        if isinstance(e, SystemExit) and not e.code:
+            raise
+        if args.batch_api:
+            print(f"\nBatch run stopped. Submitted batches and their results are saved in {args.batch_api}; continue with the same command.")
+        elif getattr(args, "run_id", None):
+            print(f"\nRun {args.run_id} stopped. Completed stages and scored entries are saved; resume with:")
+            print(f"python ai_cv_generator.py --resume {args.run_id}")
+        sys.exit(1)
+
+def run_tailoring_pipeline(
+    args: argparse.Namespace,
+    ai_client: Any = None,
+    service: Optional[str] = None,
+    cv_data: Optional[Dict] = None,
+    converter=None,
+    renderer=None
+) -> Dict[str, str]:
+    """
+    Run every stage of a tailoring run for parsed command-line arguments.
+    
+    The optional arguments let a long-running caller (tailoring_server.py)
+    pass in warm resources instead of creating them for every run.
+    
+    Args:
+        args: Parsed arguments from build_arg_parser()
+        ai_client: Existing AI client (created with setup_ai_client if None)
+        service: Service of ai_client
+        cv_data: Already loaded CV data; it is modified, so pass a copy
+        converter: Callable like run_converter_script(json_path, output_dir, doc_type)
+        renderer: Callable like run_render_script(template, output_name, html_too, data_dir=...)
+        
+    Returns:
+        Dictionary of artifact paths (json, csv_dir, pdf and, with --html-too, html)
+    """
+    converter = converter or run_converter_script
+    renderer = renderer or run_render_script
+    
+    # A replay without a job posting reproduces the recorded run with its original arguments
+    if args.replay and not args.job_posting and not args.resume:
+        try:
+            recording = read_recording(args.replay)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot replay {args.replay}: {e}")
+            sys.exit(1)
+        for name, value in recording["arguments"].items():
+            if name not in ("record", "replay", "replay_latency", "resume", "runs_dir", "verbose"):
+                setattr(args, name, value)
+        # Keep the recorded run's tailored JSON, CSV files and documents
+        if args.output_name:
+            args.output_name = f"{args.output_name}_replay"
+        print(f"Replaying the run recorded in {args.replay} on {recording['created']}")
+    
+    # Open the run's checkpoints; a resumed run gets its original arguments back
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.load(args.resume, args.runs_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot resume run {args.resume}: {e}")
+            sys.exit(1)
+        for name, value in checkpoint.arguments.items():
+            if name not in ("resume", "runs_dir", "verbose"):
+                setattr(args, name, value)
+        print(f"Resuming run {checkpoint.run_id} (completed stages: {', '.join(checkpoint.state['stages']) or 'none'})")
+    else:
+        checkpoint = RunCheckpoint.create(dict(vars(args)), args.runs_dir)
+        print(f"Run ID: {checkpoint.run_id} (checkpoints in {checkpoint.run_dir})")
+    args.run_id = checkpoint.run_id
+    if args.replay:
+        # Every request must come from the recording: no analysis or scores from
+        # the posting index, and nothing recorded in it
+        args.no_reuse = True
+    
     # Create necessary directories
     if RICH_AVAILABLE:
         console.print("[bold]Setting up directories...[/bold]")
@@ -1315,81 +2160,177 @@ def main():
     # Include date in YYYY-MM-DD format (for filenames only, not directories)
     today_date = datetime.now().strftime("%Y-%m-%d")
     
-    # Base name should NOT include the date for directory names
-    if args.output_name is None:
-        # For auto-generated names without date
-        timestamp = datetime.now().strftime("%H%M%S")
-        base_name = f"{args.type}_{timestamp}"
-    else:
-        # Use the user-provided name as is for the base name
-        base_name = args.output_name
-    
-    # Create data directory name without date
-    csv_output_dir = f"{base_name}_data"
-    
-    # Full output name WITH date (for JSON, HTML, PDF files)
-    if today_date not in base_name:
-        args.output_name = f"{base_name}_{today_date}"
+    setup = checkpoint.stage("setup")
+    if setup:
+        # A resumed run keeps its original output names
+        args.output_name, csv_output_dir = setup["output_name"], setup["csv_output_dir"]
     else:
-        args.output_name = base_name
+        # Base name should NOT include the date for directory names
+        if args.output_name is None:
+            # For auto-generated names without date
+            timestamp = datetime.now().strftime("%H%M%S")
+            base_name = f"{args.type}_{timestamp}"
+        else:
+            # Use the user-provided name as is for the base name
+            base_name = args.output_name
+        
+        # Create data directory name without date
+        csv_output_dir = f"{base_name}_data"
+        
+        # Full output name WITH date (for JSON, HTML, PDF files)
+        if today_date not in base_name:
+            args.output_name = f"{base_name}_{today_date}"
+        else:
+            args.output_name = base_name
+        checkpoint.complete_stage("setup", {"output_name": args.output_name, "csv_output_dir": csv_output_dir})
     
     # Load the CV/resume data
     print("\nLoading CV/resume data...")
-    cv_data = load_json_data(args.cv_data)
+    if cv_data is None:
+        cv_data = load_json_data(args.cv_data)
     print(f"Loaded {len(cv_data.get('entries', []))} entries from {args.cv_data}")
     
     # Read the job posting
     print("\nReading job posting...")
-    job_posting = read_job_posting(args.job_posting)
+    if checkpoint.stage("posting"):
+        job_posting = checkpoint.read_posting()
+    else:
+        job_posting = read_job_posting(args.job_posting)
+        checkpoint.save_posting(job_posting)
+        checkpoint.complete_stage("posting")
     print(f"Read {len(job_posting)} characters from {args.job_posting}")
     
+    # Strip company boilerplate, EEO statements and repeated lines before any prompt includes the posting
+    if not args.keep_boilerplate:
+        job_posting, cleaning = clean_posting(job_posting, BoilerplatePatterns(args.boilerplate_patterns))
+        print(f"Preprocessed job posting: {format_report(cleaning)}")
+    
     # Setup AI client (OpenAI or Claude)
-    ai_client, service = setup_ai_client(args.ai_service)
+    if args.replay:
+        try:
+            ai_client = ReplayClient(args.replay, args.replay_latency)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot replay {args.replay}: {e}")
+            sys.exit(1)
+        service = ai_client.service
+        print(f"Answering API requests from the recording in {args.replay}")
+    elif ai_client is None:
+        ai_client, service = setup_ai_client(args.ai_service)
+    if args.record:
+        ai_client = RecordingClient(ai_client, args.record, service, dict(vars(args)))
+        print(f"Recording API interactions to {args.record}")
     
     # Store model information for later use
     openai_model = args.openai_model
     claude_model = args.claude_model
     
+    # Look for a near-identical earlier posting whose results can be reused
+    posting_index = None if args.no_reuse else PostingIndex()
+    reuse_record = None
+    if posting_index is not None:
+        reuse_record, similarity = posting_index.find_similar(job_posting, args.reuse_threshold)
+        if reuse_record:
+            print(f"\nFound similar earlier posting {reuse_record['id']} ({reuse_record['posting_file']}, similarity {similarity:.2f})")
+    scoring_settings = {
+        "service": service,
+        "model": openai_model if service == "openai" else claude_model,
+        "temperature": args.temperature,
+        "improve_descriptions": args.improve_descriptions,
+    }
+    cascade_model = None
+    if args.cascade:
+        cascade_model = args.cheap_openai_model if service == "openai" else args.cheap_claude_model
+        scoring_settings["cascade"] = {"model": cascade_model, "escalation_margin": args.escalation_margin}
+    score_cache = reusable_scores(reuse_record, scoring_settings) if reuse_record else {}
+    
     # Analyze the job posting
-    job_analysis = analyze_job_posting(ai_client, job_posting, service, openai_model=openai_model, claude_model=claude_model, temperature=args.temperature, verbose=args.verbose)
-    print("Job analysis complete. Extracted key requirements:")
+    job_analysis = checkpoint.stage("analysis")
+    if job_analysis is not None:
+        print("Using the job analysis saved before the run stopped. Extracted key requirements:")
+    elif reuse_record:
+        job_analysis = reuse_record["analysis"]
+        print("Reusing its job analysis. Extracted key requirements:")
+    else:
+        job_analysis = analyze_job_posting(ai_client, job_posting, service, openai_model=openai_model, claude_model=claude_model, temperature=args.temperature, verbose=args.verbose)
+        print("Job analysis complete. Extracted key requirements:")
+    checkpoint.complete_stage("analysis", job_analysis)
     for category, items in job_analysis.items():
         print(f"  - {category}: {', '.join(items[:3])}...")
     
     # Create a tailored professional summary
     print("\nCreating job-specific professional summary...")
-    updated_summary = create_job_specific_summary(ai_client, cv_data, job_analysis, service, openai_model=openai_model, claude_model=claude_model, temperature=args.temperature, verbose=args.verbose)
-    
-    # Update the professional summary in the CV data
-    summary_updated = False
-    for block in cv_data.get("text_blocks", []):
-        if block.get("id") == "professional_summary":
-            print(f"Original summary: {block.get('content', '')[:50]}...")
-            block["content"] = updated_summary
-            print(f"Updated summary: {updated_summary[:50]}...")
-            summary_updated = True
-            break
-            
-    # If no professional_summary found, try to update intro block
-    if not summary_updated and cv_data.get("text_blocks"):
+    updated_summary = checkpoint.stage("summary")
+    summary_pending = None
+    if updated_summary is None:
+        try:
+            original_summary = find_original_summary(cv_data)
+            updated_summary = create_job_specific_summary(ai_client, cv_data, job_analysis, service, openai_model=openai_model, claude_model=claude_model, temperature=args.temperature, verbose=args.verbose)
+            # The original text comes back when the request failed; a resumed run tries again
+            if updated_summary != original_summary:
+                checkpoint.complete_stage("summary", updated_summary)
+        except BatchPending as e:
+            # Entry-by-entry scoring does not use the summary, so its requests can go into the same batch
+            if args.use_prompt_only or args.map_reduce:
+                raise
+            print("Waiting for a provider batch")
+            summary_pending = e
+    
+    # Update the professional summary in the CV data (once a batched summary has arrived)
+    if updated_summary is not None:
+        summary_updated = False
         for block in cv_data.get("text_blocks", []):
-            if block.get("id") == "intro":
-                print(f"No professional_summary found, updating intro: {block.get('content', '')[:50]}...")
+            if block.get("id") == "professional_summary":
+                print(f"Original summary: {block.get('content', '')[:50]}...")
                 block["content"] = updated_summary
-                print(f"Updated intro: {updated_summary[:50]}...")
+                print(f"Updated summary: {updated_summary[:50]}...")
+                summary_updated = True
                 break
+            
+        # If no professional_summary found, try to update intro block
+        if not summary_updated and cv_data.get("text_blocks"):
+            for block in cv_data.get("text_blocks", []):
+                if block.get("id") == "intro":
+                    print(f"No professional_summary found, updating intro: {block.get('content', '')[:50]}...")
+                    block["content"] = updated_summary
+                    print(f"Updated intro: {updated_summary[:50]}...")
+                    break
     
     # Define the JSON output file path in the tailored_json directory
     tailored_json_path = f"{directories['tailored_json']}/{args.output_name}.json"
     
     # Create a tailored JSON file with only the most relevant entries
+    if args.map_reduce:
+        args.use_prompt_only = True
     tailoring_method = "prompt-only" if args.use_prompt_only else "entry-by-entry"
     if RICH_AVAILABLE:
         console.print(f"\n[bold blue]Using {tailoring_method} approach for CV tailoring...[/bold blue]")
     else:
         print(f"\nUsing {tailoring_method} approach for CV tailoring...")
     
-    if args.use_prompt_only:
+    tailoring_done = checkpoint.stage("tailored_json") and os.path.exists(tailored_json_path)
+    if tailoring_done:
+        print(f"Tailored JSON was created before the run stopped: {tailored_json_path}")
+    elif args.map_reduce:
+        # Prompt-only tailoring with one concurrent request per section
+        if RICH_AVAILABLE:
+            console.print("[yellow]Sending each CV section with the job posting in its own request...[/yellow]")
+        else:
+            print("Sending each CV section with the job posting in its own request...")
+        create_tailored_cv_map_reduce(
+            ai_client,
+            cv_data,
+            job_posting,
+            tailored_json_path,
+            service=service,
+            openai_model=openai_model,
+            claude_model=claude_model,
+            temperature=args.temperature,
+            verbose=args.verbose,
+            dedupe_threshold=None if args.no_dedupe else args.dedupe_threshold,
+            max_entries_per_section=json.loads(args.entries_per_section) if args.entries_per_section else None,
+            max_workers=args.max_workers
+        )
+    elif args.use_prompt_only:
         # Use the direct prompt approach for tailoring (comprehensive single API call)
         if RICH_AVAILABLE:
             console.print("[yellow]Sending entire CV and job posting to AI in a single request...[/yellow]")
@@ -1404,7 +2345,8 @@ def main():
             openai_model=openai_model,
             claude_model=claude_model,
             temperature=args.temperature,
-            verbose=args.verbose
+            verbose=args.verbose,
+            dedupe_threshold=None if args.no_dedupe else args.dedupe_threshold
         )
         # Skip all other processing steps that would trigger entry-by-entry evaluation
         if RICH_AVAILABLE:
@@ -1428,39 +2370,171 @@ def main():
             openai_model=openai_model,
             claude_model=claude_model,
             temperature=args.temperature,
-            verbose=args.verbose
+            verbose=args.verbose,
+            dedupe_threshold=None if args.no_dedupe else args.dedupe_threshold,
+            local_scoring=args.local_scoring,
+            cv_data_path=args.cv_data,
+            score_cache=None if args.local_scoring or args.matrix_scoring or posting_index is None else score_cache,
+            checkpoint=checkpoint,
+            cascade_model=cascade_model,
+            escalation_margin=args.escalation_margin,
+            matrix_scoring=args.matrix_scoring,
+            matrix_weights=json.loads(args.matrix_weights) if args.matrix_weights else None,
+            matrix_chunk_cells=args.matrix_chunk_cells,
+            max_workers=args.max_workers
         )
     
-    # Run the converter script to create CSV files in a dedicated directory
-    print("\nConverting tailored JSON to CSV...")
-    if not run_converter_script(tailored_json_path, csv_output_dir, args.type):
-        print("Error: Failed to convert JSON to CSV. Exiting.")
-        sys.exit(1)
-    
-    # Set template name based on type
-    template_name = f"my_{args.type}.rmd"
-    
-    # 8. Run the render script
-    print("\nRendering final document...")
-    # Always use relative paths to avoid permission issues
-    if not run_render_script(template_name, args.output_name, args.html_too, data_dir=csv_output_dir):
-        print("Error: Failed to render document. Exiting.")
-        sys.exit(1)
-    
-    print(f"\nSuccess! Files created:")
-    print(f"- JSON: {tailored_json_path}")
-    print(f"- CSV files: {csv_output_dir}/*.csv")
-    print(f"- PDF: ./output/{args.output_name}.pdf")
-    if args.html_too:
-        print(f"- HTML: ./output/{args.output_name}.html")
+    if summary_pending:
+        raise summary_pending
+    
+    # Remember this posting so similar postings can reuse its results
+    if posting_index is not None and not tailoring_done:
+        record = posting_index.add(job_posting, args.job_posting, job_analysis, score_cache, scoring_settings, args.output_name)
+        print(f"Recorded posting as {record['id']} in {posting_index.path}")
+    checkpoint.complete_stage("tailored_json")
+    
+    local_format = getattr(args, "format", "pdf")
+    local_format = local_format if local_format != "pdf" else None
+    if local_format:
+        # HTML and text formats are rendered in-process from the tailored JSON; no CSV files or R needed
+        local_path = f"./output/{args.output_name}.{local_format}"
+        print(f"\nWriting {local_format} version...")
+        if local_format == "html":
+            seconds = write_html(tailored_json_path, local_path, args.type)
+        else:
+            seconds = write_text(tailored_json_path, local_path, args.type, local_format)
+        checkpoint.complete_stage("render")
+        checkpoint.mark_completed()
+        
+        print(f"\nSuccess! Files created:")
+        print(f"- JSON: {tailored_json_path}")
+        print(f"- {local_format.upper()}: {local_path} (written in {seconds * 1000:.1f} ms)")
+    else:
+        # Run the converter script to create CSV files in a dedicated directory
+        print("\nConverting tailored JSON to CSV...")
+        if checkpoint.stage("csv") and os.path.isdir(csv_output_dir):
+            print(f"CSV files were created before the run stopped: {csv_output_dir}")
+        elif not converter(tailored_json_path, csv_output_dir, args.type):
+            print("Error: Failed to convert JSON to CSV. Exiting.")
+            sys.exit(1)
+        checkpoint.complete_stage("csv")
+        
+        # Set template name based on type
+        template_name = f"my_{args.type}.rmd"
+        
+        # 8. Run the render script
+        print("\nRendering final document...")
+        # Always use relative paths to avoid permission issues
+        if not renderer(template_name, args.output_name, args.html_too, data_dir=csv_output_dir):
+            print("Error: Failed to render document. Exiting.")
+            sys.exit(1)
+        checkpoint.complete_stage("render")
+        checkpoint.mark_completed()
+        
+        print(f"\nSuccess! Files created:")
+        print(f"- JSON: {tailored_json_path}")
+        print(f"- CSV files: {csv_output_dir}/*.csv")
+        print(f"- PDF: ./output/{args.output_name}.pdf")
+        if args.html_too:
+            print(f"- HTML: ./output/{args.output_name}.html")
     
     print("\nAI-assisted improvements:")
     print("1. Created a job-specific professional summary")
     print("2. Selected the most relevant entries based on job requirements")
     if args.improve_descriptions:
         print("3. Improved entry descriptions to better match job requirements")
+    if reuse_record:
+        print(f"\nReused from earlier posting {reuse_record['id']} ({reuse_record['posting_file']}):")
+        print("- Job analysis")
+        if score_cache and not args.use_prompt_only and not args.local_scoring and not args.matrix_scoring:
+            print("- Entry scores for unchanged entries (see the scoring summary above)")
+        print("- The professional summary was regenerated")
+    
+    if args.record:
+        print(f"\nRecorded {ai_client.recorded} API interactions to {args.record}")
+    if args.replay:
+        print(f"\nReplayed {ai_client.served} recorded API responses"
+              + (f"; {ai_client.missed} requests were not in the recording" if ai_client.missed else ""))
     
     print("\nDone!")
+    
+    if local_format:
+        return {"json": tailored_json_path, local_format: local_path}
+    artifacts = {
+        "json": tailored_json_path,
+        "csv_dir": csv_output_dir,
+        "pdf": f"./output/{args.output_name}.pdf"
+    }
+    if args.html_too:
+        artifacts["html"] = f"./output/{args.output_name}.html"
+    return artifacts
+
+def run_batch_pipeline(args: argparse.Namespace, ai_client: Any = None, service: Optional[str] = None, **kwargs) -> Dict[str, str]:
+    """
+    Run a tailoring run through provider batch jobs instead of interactive calls.
+    
+    Each round runs the pipeline with a BatchClient, which answers requests
+    from earlier batches and collects the others. The collected requests are
+    submitted as one batch and polled until it ends, and the next round
+    starts. All rounds share one run checkpoint: the first round creates it
+    and later rounds resume it. Batches, results and the run ID are saved in
+    args.batch_api, so a stopped run continues where it left off.
+    
+    Args:
+        args: Parsed arguments from build_arg_parser()
+        ai_client: Client with batch endpoints (created with setup_ai_client if None)
+        service: Service of ai_client
+        **kwargs: Passed on to run_tailoring_pipeline()
+        
+    Returns:
+        Dictionary of artifact paths of the final round
+    """
+    if ai_client is None:
+        ai_client, service = setup_ai_client(args.ai_service)
+    try:
+        store = BatchStore(args.batch_api, service)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot use batch directory {args.batch_api}: {e}")
+        sys.exit(1)
+    backend = batch_backend(ai_client, service)
+    print(f"Running through {service} batch jobs; state is saved in {args.batch_api}")
+    
+    rounds = 0
+    while True:
+        try:
+            for batch in store.pending_batches():
+                print(f"\nWaiting for batch {batch['id']} (checking every {args.batch_poll_interval:g}s)...")
+                wait_for_batch(backend, store, batch, args.batch_poll_interval)
+        except BatchRequestError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        
+        # Every round resumes the checkpoint of the first; answered requests cost nothing to repeat
+        rounds += 1
+        client = BatchClient(store)
+        print(f"\n--- Batch round {rounds} ({len(store.results)} answered requests) ---")
+        round_args = argparse.Namespace(**vars(args))
+        run_id = store.state.get("run_id")
+        if run_id and os.path.isdir(os.path.join(args.runs_dir, run_id)):
+            round_args.resume = run_id
+        try:
+            artifacts = run_tailoring_pipeline(round_args, ai_client=client, service=service, **kwargs)
+        except BatchPending:
+            artifacts = None
+        finally:
+            if getattr(round_args, "run_id", None) and round_args.run_id != run_id:
+                store.state["run_id"] = round_args.run_id
+                store.save()
+        if not client.collected:
+            break
+        batch_id = backend.submit(client.collected)
+        store.add_batch(batch_id, len(client.collected))
+        print(f"\nSubmitted batch {batch_id} with {len(client.collected)} requests")
+    
+    usage = store.usage()
+    print(f"\nBatch run complete: {usage['requests']} requests answered by {len(store.batches)} batches, "
+          f"{usage['input_tokens']} input and {usage['output_tokens']} output tokens billed at {BATCH_PRICE_FACTOR:.0%} of interactive prices")
+    return artifacts
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Converter Benchmark Suite
+
+This script measures the time and peak memory of the database tools on
+synthetic databases of increasing size:
+
+    load       - parse the JSON database (json_to_csv_converter.load_json_data)
+    filter     - filter entries by document type and company
+    sort       - sort the filtered entries by importance and date
+    csv_write  - full JSON to CSV conversion (all CSV files)
+    roundtrip  - CSV to JSON conversion of the files written by csv_write
+    editor     - load and save through cv_database_editor
+
+Results are written as JSON. When a baseline results file is given, the run
+fails (exit code 1) if any stage got slower or used more memory than the
+threshold allows, so the script can gate changes in CI.
+
+Usage:
+    python benchmark_converters.py --sizes 100,1000,10000 --output bench_results.json
+    python benchmark_converters.py --sizes 100,1000,10000 --baseline bench_results.json --threshold 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import csv_to_json_converter
+import cv_database_editor
+import json_to_csv_converter
+from cv_synthetic_data import write_synthetic_database
+
+STAGES = ["load", "filter", "sort", "csv_write", "roundtrip", "editor"]
+
+# Differences smaller than this are treated as timer noise, not regressions
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_MB = 1.0
+
+def measure(func: Callable[[], object], repeat: int = 3) -> Tuple[float, float]:
+    """
+    Measure a callable's best wall time and peak traced memory.
+
+    Timing and memory are measured in separate runs because tracemalloc
+    slows down allocation-heavy code considerably.
+
+    Returns:
+        Tuple of (best_seconds, peak_megabytes)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best, peak / (1024 * 1024)
+
+def benchmark_size(num_entries: int, work_dir: str, repeat: int = 3, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Run every stage against a synthetic database of the given size."""
+    json_path = os.path.join(work_dir, f"synthetic_{num_entries}.json")
+    csv_dir = os.path.join(work_dir, f"csv_{num_entries}")
+    roundtrip_path = os.path.join(work_dir, f"roundtrip_{num_entries}.json")
+    editor_path = os.path.join(work_dir, f"editor_{num_entries}.json")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        write_synthetic_database(json_path, num_entries, seed)
+    shutil.copyfile(json_path, editor_path)
+
+    data = json_to_csv_converter.load_json_data(json_path)
+    entries = data.get("entries", [])
+    filtered = json_to_csv_converter.filter_entries(entries, "resume", ["biotech"], None, "or")
+
+    def editor_round_trip():
+        database = cv_database_editor.load_database(editor_path)
+        cv_database_editor.save_database(database, editor_path)
+
+    stages = {
+        "load": lambda: json_to_csv_converter.load_json_data(json_path),
+        "filter": lambda: json_to_csv_converter.filter_entries(entries, "resume", ["biotech"], None, "or"),
+        "sort": lambda: json_to_csv_converter.sort_entries(list(filtered)),
+        "csv_write": lambda: json_to_csv_converter.convert_json_to_csv(json_path, csv_dir, "cv"),
+        "roundtrip": lambda: csv_to_json_converter.convert_csv_to_json(csv_dir, roundtrip_path),
+        "editor": editor_round_trip,
+    }
+
+    results = {}
+    for stage in STAGES:
+        seconds, peak_mb = measure(stages[stage], repeat)
+        results[stage] = {"seconds": round(seconds, 6), "peak_mb": round(peak_mb, 3)}
+        print(f"  {stage:<10} {seconds * 1000:10.2f} ms  {peak_mb:10.2f} MB")
+    return results
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return a description of every stage that regressed beyond the threshold."""
+    regressions = []
+    for size, stages in results["sizes"].items():
+        baseline_stages = baseline.get("sizes", {}).get(size)
+        if not baseline_stages:
+            continue
+        for stage, current in stages.items():
+            previous = baseline_stages.get(stage)
+            if not previous:
+                continue
+            time_limit = previous["seconds"] * (1 + threshold)
+            if current["seconds"] > time_limit and current["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{size} entries / {stage}: {current['seconds'] * 1000:.2f} ms "
+                    f"vs baseline {previous['seconds'] * 1000:.2f} ms"
+                )
+            memory_limit = previous["peak_mb"] * (1 + threshold)
+            if current["peak_mb"] > memory_limit and current["peak_mb"] - previous["peak_mb"] > MIN_REGRESSION_MB:
+                regressions.append(
+                    f"{size} entries / {stage}: {current['peak_mb']:.2f} MB peak "
+                    f"vs baseline {previous['peak_mb']:.2f} MB"
+                )
+    return regressions
+
+def run_benchmarks(sizes: List[int], repeat: int = 3, seed: int = 0, work_dir: Optional[str] = None) -> Dict:
+    """Benchmark every size and return the results document."""
+    results = {
+        "meta": {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed
+        },
+        "sizes": {}
+    }
+
+    cleanup = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="cv_bench_")
+    try:
+        for size in sizes:
+            print(f"\nBenchmarking {size} entries...")
+            results["sizes"][str(size)] = benchmark_size(size, work_dir, repeat, seed)
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def main():
+    """Main function to parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark the CV database converters and editor.')
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help='Comma-separated database sizes in entries (default: 100,1000,10000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per stage; the best is kept (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic databases (default: 0)')
+    parser.add_argument('--output', help='Path to write the results JSON')
+    parser.add_argument('--baseline', help='Results JSON from a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown or memory growth relative to the baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--work-dir', help='Directory for generated files (default: a temporary directory)')
+
+    args = parser.parse_args()
+
+    sizes = [int(size.strip()) for size in args.sizes.split(',') if size.strip()]
+    results = run_benchmarks(sizes, args.repeat, args.seed, args.work_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved benchmark results to {args.output}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"Error: Baseline file {args.baseline} does not exist")
+            sys.exit(1)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nPerformance regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} compared to {args.baseline}")
+
+if __name__ == "__main__":
+    main()
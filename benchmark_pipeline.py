@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+End-to-End Pipeline Benchmark
+
+This script runs the whole AI CV generator pipeline (run_tailoring_pipeline,
+as called by main()) against synthetic databases with a fake AI client
+(fake_ai_client.py), so the local work can be measured without API keys and
+separated from the time spent waiting on the API. The fake client's latency,
+failure rate and response sizes are set on the command line.
+
+For every database size and concurrency setting (--max-workers) it reports,
+per stage:
+
+    analysis    - job posting analysis
+    summary     - job-specific summary
+    tailoring   - entry scoring and selection (or the prompt-only / map-reduce requests)
+    conversion  - JSON to CSV conversion
+    rendering   - R rendering (only with --render, which needs R)
+
+the wall time, API calls, failed calls and estimated tokens, and the peak RSS
+of the whole run. Each run happens in its own Python process, so peak RSS is
+not carried over from one run to the next.
+
+Results are written as JSON and can be compared against a baseline results
+file like the converter benchmarks (benchmark_converters.py).
+
+Usage:
+    python benchmark_pipeline.py --sizes 10,100,1000 --workers 1,4 --output pipeline_bench.json
+    python benchmark_pipeline.py --mode map-reduce --latency 0.5 --failure-rate 0.02
+    python benchmark_pipeline.py --baseline pipeline_bench.json --threshold 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Peak RSS comes from the resource module, which is not available on Windows
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+STAGES = ["analysis", "summary", "tailoring", "conversion", "rendering"]
+
+MODES = {
+    "entry": [],
+    "prompt-only": ["--use-prompt-only"],
+    "map-reduce": ["--map-reduce"],
+    "local": ["--local-scoring"],
+    "matrix": ["--matrix-scoring"],
+}
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_POSTING = os.path.join(REPO_DIR, "sample_job_posting.txt")
+
+# Differences smaller than this are treated as timer noise, not regressions
+MIN_REGRESSION_SECONDS = 0.05
+MIN_REGRESSION_MB = 5.0
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where it cannot be measured)."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class StageRecorder:
+    """Times pipeline functions and attributes the fake client's calls and tokens to stages."""
+
+    def __init__(self, client):
+        self.client = client
+        self.stages = {}
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            before = self.client.stats()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                after = self.client.stats()
+                record = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "failures": 0,
+                                                        "input_tokens": 0, "output_tokens": 0})
+                record["seconds"] = round(record["seconds"] + elapsed, 6)
+                for key in ("calls", "failures", "input_tokens", "output_tokens"):
+                    record[key] += after[key] - before[key]
+        return timed
+
+def run_pipeline_once(config: Dict) -> Dict:
+    """
+    Run the pipeline once in this process and return its measurements.
+
+    Args:
+        config: Size, workers, mode, fake client settings and paths (see benchmark_run)
+
+    Returns:
+        Dictionary with status, total seconds, peak RSS, totals and per-stage measurements
+    """
+    import ai_cv_generator
+    from fake_ai_client import FakeAIClient
+    from tailoring_server import convert_in_process
+
+    client = FakeAIClient(config["latency"], config["jitter"], config["failure_rate"],
+                          config["response_words"], config["seed"])
+    recorder = StageRecorder(client)
+
+    argv = ["--job-posting", JOB_POSTING, "--cv-data", config["database"],
+            "--output-name", f"bench_{config['size']}_{config['workers']}",
+            "--max-workers", str(config["workers"]), "--runs-dir", "runs", "--no-reuse",
+            *MODES[config["mode"]], *config.get("extra_args", [])]
+    args = ai_cv_generator.build_arg_parser().parse_args(argv)
+
+    def render(template_path, output_name, html_too=False, data_dir=None):
+        # render.r and the templates live in the repository, the CSV files in the work directory
+        data_dir = os.path.abspath(data_dir)
+        cwd = os.getcwd()
+        os.chdir(REPO_DIR)
+        try:
+            return ai_cv_generator.run_render_script(template_path, output_name, html_too, data_dir=data_dir)
+        finally:
+            os.chdir(cwd)
+
+    patched = {name: getattr(ai_cv_generator, name) for name in (
+        "analyze_job_posting", "create_job_specific_summary", "create_tailored_json",
+        "create_tailored_cv_with_prompt", "create_tailored_cv_map_reduce")}
+    ai_cv_generator.analyze_job_posting = recorder.wrap("analysis", patched["analyze_job_posting"])
+    ai_cv_generator.create_job_specific_summary = recorder.wrap("summary", patched["create_job_specific_summary"])
+    for name in ("create_tailored_json", "create_tailored_cv_with_prompt", "create_tailored_cv_map_reduce"):
+        setattr(ai_cv_generator, name, recorder.wrap("tailoring", patched[name]))
+
+    status = "ok"
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ai_cv_generator.run_tailoring_pipeline(
+                args, ai_client=client, service="openai",
+                converter=recorder.wrap("conversion", convert_in_process),
+                renderer=recorder.wrap("rendering", render) if config["render"] else (lambda *a, **k: True)
+            )
+    except SystemExit:
+        status = "failed"
+    except Exception as e:
+        status = f"error: {e}"
+    finally:
+        for name, func in patched.items():
+            setattr(ai_cv_generator, name, func)
+    total = time.perf_counter() - started
+
+    return {
+        "status": status,
+        "seconds": round(total, 6),
+        "peak_rss_mb": None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+        "totals": client.stats(),
+        "stages": {stage: recorder.stages[stage] for stage in STAGES if stage in recorder.stages}
+    }
+
+def benchmark_run(config: Dict, work_dir: str) -> Dict:
+    """Run the pipeline in a fresh Python process, inside work_dir, and return its measurements."""
+    run_dir = os.path.join(work_dir, f"run_{config['size']}_{config['workers']}")
+    os.makedirs(run_dir, exist_ok=True)
+    result_path = os.path.join(run_dir, "result.json")
+    cmd = [sys.executable, os.path.abspath(__file__), "--run-config", json.dumps(config), "--result-file", result_path]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run(cmd, cwd=run_dir, env=env, capture_output=True, text=True)
+    if completed.returncode != 0 or not os.path.exists(result_path):
+        return {"status": f"error: {completed.stderr.strip()[-500:]}", "stages": {}}
+    with open(result_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return a description of every run or stage that regressed beyond the threshold."""
+    regressions = []
+    for key, current in results["runs"].items():
+        previous = baseline.get("runs", {}).get(key)
+        if not previous or current.get("status") != "ok" or previous.get("status") != "ok":
+            continue
+        for stage, stage_result in current["stages"].items():
+            previous_stage = previous["stages"].get(stage)
+            if not previous_stage:
+                continue
+            if (stage_result["seconds"] > previous_stage["seconds"] * (1 + threshold)
+                    and stage_result["seconds"] - previous_stage["seconds"] > MIN_REGRESSION_SECONDS):
+                regressions.append(f"{key} / {stage}: {stage_result['seconds']:.2f} s vs baseline {previous_stage['seconds']:.2f} s")
+            for counter in ("calls", "input_tokens", "output_tokens"):
+                if stage_result[counter] > previous_stage[counter] * (1 + threshold):
+                    regressions.append(f"{key} / {stage}: {stage_result[counter]} {counter.replace('_', ' ')} "
+                                       f"vs baseline {previous_stage[counter]}")
+        if current.get("peak_rss_mb") and previous.get("peak_rss_mb"):
+            if (current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + threshold)
+                    and current["peak_rss_mb"] - previous["peak_rss_mb"] > MIN_REGRESSION_MB):
+                regressions.append(f"{key}: {current['peak_rss_mb']:.1f} MB peak RSS vs baseline {previous['peak_rss_mb']:.1f} MB")
+    return regressions
+
+def print_run(result: Dict) -> None:
+    if result.get("status") != "ok":
+        print(f"  {result.get('status')}")
+    for stage, stage_result in result.get("stages", {}).items():
+        print(f"  {stage:<11} {stage_result['seconds']:9.3f} s  {stage_result['calls']:6d} calls  "
+              f"{stage_result['failures']:4d} failed  {stage_result['input_tokens']:9d} in  {stage_result['output_tokens']:8d} out")
+    if "seconds" in result:
+        rss = f", peak RSS {result['peak_rss_mb']:.1f} MB" if result.get("peak_rss_mb") is not None else ""
+        print(f"  {'total':<11} {result['seconds']:9.3f} s{rss}")
+
+def run_benchmarks(sizes: List[int], workers: List[int], mode: str = "entry", latency: float = 0.005,
+                   jitter: float = 0.0, failure_rate: float = 0.0, response_words: int = 0, seed: int = 0,
+                   render: bool = False, work_dir: Optional[str] = None) -> Dict:
+    """Benchmark every size and concurrency setting and return the results document."""
+    from cv_synthetic_data import write_synthetic_database
+
+    results = {
+        "meta": {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": mode,
+            "latency": latency,
+            "jitter": jitter,
+            "failure_rate": failure_rate,
+            "response_words": response_words,
+            "seed": seed,
+            "render": render
+        },
+        "runs": {}
+    }
+
+    cleanup = work_dir is None
+    work_dir = os.path.abspath(work_dir or tempfile.mkdtemp(prefix="cv_pipeline_bench_"))
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        for size in sizes:
+            database = os.path.join(work_dir, f"synthetic_{size}.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                write_synthetic_database(database, size, seed)
+            for worker_count in workers:
+                print(f"\nBenchmarking {size} entries with {worker_count} workers ({mode})...")
+                config = {"size": size, "workers": worker_count, "mode": mode, "database": database,
+                          "latency": latency, "jitter": jitter, "failure_rate": failure_rate,
+                          "response_words": response_words, "seed": seed, "render": render}
+                result = benchmark_run(config, work_dir)
+                results["runs"][f"{mode}/{size}x{worker_count}"] = dict(result, mode=mode, size=size, workers=worker_count)
+                print_run(result)
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def main():
+    """Main function to parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark the AI CV generator pipeline end to end with a fake AI client.')
+    parser.add_argument('--sizes', default='10,100,1000,10000',
+                        help='Comma-separated database sizes in entries (default: 10,100,1000,10000)')
+    parser.add_argument('--workers', default='1,4',
+                        help='Comma-separated --max-workers settings (default: 1,4)')
+    parser.add_argument('--mode', choices=list(MODES), default='entry',
+                        help='Tailoring approach: entry (entry-by-entry scoring), prompt-only, map-reduce, local or matrix (default: entry)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds every fake API call takes (default: 0.005)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random seconds per call, 0 to this value (default: 0)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability (0-1) that a fake API call fails (default: 0)')
+    parser.add_argument('--response-words', type=int, default=0,
+                        help='Filler words added to every free-text field of the fake responses (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic databases and the fake client (default: 0)')
+    parser.add_argument('--render', action='store_true', help='Include the R rendering stage (requires R)')
+    parser.add_argument('--output', help='Path to write the results JSON')
+    parser.add_argument('--baseline', help='Results JSON from a previous run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown or growth in calls, tokens and memory relative to the baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--work-dir', help='Directory for generated files (default: a temporary directory)')
+    # Used internally to run a single configuration in a fresh process
+    parser.add_argument('--run-config', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_config:
+        result = run_pipeline_once(json.loads(args.run_config))
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        return
+
+    sizes = [int(size.strip()) for size in args.sizes.split(',') if size.strip()]
+    workers = [int(count.strip()) for count in args.workers.split(',') if count.strip()]
+    results = run_benchmarks(sizes, workers, args.mode, args.latency, args.jitter, args.failure_rate,
+                             args.response_words, args.seed, args.render, args.work_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved benchmark results to {args.output}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"Error: Baseline file {args.baseline} does not exist")
+            sys.exit(1)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nPerformance regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} compared to {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Pool of Warm Headless Chrome Instances for PDF Printing
+
+pagedown::chrome_print() starts a new Chrome process for every PDF, so each
+render pays for browser start-up, a fresh profile and a new DevTools
+connection before page layout even begins. This module keeps a pool of
+headless Chrome instances running with remote debugging enabled and prints
+with them over the Chrome DevTools Protocol:
+
+    - each instance keeps one page open and its DevTools connection alive
+    - a print navigates that page to the HTML file, waits until the document
+      (and paged.js, if the page uses it) has finished laying out, and calls
+      Page.printToPDF - the per-PDF cost is page layout and printing alone
+    - an instance is recycled after --max-prints prints, and replaced (with
+      the print retried once) when it crashes or stops responding
+
+The pool is shared by render.r and the Python side through a small HTTP
+endpoint. When CV_CHROME_POOL is set, render.r sends its prints to the pool
+and falls back to pagedown::chrome_print() if the pool cannot print:
+
+    python chrome_pool.py --serve --size 2
+    export CV_CHROME_POOL=http://127.0.0.1:8766
+    python ai_cv_generator.py --job-posting job.txt
+
+tailoring_server.py starts a pool of its own (--chrome-pool) and hands it to
+its render workers. Python code can print directly:
+
+    pool = ChromePool(size=2)
+    pool.print_pdf("MyResume.html", "MyResume.pdf")
+    pool.close()
+
+API (--serve):
+    POST /print    {"input": "/abs/path.html", "output": "/abs/path.pdf", "timeout": 60}
+    GET  /health   pool statistics
+
+Only the standard library is used; the WebSocket client is a minimal one
+that covers what the DevTools Protocol needs.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import os
+import queue
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_POOL_PORT = 8766
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PRINTS = 50
+DEFAULT_PRINT_TIMEOUT = 60.0
+
+# The same locations render.r checks before falling back to PAGEDOWN_CHROME
+CHROME_PATHS = [
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "/Applications/Chrome.app/Contents/MacOS/Chrome",
+    "/usr/bin/google-chrome",
+    "/usr/bin/chromium-browser",
+    "/mnt/c/Program Files/Google/Chrome/Application/chrome.exe",
+    "/mnt/c/Program Files (x86)/Google/Chrome/Application/chrome.exe"
+]
+CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+# The arguments render.r passes to pagedown, plus remote debugging on a free port
+CHROME_ARGS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--remote-debugging-port=0",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions"
+]
+
+# Resolves once the document has loaded and, for paged.js documents, once all pages are laid out
+READY_EXPRESSION = """
+new Promise(resolve => {
+  if (document.readyState === 'complete') resolve();
+  else window.addEventListener('load', () => resolve());
+}).then(() => window.pagedownReady || null).then(() => {
+  if (!window.PagedPolyfill && !document.querySelector('.pagedjs_pages')) return true;
+  return new Promise(resolve => {
+    let last = -1, stable = 0;
+    const check = () => {
+      const pages = document.querySelectorAll('.pagedjs_page').length;
+      stable = pages > 0 && pages === last ? stable + 1 : 0;
+      last = pages;
+      if (stable >= 3) resolve(true); else setTimeout(check, 50);
+    };
+    check();
+  });
+})
+"""
+
+class ChromeError(Exception):
+    """Chrome could not be started or could not print a document."""
+
+class ChromeCrashed(ChromeError):
+    """The Chrome instance died or its DevTools connection broke."""
+
+def find_chrome() -> Optional[str]:
+    """Chrome executable from PAGEDOWN_CHROME, the locations render.r checks, or the PATH."""
+    env_chrome = os.environ.get("PAGEDOWN_CHROME")
+    if env_chrome and os.path.exists(env_chrome):
+        return env_chrome
+    for path in CHROME_PATHS:
+        if os.path.exists(path):
+            return path
+    for command in CHROME_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return path
+    return None
+
+class DevToolsConnection:
+    """Minimal WebSocket client speaking the Chrome DevTools Protocol."""
+
+    def __init__(self, host: str, port: int, path: str, timeout: float = 10.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self._buffer = b""
+        self._ids = itertools.count(1)
+        self._handshake(host, port, path)
+
+    def _handshake(self, host: str, port: int, path: str) -> None:
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        self.sock.sendall((
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode("ascii"))
+        while b"\r\n\r\n" not in self._buffer:
+            self._buffer += self._recv_some()
+        headers, self._buffer = self._buffer.split(b"\r\n\r\n", 1)
+        status_line = headers.split(b"\r\n", 1)[0].decode("latin-1")
+        if " 101 " not in status_line + " ":
+            raise ChromeCrashed(f"DevTools handshake failed: {status_line}")
+
+    def _recv_some(self) -> bytes:
+        try:
+            data = self.sock.recv(65536)
+        except socket.timeout:
+            raise
+        except OSError as e:
+            raise ChromeCrashed(f"DevTools connection lost: {e}")
+        if not data:
+            raise ChromeCrashed("DevTools connection closed")
+        return data
+
+    def _recv_exact(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            self._buffer += self._recv_some()
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([0x80 | len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([0x80 | 126]) + struct.pack("!H", len(payload))
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", len(payload))
+        # Client frames must be masked
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        try:
+            self.sock.sendall(header + mask + masked)
+        except OSError as e:
+            raise ChromeCrashed(f"DevTools connection lost: {e}")
+
+    def _recv_message(self) -> str:
+        message = b""
+        while True:
+            first, second = self._recv_exact(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._recv_exact(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._recv_exact(8))[0]
+            mask = self._recv_exact(4) if second & 0x80 else None
+            payload = self._recv_exact(length)
+            if mask:
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+            if opcode == 0x8:
+                raise ChromeCrashed("DevTools connection closed by Chrome")
+            if opcode == 0x9:
+                self._send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode("utf-8")
+
+    def send(self, method: str, params: Optional[Dict] = None, session_id: Optional[str] = None,
+             timeout: float = DEFAULT_PRINT_TIMEOUT) -> Dict:
+        """
+        Send a DevTools command and wait for its result (events are skipped).
+
+        Raises:
+            ChromeError: If the command fails
+            ChromeCrashed: If the connection breaks or the command times out
+        """
+        message_id = next(self._ids)
+        command = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            command["sessionId"] = session_id
+        self._send_frame(0x1, json.dumps(command).encode("utf-8"))
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ChromeCrashed(f"{method} timed out after {timeout:.0f}s")
+            self.sock.settimeout(remaining)
+            try:
+                reply = json.loads(self._recv_message())
+            except socket.timeout:
+                raise ChromeCrashed(f"{method} timed out after {timeout:.0f}s")
+            if reply.get("id") != message_id:
+                continue
+            if "error" in reply:
+                raise ChromeError(f"{method} failed: {reply['error'].get('message', reply['error'])}")
+            return reply.get("result", {})
+
+    def close(self) -> None:
+        try:
+            self._send_frame(0x8, b"")
+        except ChromeError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class ChromeInstance:
+    """One headless Chrome process with a page kept open for printing."""
+
+    def __init__(self, chrome_path: str, startup_timeout: float = 20.0):
+        self.chrome_path = chrome_path
+        self.prints = 0
+        self.profile_dir = tempfile.mkdtemp(prefix="cv_chrome_pool_")
+        self.process = subprocess.Popen(
+            [chrome_path] + CHROME_ARGS + [f"--user-data-dir={self.profile_dir}", "about:blank"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self.connection = None
+        self.session_id = None
+        try:
+            port, browser_path = self._wait_for_devtools(startup_timeout)
+            self.connection = DevToolsConnection("127.0.0.1", port, browser_path)
+            target = self.connection.send("Target.createTarget", {"url": "about:blank"})
+            self.session_id = self.connection.send(
+                "Target.attachToTarget", {"targetId": target["targetId"], "flatten": True})["sessionId"]
+        except Exception:
+            self.close()
+            raise
+
+    def _wait_for_devtools(self, timeout: float) -> Tuple[int, str]:
+        # Chrome writes the port it picked and the browser's WebSocket path to this file
+        active_port = os.path.join(self.profile_dir, "DevToolsActivePort")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise ChromeCrashed(f"Chrome exited during start-up (code {self.process.returncode})")
+            try:
+                with open(active_port, 'r', encoding='utf-8') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    return int(lines[0]), lines[1]
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.05)
+        raise ChromeError(f"Chrome did not open a DevTools port within {timeout:.0f}s")
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None and self.connection is not None
+
+    def print_pdf(self, input_path: str, output_path: str, timeout: float = DEFAULT_PRINT_TIMEOUT) -> None:
+        """
+        Lay out an HTML file and print it to PDF.
+
+        Raises:
+            ChromeError: If the document cannot be printed
+            ChromeCrashed: If the instance died or stopped responding
+        """
+        deadline = time.monotonic() + timeout
+
+        def remaining() -> float:
+            return max(deadline - time.monotonic(), 0.001)
+
+        self.connection.send("Page.navigate", {"url": Path(os.path.abspath(input_path)).as_uri()},
+                             self.session_id, remaining())
+        ready = self.connection.send("Runtime.evaluate", {"expression": READY_EXPRESSION, "awaitPromise": True,
+                                                          "returnByValue": True}, self.session_id, remaining())
+        if "exceptionDetails" in ready:
+            raise ChromeError(f"Page failed to lay out: {ready['exceptionDetails'].get('text', 'script error')}")
+        result = self.connection.send("Page.printToPDF", {"printBackground": True, "preferCSSPageSize": True},
+                                      self.session_id, remaining())
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(base64.b64decode(result["data"]))
+        os.replace(tmp_path, output_path)
+        self.prints += 1
+
+    def close(self) -> None:
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+class ChromePool:
+    """A fixed number of warm Chrome instances handed out to prints one at a time."""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_prints: int = DEFAULT_MAX_PRINTS,
+                 chrome_path: Optional[str] = None):
+        """
+        Args:
+            size: Number of Chrome instances (prints beyond this wait for a free instance)
+            max_prints: Prints after which an instance is replaced by a fresh one
+            chrome_path: Chrome executable (found with find_chrome() if not given)
+
+        Raises:
+            ChromeError: If no Chrome executable is found
+        """
+        self.chrome_path = chrome_path or find_chrome()
+        if not self.chrome_path:
+            raise ChromeError("Chrome not found; set PAGEDOWN_CHROME to the path of your Chrome executable")
+        self.size = max(1, size)
+        self.max_prints = max(1, max_prints)
+        self.closed = False
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "prints": 0, "failures": 0, "recycled": 0, "crashes": 0, "print_seconds": 0.0}
+        self._all = []
+        # Instances are started on first use; None marks a slot without a running instance
+        self._idle = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Instances started, prints, failures, recycled and crashed instances and the mean print time."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.size
+        stats["mean_print_seconds"] = round(stats.pop("print_seconds") / stats["prints"], 3) if stats["prints"] else None
+        return stats
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _start_instance(self) -> ChromeInstance:
+        instance = ChromeInstance(self.chrome_path)
+        self._count("started")
+        with self._lock:
+            self._all.append(instance)
+        return instance
+
+    def _retire(self, instance: Optional[ChromeInstance]) -> None:
+        if instance is None:
+            return
+        instance.close()
+        with self._lock:
+            if instance in self._all:
+                self._all.remove(instance)
+
+    def _acquire(self, timeout: float) -> Optional[ChromeInstance]:
+        try:
+            instance = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ChromeError(f"No Chrome instance became free within {timeout:.0f}s")
+        if instance is not None and not instance.is_alive():
+            self._count("crashes")
+            self._retire(instance)
+            instance = None
+        return instance
+
+    def _release(self, instance: Optional[ChromeInstance]) -> None:
+        if instance is not None and (self.closed or instance.prints >= self.max_prints):
+            if not self.closed:
+                self._count("recycled")
+            self._retire(instance)
+            instance = None
+        self._idle.put(instance)
+
+    def print_pdf(self, input_path: str, output_path: str, timeout: float = DEFAULT_PRINT_TIMEOUT) -> float:
+        """
+        Print an HTML file to PDF with a pooled Chrome instance.
+
+        A print that fails because the instance crashed is retried once with a
+        fresh instance.
+
+        Args:
+            input_path: HTML file to print
+            output_path: PDF file to write
+            timeout: Seconds to wait for a free instance and again for the print itself
+
+        Returns:
+            Seconds the print took (without waiting for a free instance)
+
+        Raises:
+            ChromeError: If the document cannot be printed
+        """
+        if self.closed:
+            raise ChromeError("Chrome pool is closed")
+        if not os.path.exists(input_path):
+            raise ChromeError(f"HTML file '{input_path}' not found")
+
+        instance = self._acquire(timeout)
+        try:
+            for attempt in range(2):
+                if instance is None:
+                    instance = self._start_instance()
+                started = time.perf_counter()
+                try:
+                    instance.print_pdf(input_path, output_path, timeout)
+                except ChromeCrashed:
+                    self._count("crashes")
+                    self._retire(instance)
+                    instance = None
+                    if attempt == 1:
+                        raise
+                    continue
+                seconds = time.perf_counter() - started
+                self._count("prints")
+                self._count("print_seconds", seconds)
+                return seconds
+        except ChromeError:
+            self._count("failures")
+            raise
+        finally:
+            self._release(instance)
+
+    def close(self) -> None:
+        """Stop all Chrome instances."""
+        self.closed = True
+        with self._lock:
+            instances = list(self._all)
+            self._all.clear()
+        for instance in instances:
+            instance.close()
+
+def make_handler(pool: ChromePool):
+    """Build the HTTP request handler class bound to a pool."""
+
+    class ChromePoolRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path.split("?")[0].rstrip("/") != "/print":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length).decode("utf-8"))
+                input_path, output_path = request["input"], request["output"]
+                timeout = float(request.get("timeout", DEFAULT_PRINT_TIMEOUT))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._send_json(400, {"error": "Request body must be a JSON object with \"input\" and \"output\""})
+                return
+            try:
+                seconds = pool.print_pdf(input_path, output_path, timeout)
+            except ChromeError as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, {"output": output_path, "seconds": round(seconds, 3)})
+
+        def do_GET(self):
+            if self.path.split("?")[0].rstrip("/") == "/health":
+                self._send_json(200, dict(pool.stats(), status="ok"))
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ChromePoolRequestHandler
+
+def serve_pool(pool: ChromePool, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serve a pool's HTTP endpoint from a background thread.
+
+    Args:
+        pool: Pool to serve
+        host: Address to listen on
+        port: Port to listen on (0 picks a free port)
+
+    Returns:
+        Tuple of (server, URL for CV_CHROME_POOL); stop it with server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(pool))
+    threading.Thread(target=server.serve_forever, name="chrome-pool-http", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    """Main function to serve a Chrome pool or print files with one."""
+    parser = argparse.ArgumentParser(description='Keep warm headless Chrome instances for PDF printing.')
+    parser.add_argument('files', nargs='*', help='HTML file and PDF output pairs to print (without --serve)')
+    parser.add_argument('--serve', action='store_true', help='Serve the pool over HTTP for render.r (CV_CHROME_POOL)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_POOL_PORT, help=f'Port to listen on (default: {DEFAULT_POOL_PORT})')
+    parser.add_argument('--size', type=int, default=DEFAULT_POOL_SIZE, help=f'Number of Chrome instances (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--max-prints', type=int, default=DEFAULT_MAX_PRINTS,
+                        help=f'Prints after which an instance is replaced (default: {DEFAULT_MAX_PRINTS})')
+    parser.add_argument('--chrome', help='Chrome executable (default: PAGEDOWN_CHROME or a standard location)')
+
+    args = parser.parse_args()
+    if not args.serve and (not args.files or len(args.files) % 2):
+        parser.error("give HTML and PDF file pairs, or --serve")
+
+    try:
+        pool = ChromePool(args.size, args.max_prints, args.chrome)
+    except ChromeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    try:
+        if args.serve:
+            server = ThreadingHTTPServer((args.host, args.port), make_handler(pool))
+            print(f"Chrome pool with {pool.size} instances listening on http://{args.host}:{args.port}")
+            print(f"Send render.r prints to it with: export CV_CHROME_POOL=http://{args.host}:{args.port}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                print("\nShutting down...")
+            finally:
+                server.server_close()
+        else:
+            for input_path, output_path in zip(args.files[::2], args.files[1::2]):
+                try:
+                    seconds = pool.print_pdf(input_path, output_path)
+                    print(f"Printed {output_path} in {seconds:.2f}s")
+                except ChromeError as e:
+                    print(f"Error printing {input_path}: {e}")
+        print(f"Pool statistics: {pool.stats()}")
+    finally:
+        pool.close()
+
+if __name__ == "__main__":
+    main()
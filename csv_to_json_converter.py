@@ -17,6 +17,9 @@ import sys
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from cv_schema import validate_or_exit
+from cv_embeddings import update_embedding_cache
+
 def read_csv_file(file_path: str, has_explanation_row: bool = False) -> List[Dict]:
     """Read a CSV file and return its data as a list of dictionaries.
     
@@ -308,6 +311,9 @@ def convert_csv_to_json(input_dir: str, output_file: str) -> None:
         'skills': parse_aside_sections_and_entries(aside_sections_data, aside_entries_data)
     }
     
+    # Catch conversion problems before they reach the database
+    validate_or_exit(json_data, f"data converted from {input_dir}")
+    
     # Write JSON file
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -318,6 +324,9 @@ def convert_csv_to_json(input_dir: str, output_file: str) -> None:
     except Exception as e:
         print(f"Error writing JSON file: {e}")
         sys.exit(1)
+    
+    # Embed new or changed entries and bullets for local relevance scoring
+    update_embedding_cache(json_data, output_file)
 
 def main():
     """Main function to parse arguments and run the conversion."""
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Approximate Nearest-Neighbor Index over Entry and Bullet Embeddings
+
+For large banks (every publication, talk and grant as its own bullet) even a
+single brute-force matrix-vector product per posting gets slow. This module
+keeps an inverted-file (IVF) index over the vectors of the local embedding
+cache (cv_embeddings.py), built with numpy only:
+
+    - the vectors are clustered with spherical k-means into ~sqrt(N) lists
+    - a query is compared to the list centroids, and only the vectors of the
+      closest lists are scored
+    - within each list the vectors are grouped by section, so a query for
+      one section scores only that section's vectors, and stops as soon as
+      all of them have been scored
+
+The index lives next to the database (cv_database.ann.json with the list
+assignments and block layout, cv_database.ann_centroids.npy with the
+centroids, cv_database.ann_blocks.npy with the vectors in list order and
+cv_database.ann_appended.npy with the vectors inserted since, both opened
+memory-mapped). It is updated incrementally whenever the embedding cache is:
+new texts are assigned to their nearest list and appended, removed texts
+are marked deleted, and the blocks are laid out again only once the appended
+and deleted rows make up a quarter of them. The centroids are retrained only
+when the bank has grown well beyond the size they were trained on.
+
+Usage:
+    from cv_ann_index import load_ann_index
+
+    index = load_ann_index(database, "cv_database.json")
+    for item, score in index.top_k("spatial transcriptomics", k=5, section="software"):
+        print(item['entry'], score)
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from cv_embeddings import NUMPY_AVAILABLE, EmbeddingCache, embed_text, refresh_embedding_cache, write_npy_rows
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+INDEX_VERSION = 3
+
+# Banks smaller than this are kept in a single list (exact search)
+MIN_VECTORS_FOR_LISTS = 1024
+MAX_LISTS = 4096
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_SIZE = 20000
+# Retrain the centroids when the bank grows past this multiple of the training size
+RETRAIN_GROWTH = 4.0
+# Lists searched per query: recall vs. latency (raise for better recall on large banks)
+DEFAULT_NPROBE = 16
+# Lay the list blocks out again once appended and deleted rows exceed this fraction of them
+COMPACT_FRACTION = 0.25
+
+def ann_paths_for(database_path: str) -> Tuple[str, str, str, str]:
+    """Return the (.json assignments and layout, .npy centroids, .npy list blocks, .npy appended rows) paths stored next to the database."""
+    stem = os.path.splitext(database_path)[0]
+    return stem + ".ann.json", stem + ".ann_centroids.npy", stem + ".ann_blocks.npy", stem + ".ann_appended.npy"
+
+def train_centroids(vectors: "np.ndarray", num_lists: int, seed: int = 0) -> "np.ndarray":
+    """Cluster unit vectors with spherical k-means and return the unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE_SIZE:
+        vectors = vectors[rng.choice(len(vectors), KMEANS_SAMPLE_SIZE, replace=False)]
+    centroids = np.array(vectors[rng.choice(len(vectors), num_lists, replace=False)], dtype=np.float32)
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for list_id in range(num_lists):
+            members = vectors[assignments == list_id]
+            if len(members):
+                centroids[list_id] = members.sum(axis=0)
+            else:
+                # Re-seed empty lists so every centroid stays useful
+                centroids[list_id] = vectors[rng.integers(len(vectors))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms > 0, norms, 1.0)
+    return centroids
+
+def _num_lists_for(size: int) -> int:
+    if size < MIN_VECTORS_FOR_LISTS:
+        return 1
+    return min(MAX_LISTS, int(np.sqrt(size)))
+
+def build_list_blocks(cache: EmbeddingCache, assignments: Dict[str, int]) -> Tuple["np.ndarray", Dict]:
+    """
+    Lay out the vectors as one contiguous block per list, sorted by section within each list.
+
+    Every distinct (content hash, section) pair gets one row, shared by all
+    items with that text in that section.
+
+    Returns:
+        Tuple of (vectors in block order, layout). The layout holds the
+        database digest of the cache, the [hash, section] key of each row,
+        the row of each item, a [list, section, start, end] span for every
+        section of every list, and the (still empty) appended rows and
+        tombstones.
+    """
+    first_item = {}
+    for item_id, item in enumerate(cache.items):
+        first_item.setdefault((item['hash'], item['section']), item_id)
+    order = sorted(first_item, key=lambda key: (assignments[key[0]], key[1], first_item[key]))
+    rows = cache.id_map['rows']
+    blocks = np.asarray(cache.matrix[[rows[content_hash] for content_hash, _ in order]],
+                        dtype=np.float32).reshape(len(order), cache.matrix.shape[1])
+    spans = []
+    for row, (content_hash, section) in enumerate(order):
+        list_id = assignments[content_hash]
+        if spans and spans[-1][0] == list_id and spans[-1][1] == section:
+            spans[-1][3] = row + 1
+        else:
+            spans.append([list_id, section, row, row + 1])
+    key_rows = {key: row for row, key in enumerate(order)}
+    return blocks, {
+        'database_digest': cache.id_map.get('database_digest'),
+        'keys': [list(key) for key in order],
+        'item_rows': [key_rows[(item['hash'], item['section'])] for item in cache.items],
+        'base_rows': len(order),
+        'spans': spans,
+        'appended_lists': [],
+        'tombstones': [],
+    }
+
+def _segment(matrix: "np.ndarray", start: int, end: int, live: "np.ndarray", row_offset: int) -> Optional[Tuple]:
+    """Rows start:end of a matrix without their tombstones, as (matrix, selector, index rows), or None if none are left."""
+    span_live = live[row_offset + start:row_offset + end]
+    if span_live.all():
+        return matrix, slice(start, end), np.arange(row_offset + start, row_offset + end)
+    positions = start + np.flatnonzero(span_live)
+    if not len(positions):
+        return None
+    return matrix, positions, row_offset + positions
+
+class AnnIndex:
+    """In-memory view of the IVF index used for queries."""
+
+    def __init__(self, centroids: "np.ndarray", blocks: "np.ndarray", appended: "np.ndarray", layout: Dict, cache: EmbeddingCache):
+        self.centroids = centroids
+        # Vectors of all lists, one contiguous block per list (see build_list_blocks),
+        # and the vectors inserted since, in insertion order
+        self.blocks = blocks
+        self.appended = appended
+        base_rows = layout['base_rows']
+        live = np.ones(base_rows + len(layout['appended_lists']), dtype=bool)
+        live[layout['tombstones']] = False
+
+        # Items behind each row (base rows, then appended rows) are
+        # items[item_order[row_starts[row]:row_starts[row + 1]]]; deleted rows have none
+        self.items = cache.items
+        item_rows = np.array(layout['item_rows'], dtype=np.int64)
+        self.item_order = np.argsort(item_rows, kind='stable')
+        self.row_starts = np.searchsorted(item_rows[self.item_order], np.arange(len(layout['keys']) + 1))
+
+        # Segments of each list, and of each section within each list:
+        # (matrix, selector into the matrix, index rows of the selected vectors)
+        self.list_segments = {}
+        self.section_segments = {}
+        list_bounds = {}
+        for list_id, section, start, end in layout['spans']:
+            segment = _segment(blocks, start, end, live, 0)
+            if segment:
+                self.section_segments.setdefault(section, {}).setdefault(list_id, []).append(segment)
+            list_bounds[list_id] = (list_bounds.get(list_id, (start, end))[0], end)
+        for list_id, (start, end) in list_bounds.items():
+            segment = _segment(blocks, start, end, live, 0)
+            if segment:
+                self.list_segments.setdefault(list_id, []).append(segment)
+
+        appended_rows = {}
+        for offset, list_id in enumerate(layout['appended_lists']):
+            if live[base_rows + offset]:
+                section = layout['keys'][base_rows + offset][1]
+                appended_rows.setdefault((list_id, section), []).append(offset)
+                appended_rows.setdefault((list_id, None), []).append(offset)
+        for (list_id, section), offsets in appended_rows.items():
+            offsets = np.array(offsets, dtype=np.int64)
+            segments = self.list_segments if section is None else self.section_segments.setdefault(section, {})
+            segments.setdefault(list_id, []).append((appended, offsets, base_rows + offsets))
+
+    def top_k(self, query: str, k: int = 10, section: Optional[str] = None, nprobe: int = DEFAULT_NPROBE) -> List[Tuple[Dict, float]]:
+        """
+        Return the k items most similar to the query.
+
+        Args:
+            query: Query text (e.g. the job requirements)
+            k: Number of results
+            section: Only return entries and bullets from this section
+            nprobe: Number of closest lists to search; doubled until k results
+                are found or every item of the section has been scored
+
+        Returns:
+            List of (item, cosine similarity) tuples, best first. Items are
+            dicts with kind ('entry' or 'bullet'), entry, bullet and section.
+        """
+        query_vector = embed_text(query)
+        list_order = np.argsort(-(self.centroids @ query_vector), kind='stable')
+        segments = self.list_segments if section is None else self.section_segments.get(section, {})
+        # Probing stops early once every vector of the section has been scored
+        total = sum(len(rows) for list_segments in segments.values() for _, _, rows in list_segments)
+        probed = 0
+        scored = 0
+        candidates = []
+        while probed < len(list_order) and scored < total:
+            for list_id in list_order[probed:probed + nprobe]:
+                for matrix, selector, rows in segments.get(int(list_id), ()):
+                    scores = matrix[selector] @ query_vector
+                    scored += len(rows)
+                    positions = np.arange(len(scores))
+                    # Only the best k of each segment can make the final top k
+                    if len(positions) > k:
+                        positions = np.argpartition(-scores, k - 1)[:k]
+                    for p in positions:
+                        row = rows[p]
+                        candidates.extend((float(scores[p]), self.items[item_id])
+                                          for item_id in self.item_order[self.row_starts[row]:self.row_starts[row + 1]])
+            probed += nprobe
+            if len(candidates) >= k:
+                break
+            nprobe *= 2
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]['entry'], candidate[1].get('bullet', -1)))
+        return [(item, score) for score, item in candidates[:k]]
+
+def _read_assignments(assignments_path: str) -> Dict:
+    try:
+        with open(assignments_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == INDEX_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': INDEX_VERSION, 'trained_size': 0, 'assignments': {}, 'layout': None}
+
+def _open_blocks(blocks_path: str, appended_path: str, layout: Optional[Dict], dimensions: int) -> Tuple[Optional["np.ndarray"], Optional["np.ndarray"]]:
+    """Open the list blocks and appended rows memory-mapped, or (None, None) if they are missing or do not match the layout."""
+    if not layout:
+        return None, None
+    try:
+        blocks = np.load(blocks_path, mmap_mode='r')
+        appended = np.load(appended_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None, None
+    # The appended file may hold rows past the layout from an interrupted update; they are ignored
+    if (blocks.shape != (layout['base_rows'], dimensions) or appended.ndim != 2
+            or appended.shape[1] != dimensions or appended.shape[0] < len(layout['appended_lists'])):
+        return None, None
+    return blocks, appended
+
+def _save_matrix(path: str, matrix: "np.ndarray") -> None:
+    temp_path = path + ".tmp.npy"
+    np.save(temp_path, matrix)
+    os.replace(temp_path, path)
+
+def refresh_ann_index(cache: EmbeddingCache, database_path: str) -> Tuple[AnnIndex, int, int]:
+    """
+    Update the index to match the embedding cache.
+
+    If the cache holds the same database as when the index was last
+    updated, the saved files are opened memory-mapped and nothing is
+    re-hashed or copied. Otherwise the vectors of new texts are appended
+    after the list blocks and the rows of removed texts are marked deleted
+    (tombstones); the blocks are laid out and saved again only when the
+    appended and deleted rows exceed COMPACT_FRACTION of them, or when the
+    centroids are retrained.
+
+    Returns:
+        Tuple of (index, vectors inserted, vectors deleted)
+    """
+    assignments_path, centroids_path, blocks_path, appended_path = ann_paths_for(database_path)
+    state = _read_assignments(assignments_path)
+    try:
+        centroids = np.load(centroids_path)
+    except (OSError, ValueError):
+        centroids = None
+
+    rows = cache.id_map['rows']
+    size = len(rows)
+    dimensions = cache.matrix.shape[1]
+    retrain = (
+        centroids is None
+        or centroids.shape[1:] != (dimensions,)
+        or (size > RETRAIN_GROWTH * max(state['trained_size'], 1) and _num_lists_for(size) > len(centroids))
+    )
+
+    layout = state['layout']
+    blocks, appended = (None, None) if retrain else _open_blocks(blocks_path, appended_path, layout, dimensions)
+    digest = cache.id_map.get('database_digest')
+    if blocks is not None and layout['database_digest'] and layout['database_digest'] == digest:
+        return AnnIndex(centroids, blocks, appended, layout, cache), 0, 0
+
+    if retrain:
+        num_lists = _num_lists_for(size)
+        if size:
+            # Rows of removed texts may still be in the cache file; train on the live rows only
+            centroids = train_centroids(np.asarray(cache.matrix[np.unique(cache.item_rows)]), num_lists)
+        else:
+            centroids = np.zeros((1, dimensions), dtype=np.float32)
+        state = {'version': INDEX_VERSION, 'trained_size': size, 'assignments': {}, 'layout': None}
+        _save_matrix(centroids_path, centroids)
+
+    assignments = state['assignments']
+    deleted = [content_hash for content_hash in assignments if content_hash not in rows]
+    for content_hash in deleted:
+        del assignments[content_hash]
+    inserted = [content_hash for content_hash in rows if content_hash not in assignments]
+    if inserted:
+        vectors = np.asarray(cache.matrix[[rows[content_hash] for content_hash in inserted]])
+        for content_hash, list_id in zip(inserted, np.argmax(vectors @ centroids.T, axis=1)):
+            assignments[content_hash] = int(list_id)
+
+    updated = False
+    if blocks is not None:
+        # Append the rows of new (text, section) pairs and mark the rows of removed ones deleted
+        tombstones = set(layout['tombstones'])
+        live_rows = {tuple(key): row for row, key in enumerate(layout['keys']) if row not in tombstones}
+        current = [(item['hash'], item['section']) for item in cache.items]
+        current_keys = set(current)
+        removed_keys = [key for key in live_rows if key not in current_keys]
+        removed = [live_rows[key] for key in removed_keys]
+        added = [key for key in dict.fromkeys(current) if key not in live_rows]
+        pending = len(layout['appended_lists']) + len(added) + len(tombstones) + len(removed)
+        if pending <= COMPACT_FRACTION * layout['base_rows']:
+            vectors = np.asarray(cache.matrix[[rows[content_hash] for content_hash, _ in added]]).reshape(len(added), dimensions)
+            if not added or write_npy_rows(appended_path, len(layout['appended_lists']), vectors):
+                for key in removed_keys:
+                    del live_rows[key]
+                live_rows.update((key, len(layout['keys']) + offset) for offset, key in enumerate(added))
+                layout['item_rows'] = [live_rows[key] for key in current]
+                layout['keys'].extend(list(key) for key in added)
+                layout['appended_lists'].extend(assignments[content_hash] for content_hash, _ in added)
+                layout['tombstones'].extend(removed)
+                layout['database_digest'] = digest
+                appended = np.load(appended_path, mmap_mode='r')
+                updated = True
+
+    if not updated:
+        blocks, state['layout'] = build_list_blocks(cache, assignments)
+        _save_matrix(blocks_path, blocks)
+        appended = np.zeros((0, dimensions), dtype=np.float32)
+        _save_matrix(appended_path, appended)
+    with open(assignments_path, 'w', encoding='utf-8') as f:
+        # json.dumps uses the C encoder; json.dump streams through the pure-Python one
+        f.write(json.dumps(state, separators=(',', ':')))
+
+    return AnnIndex(centroids, blocks, appended, state['layout'], cache), len(inserted), len(deleted)
+
+def load_ann_index(database: Dict, database_path: str) -> Optional[AnnIndex]:
+    """Return an up-to-date index for the database, or None without numpy."""
+    result = refresh_embedding_cache(database, database_path)
+    if result is None:
+        return None
+    index, _, _ = refresh_ann_index(result[0], database_path)
+    return index
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Structured Recording and Replay of AI Service Interactions
+
+The API log written by log_api_interaction() is free-form text for reading.
+This module records the same interactions as data, so a run can be
+reproduced without API access:
+
+    python ai_cv_generator.py --job-posting job.txt --record recordings/job1
+    python ai_cv_generator.py --replay recordings/job1
+    python ai_cv_generator.py --replay recordings/job1 --replay-latency
+
+A recording directory holds:
+
+    recording.json      - service, creation time and the run's arguments
+    interactions.jsonl  - one line per API call: the request exactly as sent,
+                          the response text, token usage, latency and any error
+
+During replay, each request is looked up by a digest of the request itself,
+so concurrent requests are matched no matter in which order they are made.
+Identical requests are answered in the order they were recorded. Requests
+that were not recorded raise ReplayMissError; recorded errors are raised
+again as ReplayedAPIError.
+
+Usage:
+    python cv_api_recorder.py recordings/job1   # summarize a recording
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+RECORDING_VERSION = 1
+
+OPENAI_ENDPOINT = "chat.completions.create"
+CLAUDE_ENDPOINT = "messages.create"
+
+class ReplayMissError(LookupError):
+    """A request that is not in the recording."""
+
+class ReplayedAPIError(Exception):
+    """An API error that happened when the recording was made."""
+
+def request_digest(endpoint: str, request: Dict) -> str:
+    """Digest identifying a request by its endpoint and exact arguments."""
+    canonical = json.dumps({"endpoint": endpoint, "request": request}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def response_text(endpoint: str, response: Any) -> str:
+    """The text of an OpenAI or Claude response."""
+    if endpoint == OPENAI_ENDPOINT:
+        return response.choices[0].message.content
+    return response.content[0].text
+
+def response_usage(endpoint: str, response: Any) -> Dict[str, int]:
+    """Input and output tokens reported by the service (0 where the response has no usage)."""
+    usage = getattr(response, "usage", None)
+    if endpoint == OPENAI_ENDPOINT:
+        return {"input_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "output_tokens": getattr(usage, "completion_tokens", 0) or 0}
+    return {"input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0}
+
+def openai_response(model: str, text: str, input_tokens: int = 0, output_tokens: int = 0) -> SimpleNamespace:
+    """A response shaped like the OpenAI client's chat completion."""
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=text), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=input_tokens, completion_tokens=output_tokens,
+                              total_tokens=input_tokens + output_tokens)
+    )
+
+def claude_response(model: str, text: str, input_tokens: int = 0, output_tokens: int = 0) -> SimpleNamespace:
+    """A response shaped like the Anthropic client's message."""
+    return SimpleNamespace(
+        model=model,
+        content=[SimpleNamespace(type="text", text=text)],
+        stop_reason="end_turn",
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens)
+    )
+
+def read_recording(record_dir: str) -> Dict:
+    """
+    Load a recording's metadata.
+
+    Raises:
+        FileNotFoundError: If the directory holds no recording
+        ValueError: If the recording is unreadable or from another version
+    """
+    with open(os.path.join(record_dir, "recording.json"), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    if metadata.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Recording {record_dir} was written by an incompatible version")
+    return metadata
+
+def read_interactions(record_dir: str) -> List[Dict]:
+    """All interactions of a recording in the order they completed (lines cut short are skipped)."""
+    interactions = []
+    with open(os.path.join(record_dir, "interactions.jsonl"), 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                interactions.append(json.loads(line))
+            except ValueError:
+                continue
+    return interactions
+
+class RecordingClient:
+    """Passes calls through to a real AI client and records every request and response."""
+
+    def __init__(self, client: Any, record_dir: str, service: str, arguments: Optional[Dict] = None):
+        self.client = client
+        self.record_dir = record_dir
+        self.service = service
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self.interactions_path = os.path.join(record_dir, "interactions.jsonl")
+
+        os.makedirs(record_dir, exist_ok=True)
+        with open(os.path.join(record_dir, "recording.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": RECORDING_VERSION,
+                "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "service": service,
+                "arguments": arguments or {}
+            }, f, indent=2, ensure_ascii=False)
+        # A new recording replaces an earlier one in the same directory
+        open(self.interactions_path, 'w', encoding='utf-8').close()
+
+        # The attribute paths of the real clients
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **request: self._call(OPENAI_ENDPOINT, request)))
+        self.messages = SimpleNamespace(create=lambda **request: self._call(CLAUDE_ENDPOINT, request))
+
+    def _call(self, endpoint: str, request: Dict) -> Any:
+        create = self.client.chat.completions.create if endpoint == OPENAI_ENDPOINT else self.client.messages.create
+        started_at = datetime.now().isoformat(timespec="milliseconds")
+        started = time.perf_counter()
+        record = {"endpoint": endpoint, "digest": request_digest(endpoint, request),
+                  "started": started_at, "request": request}
+        try:
+            response = create(**request)
+        except Exception as e:
+            record.update(latency=round(time.perf_counter() - started, 4), error=f"{type(e).__name__}: {e}")
+            self._write(record)
+            raise
+        record.update(
+            latency=round(time.perf_counter() - started, 4),
+            model=getattr(response, "model", request.get("model")),
+            response=response_text(endpoint, response),
+            usage=response_usage(endpoint, response)
+        )
+        self._write(record)
+        return response
+
+    def _write(self, record: Dict) -> None:
+        with self._lock:
+            self.recorded += 1
+            record["sequence"] = self.recorded
+            with open(self.interactions_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+class ReplayClient:
+    """Answers requests from a recording instead of calling the AI service."""
+
+    def __init__(self, record_dir: str, simulate_latency: bool = False):
+        """
+        Args:
+            record_dir: Directory written by RecordingClient
+            simulate_latency: Wait as long as the original call took before answering
+        """
+        metadata = read_recording(record_dir)
+        self.record_dir = record_dir
+        self.service = metadata["service"]
+        self.arguments = metadata.get("arguments", {})
+        self.simulate_latency = simulate_latency
+        self.served = 0
+        self.missed = 0
+        self._lock = threading.Lock()
+        self._responses = defaultdict(deque)
+        for interaction in read_interactions(record_dir):
+            self._responses[interaction["digest"]].append(interaction)
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **request: self._call(OPENAI_ENDPOINT, request)))
+        self.messages = SimpleNamespace(create=lambda **request: self._call(CLAUDE_ENDPOINT, request))
+
+    def _call(self, endpoint: str, request: Dict) -> Any:
+        with self._lock:
+            recorded = self._responses.get(request_digest(endpoint, request))
+            interaction = recorded.popleft() if recorded else None
+            if interaction is None:
+                self.missed += 1
+            else:
+                self.served += 1
+        if interaction is None:
+            messages = request.get("messages") or [{}]
+            excerpt = str(messages[-1].get("content", ""))[:80].replace("\n", " ")
+            raise ReplayMissError(f"No recorded response for this {request.get('model')} request: {excerpt}...")
+        if self.simulate_latency:
+            time.sleep(interaction.get("latency", 0))
+        if "error" in interaction:
+            raise ReplayedAPIError(interaction["error"])
+        build = openai_response if endpoint == OPENAI_ENDPOINT else claude_response
+        usage = interaction.get("usage", {})
+        return build(interaction.get("model", request.get("model")), interaction["response"],
+                     usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+def main():
+    """Main function to summarize a recording."""
+    parser = argparse.ArgumentParser(description='Summarize a recording of AI service interactions.')
+    parser.add_argument('record_dir', help='Recording directory (written with --record)')
+
+    args = parser.parse_args()
+
+    try:
+        metadata = read_recording(args.record_dir)
+        interactions = read_interactions(args.record_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error loading recording {args.record_dir}: {e}")
+        sys.exit(1)
+
+    print(f"Recording {args.record_dir} ({metadata['created']}, {metadata['service']})")
+    print(f"  Job posting: {metadata['arguments'].get('job_posting')}")
+    by_model = defaultdict(lambda: {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0, "latency": 0.0})
+    for interaction in interactions:
+        summary = by_model[interaction.get("model") or interaction["request"].get("model")]
+        summary["calls"] += 1
+        summary["errors"] += "error" in interaction
+        summary["input_tokens"] += interaction.get("usage", {}).get("input_tokens", 0)
+        summary["output_tokens"] += interaction.get("usage", {}).get("output_tokens", 0)
+        summary["latency"] += interaction.get("latency", 0)
+    for model, summary in by_model.items():
+        print(f"  {model}: {summary['calls']} calls ({summary['errors']} errors), "
+              f"{summary['input_tokens']} input and {summary['output_tokens']} output tokens, "
+              f"{summary['latency']:.1f}s total latency")
+
+if __name__ == "__main__":
+    main()
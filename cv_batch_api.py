@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Provider Batch APIs for Bulk Tailoring
+
+Interactive calls are the most expensive way to run large, non-urgent jobs
+such as re-tailoring against dozens of saved postings. OpenAI Batch and
+Anthropic Message Batches answer the same requests within hours at half the
+price. This module lets the AI CV generator run through them:
+
+    python ai_cv_generator.py --job-posting job.txt --batch-api batches/job1
+
+A batch run proceeds in rounds. In each round the pipeline runs with a
+BatchClient, which answers requests from the results of earlier batches and
+collects every other request instead of sending it; the pipeline carries on
+as far as it can without those answers (all entry scores of a round are
+collected, not just the first). The collected requests are submitted as one
+provider batch, the batch is polled until it ends, and the next round starts.
+A typical entry-by-entry run takes three rounds: the job analysis, then the
+summary and every entry score, then nothing (the pipeline completes).
+
+A batch directory holds:
+
+    state.json      - service, every submitted batch with its status, and
+                      the run ID of the tailoring run's checkpoint
+    results.jsonl   - one line per answered request, keyed by request digest
+
+All rounds share one run checkpoint (cv_run_checkpoint.py): the first round
+creates it and every later round resumes it, so completed stages and entry
+scores are kept from round to round. Everything is saved as soon as it
+happens, so an interrupted run continues where it stopped when the same
+command is run again: pending batches are polled, not submitted again.
+
+Usage:
+    python cv_batch_api.py batches/job1   # show the batches and results of a batch run
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from cv_api_recorder import CLAUDE_ENDPOINT, OPENAI_ENDPOINT, claude_response, openai_response, request_digest
+
+BATCH_STATE_VERSION = 1
+DEFAULT_POLL_INTERVAL = 60.0
+# Failed requests are submitted again in later rounds, up to this many times in all
+MAX_ATTEMPTS = 3
+# Both providers bill batch requests at half the interactive price
+BATCH_PRICE_FACTOR = 0.5
+
+OPENAI_BATCH_URL = "/v1/chat/completions"
+OPENAI_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+class BatchPending(BaseException):
+    """
+    A request that will be answered by a provider batch.
+
+    Derived from BaseException so the pipeline's handling of failed API calls
+    (fallback scores, the regex job analysis) does not mistake a deferred
+    request for a failure.
+    """
+
+class BatchRequestError(Exception):
+    """A request that failed in every batch it was submitted to."""
+
+class OpenAIBatches:
+    """Submits chat completions as an OpenAI Batch (a JSONL file upload) and collects the results."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def submit(self, requests: Dict[str, Dict]) -> str:
+        lines = "".join(json.dumps({"custom_id": custom_id, "method": "POST", "url": OPENAI_BATCH_URL, "body": request},
+                                   ensure_ascii=False) + "\n" for custom_id, request in requests.items())
+        upload = self.client.files.create(file=("batch_requests.jsonl", lines.encode("utf-8")), purpose="batch")
+        batch = self.client.batches.create(input_file_id=upload.id, endpoint=OPENAI_BATCH_URL, completion_window="24h")
+        return batch.id
+
+    def poll(self, batch_id: str) -> Tuple[str, bool]:
+        status = self.client.batches.retrieve(batch_id).status
+        return status, status in OPENAI_FINAL_STATUSES
+
+    def results(self, batch_id: str) -> Dict[str, Dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                body = response.get("body") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    error = item.get("error") or body.get("error") or f"status {response.get('status_code')}"
+                    results[item["custom_id"]] = {"error": json.dumps(error) if isinstance(error, dict) else str(error)}
+                    continue
+                usage = body.get("usage") or {}
+                results[item["custom_id"]] = {
+                    "model": body.get("model"),
+                    "response": body["choices"][0]["message"]["content"],
+                    "usage": {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+                }
+        return results
+
+class ClaudeBatches:
+    """Submits messages as an Anthropic Message Batch and collects the results."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def submit(self, requests: Dict[str, Dict]) -> str:
+        batch = self.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": request} for custom_id, request in requests.items()])
+        return batch.id
+
+    def poll(self, batch_id: str) -> Tuple[str, bool]:
+        status = self.client.messages.batches.retrieve(batch_id).processing_status
+        return status, status == "ended"
+
+    def results(self, batch_id: str) -> Dict[str, Dict]:
+        results = {}
+        for item in self.client.messages.batches.results(batch_id):
+            result = item.result
+            if result.type == "succeeded":
+                message = result.message
+                results[item.custom_id] = {
+                    "model": message.model,
+                    "response": message.content[0].text,
+                    "usage": {"input_tokens": message.usage.input_tokens, "output_tokens": message.usage.output_tokens}
+                }
+            elif result.type == "errored":
+                results[item.custom_id] = {"error": str(result.error)}
+            # Canceled and expired requests have no result and are submitted again
+        return results
+
+def batch_backend(client: Any, service: str):
+    """The batch API of a client set up for service ("openai" or "claude")."""
+    return OpenAIBatches(client) if service == "openai" else ClaudeBatches(client)
+
+class BatchStore:
+    """Submitted batches and the results of a batch run, saved in a directory."""
+
+    def __init__(self, batch_dir: str, service: str):
+        """
+        Raises:
+            ValueError: If the directory holds a batch run for another service or version
+        """
+        self.batch_dir = batch_dir
+        self.state_path = os.path.join(batch_dir, "state.json")
+        self.results_path = os.path.join(batch_dir, "results.jsonl")
+        self.results = {}
+        self.errors = {}
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+            if self.state.get("version") != BATCH_STATE_VERSION:
+                raise ValueError(f"Batch directory {batch_dir} was written by an incompatible version")
+            if self.state.get("service") != service:
+                raise ValueError(f"Batch directory {batch_dir} holds a {self.state.get('service')} batch run, not {service}")
+        else:
+            self.state = {"version": BATCH_STATE_VERSION, "service": service,
+                          "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "batches": []}
+            os.makedirs(batch_dir, exist_ok=True)
+            self.save()
+
+        if os.path.exists(self.results_path):
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._add_result(json.loads(line))
+                    except ValueError:
+                        continue
+
+    def _add_result(self, result: Dict) -> None:
+        if "error" in result:
+            self.errors.setdefault(result["digest"], []).append(result["error"])
+        else:
+            self.results[result["digest"]] = result
+
+    @property
+    def batches(self) -> List[Dict]:
+        return self.state["batches"]
+
+    def pending_batches(self) -> List[Dict]:
+        """Submitted batches whose results have not been collected yet."""
+        return [batch for batch in self.batches if not batch.get("collected")]
+
+    def add_batch(self, batch_id: str, requests: int) -> Dict:
+        """Record a submitted batch."""
+        batch = {"id": batch_id, "submitted": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                 "requests": requests, "status": "submitted"}
+        self.batches.append(batch)
+        self.save()
+        return batch
+
+    def add_results(self, batch: Dict, status: str, results: Dict[str, Dict]) -> None:
+        """Save the results of an ended batch and mark it collected."""
+        with open(self.results_path, 'a', encoding='utf-8') as f:
+            for digest, result in results.items():
+                record = dict(result, digest=digest, batch=batch["id"])
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._add_result(record)
+        batch.update(status=status, collected=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                     answered=sum("error" not in result for result in results.values()))
+        self.save()
+
+    def save(self) -> None:
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+
+    def usage(self) -> Dict[str, int]:
+        """Answered requests and their token usage."""
+        totals = {"requests": len(self.results), "input_tokens": 0, "output_tokens": 0}
+        for result in self.results.values():
+            totals["input_tokens"] += result.get("usage", {}).get("input_tokens", 0)
+            totals["output_tokens"] += result.get("usage", {}).get("output_tokens", 0)
+        return totals
+
+def wait_for_batch(backend, store: BatchStore, batch: Dict, poll_interval: float = DEFAULT_POLL_INTERVAL) -> None:
+    """
+    Poll a submitted batch until it ends and save its results.
+
+    Raises:
+        BatchRequestError: If the batch ended without any results (failed validation, cancelled)
+    """
+    status = batch.get("status")
+    while True:
+        new_status, ended = backend.poll(batch["id"])
+        if new_status != status:
+            status = new_status
+            print(f"Batch {batch['id']} ({batch['requests']} requests): {status}")
+        if ended:
+            break
+        time.sleep(poll_interval)
+    results = backend.results(batch["id"])
+    store.add_results(batch, status, results)
+    if not results:
+        raise BatchRequestError(f"Batch {batch['id']} ended with status '{status}' and no results")
+
+class BatchClient:
+    """Answers requests from batch results and collects the others for the next batch."""
+
+    def __init__(self, store: BatchStore):
+        self.store = store
+        self.collected = {}
+        self.served = 0
+        self._lock = threading.Lock()
+
+        # The attribute paths of the real clients
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=lambda **request: self._call(OPENAI_ENDPOINT, request)))
+        self.messages = SimpleNamespace(create=lambda **request: self._call(CLAUDE_ENDPOINT, request))
+
+    def _call(self, endpoint: str, request: Dict) -> Any:
+        # The request digest (64 hex digits) is a valid custom_id for both providers
+        digest = request_digest(endpoint, request)
+        result = self.store.results.get(digest)
+        if result is not None:
+            with self._lock:
+                self.served += 1
+            build = openai_response if endpoint == OPENAI_ENDPOINT else claude_response
+            usage = result.get("usage", {})
+            return build(result.get("model") or request.get("model"), result["response"],
+                         usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        errors = self.store.errors.get(digest, [])
+        if len(errors) >= MAX_ATTEMPTS:
+            raise BatchRequestError(errors[-1])
+        with self._lock:
+            self.collected[digest] = request
+        raise BatchPending(digest)
+
+def main():
+    """Main function to show the state of a batch run."""
+    parser = argparse.ArgumentParser(description='Show the batches and results of a batch run (--batch-api).')
+    parser.add_argument('batch_dir', help='Batch directory (passed to ai_cv_generator.py --batch-api)')
+
+    args = parser.parse_args()
+
+    try:
+        with open(os.path.join(args.batch_dir, "state.json"), 'r', encoding='utf-8') as f:
+            service = json.load(f).get("service")
+        store = BatchStore(args.batch_dir, service)
+    except (OSError, ValueError) as e:
+        print(f"Error loading batch run {args.batch_dir}: {e}")
+        sys.exit(1)
+
+    print(f"Batch run {args.batch_dir} ({store.state['created']}, {service})")
+    for batch in store.batches:
+        collected = f", {batch['answered']} answered" if batch.get("collected") else ""
+        print(f"  {batch['id']}  {batch['submitted']}  {batch['requests']} requests  {batch['status']}{collected}")
+    usage = store.usage()
+    print(f"{usage['requests']} answered requests, {usage['input_tokens']} input and {usage['output_tokens']} output tokens "
+          f"(billed at {BATCH_PRICE_FACTOR:.0%} of interactive prices); {len(store.errors)} requests failed at least once")
+
+if __name__ == "__main__":
+    main()
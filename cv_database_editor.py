@@ -14,21 +14,37 @@ Usage:
     
     # Add a new skill category
     python cv_database_editor.py add-skill-category --database cv_database.json
+    
+    # Search entries (prefix, phrase and field-scoped queries)
+    python cv_database_editor.py search 'tag:software title:"Ph.D."' --database cv_database.json
+    
+    # Apply bulk edits from a file (or stdin) with a single load and save
+    python cv_database_editor.py batch --database cv_database.json --file edits.txt --dry-run
+    
+    # Report near-duplicate entries and description bullets
+    python cv_database_editor.py dedupe-report --database cv_database.json
 """
 
 import argparse
 import json
 import os
+import re
+import shlex
 import sys
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from cv_schema import load_validated_json
+from cv_search_index import index_path_for, refresh_search_index, search_entries
+from cv_dedupe import DEFAULT_THRESHOLD as DEFAULT_DEDUPE_THRESHOLD, print_dedupe_report
+from cv_embeddings import update_embedding_cache
+
 def load_database(database_path: str) -> Dict:
     """Load the CV database from a JSON file."""
     try:
         if os.path.exists(database_path):
-            with open(database_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Report schema problems but still load, so the editor can be used to fix them
+            return load_validated_json(database_path, strict=False)
         else:
             # Create a new database structure if the file doesn't exist
             return {
@@ -57,6 +73,14 @@ def save_database(database: Dict, database_path: str) -> None:
     except Exception as e:
         print(f"Error saving database: {e}")
         sys.exit(1)
+    
+    # Keep the search index in step with the saved entries (only changed entries are re-indexed)
+    _, reindexed = refresh_search_index(database, database_path)
+    if reindexed:
+        print(f"Updated search index for {reindexed} entries: {index_path_for(database_path)}")
+    
+    # Embed new or changed entries and bullets for local relevance scoring
+    update_embedding_cache(database, database_path)
 
 def add_entry(database: Dict) -> None:
     """Add a new entry to the database."""
@@ -292,19 +316,75 @@ def edit_entry(database: Dict, entry_id: int) -> None:
     
     print("Entry updated successfully!")
 
-def list_entries(database: Dict) -> None:
-    """List all entries in the database with their IDs."""
+def print_entry_summary(entry_id: int, entry: Dict) -> None:
+    """Print the one-entry summary used by list and search output."""
+    print(f"{entry_id}: {entry.get('title', 'Untitled')} - {entry.get('institution', 'No institution')} ({entry.get('start', '')} - {entry.get('end', '')})")
+    print(f"   Section: {entry.get('section', 'None')}, Tags: {', '.join(entry.get('tags', []))}")
+    print()
+
+def print_page_footer(page: int, page_count: int, command: str) -> None:
+    """Tell the user how to reach the next page of results."""
+    if page < page_count:
+        print(f"Page {page}/{page_count} - run `{command} --page {page + 1}` for more")
+    else:
+        print(f"Page {page}/{page_count}")
+
+def list_entries(database: Dict, page: int = 1, page_size: int = 25) -> None:
+    """
+    List entries in the database with their IDs, one page at a time.
+    
+    Args:
+        database: The CV database
+        page: Page number to show (1-based)
+        page_size: Entries per page (0 shows all entries)
+    """
     entries = database.get('entries', [])
     
     if not entries:
         print("No entries in the database.")
         return
     
+    if page_size <= 0:
+        page_size = len(entries)
+    page_count = (len(entries) + page_size - 1) // page_size
+    page = min(max(page, 1), page_count)
+    start = (page - 1) * page_size
+    
     print(f"\nFound {len(entries)} entries:")
-    for i, entry in enumerate(entries):
-        print(f"{i}: {entry.get('title', 'Untitled')} - {entry.get('institution', 'No institution')} ({entry.get('start', '')} - {entry.get('end', '')})")
-        print(f"   Section: {entry.get('section', 'None')}, Tags: {', '.join(entry.get('tags', []))}")
-        print()
+    for i in range(start, min(start + page_size, len(entries))):
+        print_entry_summary(i, entries[i])
+    print_page_footer(page, page_count, "list-entries")
+
+def search_database(database: Dict, database_path: str, query: str, page: int = 1, page_size: int = 25) -> None:
+    """
+    Search entries with the persisted full-text index and print matching IDs.
+    
+    Args:
+        database: The CV database
+        database_path: Path of the database (the index is stored next to it)
+        query: Search query, e.g. 'tag:software title:"Ph.D." methyl*'
+        page: Page number to show (1-based)
+        page_size: Results per page
+    """
+    entries = database.get('entries', [])
+    index, reindexed = refresh_search_index(database, database_path)
+    if reindexed:
+        print(f"Indexed {reindexed} changed entries")
+    
+    results = search_entries(index, query)
+    if not results:
+        print(f"No entries match: {query}")
+        return
+    
+    page_size = max(page_size, 1)
+    page_count = (len(results) + page_size - 1) // page_size
+    page = min(max(page, 1), page_count)
+    start = (page - 1) * page_size
+    
+    print(f"\nFound {len(results)} matching entries for: {query}")
+    for entry_id, _ in results[start:start + page_size]:
+        print_entry_summary(entry_id, entries[entry_id])
+    print_page_footer(page, page_count, f"search '{query}'")
 
 def add_skill_category(database: Dict) -> None:
     """Add a new skill category and its entries."""
@@ -567,6 +647,306 @@ def edit_text_block(database: Dict, block_id: int) -> None:
     
     print("Text block updated successfully!")
 
+# Entry fields that hold lists of strings
+LIST_FIELDS = {'descriptions', 'companies', 'tags'}
+
+# Condition operators for batch `where` clauses, longest first so ">=" wins over ">"
+_CONDITION_RE = re.compile(r'^([\w-]+)(!=|>=|<=|=|~|>|<)(.*)$', re.DOTALL)
+# Operators of the fields that do not accept all of them
+FIELD_OPERATORS = {
+    'search': ('=', '!='),
+    'id': ('=', '!=', '>', '<', '>=', '<='),
+}
+
+def _coerce_value(field: str, value: str) -> Any:
+    """Convert a batch value string to the type stored in the database."""
+    if field in LIST_FIELDS:
+        return [item.strip() for item in value.split(',') if item.strip()]
+    if field == 'importance':
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    return value
+
+def parse_batch_operation(line: str) -> Dict:
+    """
+    Parse one batch line into an operation.
+    
+    Lines are either JSON Patch operations (a JSON object or list of objects, e.g.
+    {"op": "replace", "path": "/entries/3/title", "value": "New title"}) or
+    query-plus-update statements such as:
+    
+        where section=academic_articles set-add tags=publications
+        where tags=resume and importance<5 set-remove tags=resume
+        where id=12 set title="Senior Scientist" set end=Current
+        where search="methyl*" set-add companies=biotech
+        where section=test delete
+    """
+    stripped = line.strip()
+    if stripped.startswith(('{', '[')):
+        patch = json.loads(stripped)
+        return {'kind': 'patch', 'ops': patch if isinstance(patch, list) else [patch], 'source': stripped}
+    
+    words = shlex.split(stripped)
+    if not words or words[0].lower() != 'where':
+        raise ValueError("Expected a line starting with 'where' or a JSON Patch object")
+    
+    conditions = []
+    actions = []
+    i = 1
+    # Conditions run until the first action keyword
+    while i < len(words) and words[i].lower() not in ('set', 'set-add', 'set-remove', 'delete'):
+        word = words[i]
+        i += 1
+        if word.lower() in ('and', '*', 'all'):
+            continue
+        match = _CONDITION_RE.match(word)
+        if not match:
+            raise ValueError(f"Invalid condition '{word}'")
+        field, operator, value = match.groups()
+        allowed = FIELD_OPERATORS.get(field)
+        if allowed and operator not in allowed:
+            raise ValueError(f"Operator '{operator}' is not supported for {field} (use {', '.join(allowed)})")
+        if field == 'id':
+            try:
+                if '-' in value and operator in ('=', '!='):
+                    [int(bound) for bound in value.split('-', 1)]
+                else:
+                    int(value)
+            except ValueError:
+                raise ValueError(f"Invalid entry ID in condition '{word}' (use a number, or LOW-HIGH with = and !=)")
+        conditions.append((field, operator, value))
+    
+    while i < len(words):
+        action = words[i].lower()
+        i += 1
+        if action == 'delete':
+            actions.append((action, None, None))
+            continue
+        if action not in ('set', 'set-add', 'set-remove') or i >= len(words) or '=' not in words[i]:
+            raise ValueError(f"Invalid action near '{action}'. Expected set/set-add/set-remove FIELD=VALUE or delete")
+        field, value = words[i].split('=', 1)
+        i += 1
+        if action != 'set' and field not in LIST_FIELDS:
+            raise ValueError(f"{action} only works on list fields ({', '.join(sorted(LIST_FIELDS))})")
+        actions.append((action, field, _coerce_value(field, value)))
+    
+    if not actions:
+        raise ValueError("No action given (set, set-add, set-remove or delete)")
+    return {'kind': 'query', 'conditions': conditions, 'actions': actions, 'source': stripped}
+
+def _matches_condition(entry_id: int, entry: Dict, condition: Tuple[str, str, str],
+                       search_ids: Dict[str, set]) -> bool:
+    """Check one `field<op>value` condition against an entry (by original ID)."""
+    field, operator, value = condition
+    allowed = FIELD_OPERATORS.get(field)
+    if allowed and operator not in allowed:
+        raise ValueError(f"Operator '{operator}' is not supported for {field}")
+    if field == 'search':
+        found = entry_id in search_ids[value]
+        return found if operator == '=' else not found
+    if field == 'id':
+        if operator in ('>', '<', '>=', '<='):
+            target = int(value)
+            return {'>': entry_id > target, '<': entry_id < target, '>=': entry_id >= target, '<=': entry_id <= target}[operator]
+        if '-' in value:
+            low, high = value.split('-', 1)
+            result = int(low) <= entry_id <= int(high)
+        else:
+            result = entry_id == int(value)
+        return result if operator == '=' else not result
+    
+    current = entry.get(field)
+    if operator in ('>', '<', '>=', '<='):
+        try:
+            number, target = float(current), float(value)
+        except (TypeError, ValueError):
+            return False
+        return {'>': number > target, '<': number < target, '>=': number >= target, '<=': number <= target}[operator]
+    if operator == '~':
+        haystack = ' '.join(current) if isinstance(current, list) else str(current or '')
+        return value.lower() in haystack.lower()
+    
+    # For list fields "=" means "contains"
+    found = value in current if isinstance(current, list) else str(current if current is not None else '') == value
+    return found if operator == '=' else not found
+
+def _resolve_pointer(document: Any, path: str) -> Tuple[Any, str]:
+    """Resolve a JSON Pointer to (parent container, final key)."""
+    if not path.startswith('/'):
+        raise ValueError(f"Invalid JSON Pointer '{path}'")
+    parts = [part.replace('~1', '/').replace('~0', '~') for part in path[1:].split('/')]
+    parent = document
+    for part in parts[:-1]:
+        parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+    return parent, parts[-1]
+
+def _apply_patch_op(database: Dict, op: Dict) -> None:
+    """Apply a single JSON Patch (RFC 6902) add/remove/replace operation."""
+    parent, key = _resolve_pointer(database, op['path'])
+    kind = op.get('op')
+    if isinstance(parent, list):
+        if kind == 'add':
+            parent.insert(len(parent) if key == '-' else int(key), op['value'])
+        elif kind == 'remove':
+            parent.pop(int(key))
+        elif kind == 'replace':
+            parent[int(key)] = op['value']
+        else:
+            raise ValueError(f"Unsupported JSON Patch op '{kind}'")
+    else:
+        if kind in ('add', 'replace'):
+            if kind == 'replace' and key not in parent:
+                raise KeyError(key)
+            parent[key] = op['value']
+        elif kind == 'remove':
+            del parent[key]
+        else:
+            raise ValueError(f"Unsupported JSON Patch op '{kind}'")
+
+def apply_batch_operations(database: Dict, operations: List[Dict], search_index: Optional[Dict] = None) -> List[str]:
+    """
+    Apply parsed batch operations to the database in place.
+    
+    Conditions refer to entry IDs as they were before the batch started, so
+    earlier deletes do not shift the IDs used by later lines. search_index
+    must be the index of the database before any operation was applied.
+    
+    Returns:
+        One summary line per operation
+    """
+    entries = database.setdefault('entries', [])
+    original_ids = {id(entry): i for i, entry in enumerate(entries)}
+    search_ids = {}
+    summary = []
+    
+    for operation in operations:
+        if operation['kind'] == 'patch':
+            for op in operation['ops']:
+                _apply_patch_op(database, op)
+            summary.append(f"{operation['source']}: applied {len(operation['ops'])} JSON Patch operation(s)")
+            entries = database.get('entries', [])
+            continue
+        
+        # Full-text conditions run once against the index of the database as loaded
+        for field, _, value in operation['conditions']:
+            if field == 'search' and value not in search_ids:
+                if search_index is None:
+                    raise ValueError("search= conditions need the search index")
+                search_ids[value] = {entry_id for entry_id, _ in search_entries(search_index, value)}
+        
+        matched = 0
+        changed = 0
+        kept = []
+        for entry in entries:
+            entry_id = original_ids.get(id(entry), -1)
+            if not all(_matches_condition(entry_id, entry, condition, search_ids) for condition in operation['conditions']):
+                kept.append(entry)
+                continue
+            matched += 1
+            before = json.dumps(entry, sort_keys=True)
+            deleted = False
+            for action, field, value in operation['actions']:
+                if action == 'delete':
+                    deleted = True
+                    break
+                if action == 'set':
+                    entry[field] = value
+                elif action == 'set-add':
+                    current = entry.setdefault(field, [])
+                    current.extend(item for item in value if item not in current)
+                elif action == 'set-remove':
+                    entry[field] = [item for item in entry.get(field, []) if item not in value]
+            if deleted:
+                changed += 1
+                continue
+            if json.dumps(entry, sort_keys=True) != before:
+                changed += 1
+            kept.append(entry)
+        entries[:] = kept
+        summary.append(f"{operation['source']}: matched {matched}, changed {changed}")
+    
+    return summary
+
+def run_batch(database: Dict, database_path: str, source: str, dry_run: bool = False) -> None:
+    """
+    Apply a stream of batch operations with one load and one save.
+    
+    Args:
+        database: The CV database
+        database_path: Path of the database file
+        source: File with one operation per line, or '-' for stdin
+        dry_run: Only report what would change, without saving
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    operations = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip() or line.strip().startswith('#'):
+            continue
+        try:
+            operations.append(parse_batch_operation(line))
+        except ValueError as e:
+            print(f"Error on line {line_number}: {e}")
+            sys.exit(1)
+    
+    if not operations:
+        print("No batch operations found.")
+        return
+    
+    # Snapshot the entries so changes can be reported per entry. Nothing is
+    # written unless every operation succeeds.
+    original_entries = list(database.get('entries', []))
+    search_index = None
+    if any(field == 'search' for op in operations if op['kind'] == 'query' for field, _, _ in op['conditions']):
+        search_index, _ = refresh_search_index(database, database_path)
+    snapshots = {id(entry): (i, json.loads(json.dumps(entry))) for i, entry in enumerate(original_entries)}
+    try:
+        summary = apply_batch_operations(database, operations, search_index)
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        print(f"Error applying batch operations: {e}")
+        sys.exit(1)
+    
+    print(f"\n{'Dry run: ' if dry_run else ''}{len(operations)} batch operation(s)")
+    for line in summary:
+        print(f"  {line}")
+    
+    changes = []
+    added = 0
+    remaining = set()
+    for entry in database.get('entries', []):
+        if id(entry) not in snapshots:
+            added += 1
+            continue
+        remaining.add(id(entry))
+        entry_id, before = snapshots[id(entry)]
+        fields = sorted(key for key in set(before) | set(entry) if before.get(key) != entry.get(key))
+        if fields:
+            changes.append((entry_id, entry.get('title', 'Untitled'), fields))
+    deleted = [snapshots[id(entry)] for entry in original_entries if id(entry) not in remaining]
+    
+    print(f"\nEntries: {len(changes)} changed, {added} added, {len(deleted)} deleted")
+    for entry_id, title, fields in changes[:20]:
+        print(f"  ~ [{entry_id}] {title[:60]}: {', '.join(fields)}")
+    for entry_id, before in deleted[:20]:
+        print(f"  - [{entry_id}] {before.get('title', 'Untitled')[:60]}")
+    if len(changes) > 20 or len(deleted) > 20:
+        print("  ...")
+    
+    if dry_run:
+        print("\nDry run: no changes saved.")
+        return
+    
+    if not changes and not added and not deleted and not any('JSON Patch' in line for line in summary):
+        print("Nothing to save.")
+        return
+    save_database(database, database_path)
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description='CV Database Editor')
@@ -582,8 +962,17 @@ def main():
     edit_entry_parser.add_argument('--entry-id', type=int, required=True, help='ID of the entry to edit')
     
     # List entries command
-    list_entries_parser = subparsers.add_parser('list-entries', help='List all entries with their IDs')
+    list_entries_parser = subparsers.add_parser('list-entries', aliases=['list'], help='List entries with their IDs, one page at a time')
     list_entries_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    list_entries_parser.add_argument('--page', type=int, default=1, help='Page number to show (default: 1)')
+    list_entries_parser.add_argument('--page-size', type=int, default=25, help='Entries per page, 0 for all (default: 25)')
+    
+    # Search entries command
+    search_parser = subparsers.add_parser('search', help='Search entries by title, description, institution or tag')
+    search_parser.add_argument('query', help='Query, e.g. \'tag:software title:"Ph.D." methyl*\'')
+    search_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    search_parser.add_argument('--page', type=int, default=1, help='Page number to show (default: 1)')
+    search_parser.add_argument('--page-size', type=int, default=25, help='Results per page (default: 25)')
     
     # Add skill category command
     add_skill_parser = subparsers.add_parser('add-skill-category', help='Add a new skill category')
@@ -607,6 +996,19 @@ def main():
     edit_text_block_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
     edit_text_block_parser.add_argument('--block-id', type=int, required=True, help='ID of the text block to edit')
     
+    # Batch edit command
+    batch_parser = subparsers.add_parser('batch', help='Apply bulk edits (JSON Patch or where/set lines) with a single load and save')
+    batch_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    batch_parser.add_argument('--file', default='-', help='File with one operation per line (default: - for stdin)')
+    batch_parser.add_argument('--dry-run', action='store_true', help='Show what would change without saving')
+    
+    # Near-duplicate report command
+    dedupe_parser = subparsers.add_parser('dedupe-report', help='Report near-duplicate entries and description bullets')
+    dedupe_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    dedupe_parser.add_argument('--threshold', type=float, default=DEFAULT_DEDUPE_THRESHOLD,
+                               help=f'Minimum estimated similarity (0-1) to group entries (default: {DEFAULT_DEDUPE_THRESHOLD})')
+    dedupe_parser.add_argument('--no-bullets', action='store_true', help='Only report entries, not description bullets')
+    
     # Edit contact info command
     edit_contact_parser = subparsers.add_parser('edit-contact', help='Edit contact information')
     edit_contact_parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
@@ -627,8 +1029,10 @@ def main():
     elif args.command == 'edit-entry':
         edit_entry(database, args.entry_id)
         save_database(database, args.database)
-    elif args.command == 'list-entries':
-        list_entries(database)
+    elif args.command in ('list-entries', 'list'):
+        list_entries(database, args.page, args.page_size)
+    elif args.command == 'search':
+        search_database(database, args.database, args.query, args.page, args.page_size)
     elif args.command == 'add-skill-category':
         add_skill_category(database)
         save_database(database, args.database)
@@ -645,6 +1049,10 @@ def main():
     elif args.command == 'edit-contact':
         edit_contact_info(database)
         save_database(database, args.database)
+    elif args.command == 'batch':
+        run_batch(database, args.database, args.file, args.dry_run)
+    elif args.command == 'dedupe-report':
+        print_dedupe_report(database.get('entries', []), args.threshold, not args.no_bullets)
 
 if __name__ == "__main__":
     main()
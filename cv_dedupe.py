@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for the CV Database
+
+The database keeps several near-identical copies of the same material, for
+example company-specific variants of an entry (`education`,
+`education_dropletbiosciences`, `education_merck`) or the same bullet reused
+across positions. This module groups such variants with MinHash signatures
+and locality-sensitive hashing (LSH), so that:
+
+    - the AI CV generator scores each cluster of entries only once
+    - the prompt-only payload contains one copy of each cluster
+    - the database editor can report duplicates (`dedupe-report`)
+
+Entries are compared on their title, institution, location and descriptions
+(the section is ignored on purpose, since variants differ only by section).
+
+Usage:
+    python cv_dedupe.py --database cv_database.json --threshold 0.8
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+from cv_search_index import tokenize
+
+# numpy makes signatures for large banks much faster but is optional
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 32 bands of 4 rows: pairs with Jaccard similarity 0.8 become candidates
+# with probability ~1.0, pairs at 0.3 with probability ~0.23
+NUM_PERMUTATIONS = 128
+BANDS = 32
+DEFAULT_THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _permutation_parameters(num_permutations: int = NUM_PERMUTATIONS, seed: int = 1) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) pairs for the universal hash functions (a*x+b) mod p."""
+    parameters = []
+    for i in range(num_permutations):
+        digest = hashlib.sha1(f"{seed}:{i}".encode('ascii')).digest()
+        # Small enough that a*x+b fits in 64 bits for 32-bit shingle hashes
+        a = int.from_bytes(digest[:4], 'big') % _MAX_HASH + 1
+        b = int.from_bytes(digest[4:8], 'big') % _MAX_HASH
+        parameters.append((a, b))
+    return parameters
+
+_PERMUTATIONS = _permutation_parameters()
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Return the set of word n-grams of a text (single words for short texts)."""
+    words = tokenize(text)
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def entry_text(entry: Dict) -> str:
+    """Text an entry is compared on: everything except its section and tags."""
+    parts = [entry.get('title', ''), entry.get('institution', ''), entry.get('loc', '')]
+    parts.extend(entry.get('descriptions', []))
+    return ' '.join(str(part) for part in parts if part)
+
+def _shingle_hashes(shingle_set: set) -> List[int]:
+    return [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'big') for s in shingle_set]
+
+def minhash_signature(shingle_set: set) -> Tuple[int, ...]:
+    """Compute the MinHash signature of a shingle set."""
+    if not shingle_set:
+        return tuple([_MAX_HASH] * NUM_PERMUTATIONS)
+    hashes = _shingle_hashes(shingle_set)
+    if NUMPY_AVAILABLE:
+        values = np.array(hashes, dtype=np.uint64)
+        a = np.array([p[0] for p in _PERMUTATIONS], dtype=np.uint64)[:, None]
+        b = np.array([p[1] for p in _PERMUTATIONS], dtype=np.uint64)[:, None]
+        return tuple(int(v) for v in (((a * values + b) % _MERSENNE_PRIME) & _MAX_HASH).min(axis=1))
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def estimated_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+def _find(parents: List[int], i: int) -> int:
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+def cluster_texts(texts: List[str], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """
+    Group texts whose estimated Jaccard similarity reaches the threshold.
+
+    Candidate pairs come from LSH buckets, so only texts that share a band
+    are ever compared. Clusters are formed transitively.
+
+    Returns:
+        Clusters of two or more indexes, each sorted, ordered by first index
+    """
+    shingle_sets = [shingles(text) for text in texts]
+    signatures = [minhash_signature(s) for s in shingle_sets]
+    rows = NUM_PERMUTATIONS // BANDS
+    parents = list(range(len(texts)))
+
+    for band in range(BANDS):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            if not shingle_sets[i]:
+                continue
+            buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_first, root_other = _find(parents, first), _find(parents, other)
+                if root_first == root_other:
+                    continue
+                if estimated_similarity(signatures[first], signatures[other]) >= threshold:
+                    parents[root_other] = root_first
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(_find(parents, i), []).append(i)
+    return sorted((members for members in clusters.values() if len(members) > 1), key=lambda members: members[0])
+
+def find_duplicate_entries(entries: List[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+    """Return clusters of near-duplicate entry IDs (list positions)."""
+    return cluster_texts([entry_text(entry) for entry in entries], threshold)
+
+def find_duplicate_descriptions(entries: List[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[List[Tuple[int, int]]]:
+    """Return clusters of near-duplicate description bullets as (entry ID, bullet index) pairs."""
+    locations = []
+    texts = []
+    for entry_id, entry in enumerate(entries):
+        for bullet_id, description in enumerate(entry.get('descriptions', [])):
+            locations.append((entry_id, bullet_id))
+            texts.append(description)
+    return [[locations[i] for i in cluster] for cluster in cluster_texts(texts, threshold)]
+
+def cluster_representatives(entries: List[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[int]:
+    """
+    Map every entry ID to the ID of its cluster representative.
+
+    The representative is the first entry of the cluster; entries without
+    duplicates map to themselves.
+    """
+    representatives = list(range(len(entries)))
+    for cluster in find_duplicate_entries(entries, threshold):
+        for entry_id in cluster:
+            representatives[entry_id] = cluster[0]
+    return representatives
+
+def collapse_duplicate_entries(cv_data: Dict, threshold: float = DEFAULT_THRESHOLD) -> Tuple[Dict, int]:
+    """
+    Return a copy of the CV data with one entry per near-duplicate cluster.
+
+    Exact duplicate bullets within an entry are dropped as well.
+
+    Returns:
+        Tuple of (collapsed data, number of entries removed)
+    """
+    entries = cv_data.get('entries', [])
+    representatives = cluster_representatives(entries, threshold)
+    collapsed_entries = []
+    for entry_id, entry in enumerate(entries):
+        if representatives[entry_id] != entry_id:
+            continue
+        entry = dict(entry)
+        if entry.get('descriptions'):
+            entry['descriptions'] = list(dict.fromkeys(entry['descriptions']))
+        collapsed_entries.append(entry)
+    collapsed = dict(cv_data)
+    collapsed['entries'] = collapsed_entries
+    return collapsed, len(entries) - len(collapsed_entries)
+
+def print_dedupe_report(entries: List[Dict], threshold: float = DEFAULT_THRESHOLD, bullets: bool = True) -> None:
+    """Print near-duplicate entry clusters and, optionally, bullet clusters."""
+    entry_clusters = find_duplicate_entries(entries, threshold)
+    duplicates = sum(len(cluster) - 1 for cluster in entry_clusters)
+    print(f"\nNear-duplicate entries (similarity >= {threshold:.2f}): {len(entry_clusters)} clusters, "
+          f"{duplicates} of {len(entries)} entries are variants")
+    for number, cluster in enumerate(entry_clusters, 1):
+        print(f"\nCluster {number}:")
+        for entry_id in cluster:
+            entry = entries[entry_id]
+            print(f"  [{entry_id}] {entry.get('title', 'Untitled')[:60]} ({entry.get('section', '')})")
+
+    if not bullets:
+        return
+    bullet_clusters = find_duplicate_descriptions(entries, threshold)
+    print(f"\nNear-duplicate description bullets: {len(bullet_clusters)} clusters")
+    for number, cluster in enumerate(bullet_clusters, 1):
+        entry_id, bullet_id = cluster[0]
+        text = entries[entry_id]['descriptions'][bullet_id]
+        locations = ', '.join(f"{e}:{b}" for e, b in cluster)
+        print(f"  {number}. \"{text[:70]}{'...' if len(text) > 70 else ''}\" in entries {locations}")
+
+def main():
+    """Main function to print a near-duplicate report for a database."""
+    parser = argparse.ArgumentParser(description='Find near-duplicate entries and bullets in a CV database.')
+    parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum estimated similarity (0-1) to group entries (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--no-bullets', action='store_true', help='Only report entries, not description bullets')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.database, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+    except Exception as e:
+        print(f"Error loading JSON file: {e}")
+        sys.exit(1)
+    print_dedupe_report(database.get('entries', []), args.threshold, not args.no_bullets)
+
+if __name__ == "__main__":
+    main()
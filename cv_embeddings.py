@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local Embedding Cache for the CV Database
+
+Every entry and every description bullet is embedded once with a CPU-only
+hashing vectorizer (word unigrams and bigrams hashed into a fixed number of
+signed dimensions, L2-normalized). Vectors are stored next to the database:
+
+    cv_database.embeddings.npy   - float32 matrix, one row per unique text,
+                                   opened memory-mapped
+    cv_database.embeddings.json  - content hash -> row, and the list of
+                                   entries/bullets with their hashes
+
+The cache is refreshed incrementally whenever the database editor saves or
+the CSV importer writes a database: only texts whose content hash is not in
+the cache yet are vectorized, and a database whose entries have not changed
+since the last refresh is not even re-hashed. New vectors are appended to
+the .npy file in place; rows of texts that are no longer used stay in the
+file until they make up half of it, and only then is the file rewritten.
+Scoring a job posting against the whole bank is then a single matrix-vector
+product.
+
+Requirements:
+    - pip install numpy
+
+Usage:
+    python cv_embeddings.py --database cv_database.json
+    python cv_embeddings.py --database cv_database.json --query "single-cell RNA-seq pipelines"
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from cv_search_index import database_digest, tokenize
+from cv_dedupe import entry_text
+
+# numpy is optional: without it the cache is simply not maintained
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+CACHE_VERSION = 1
+DIMENSIONS = 2048
+# Rewrite the vector file once rows of removed texts make up more than this fraction of it
+COMPACT_STALE_FRACTION = 0.5
+
+def embedding_paths_for(database_path: str) -> Tuple[str, str]:
+    """Return the (.npy matrix, .json id map) paths stored next to the database."""
+    stem = os.path.splitext(database_path)[0]
+    return stem + ".embeddings.npy", stem + ".embeddings.json"
+
+def content_hash(text: str) -> str:
+    """Key under which the vector of a text is cached."""
+    return hashlib.sha1(f"{DIMENSIONS}:{text}".encode('utf-8')).hexdigest()
+
+def _feature(feature: str) -> Tuple[int, float]:
+    """Hash a feature to (dimension, sign)."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+    return value % DIMENSIONS, (1.0 if value >> 63 else -1.0)
+
+def embed_text(text: str) -> "np.ndarray":
+    """Embed a text as an L2-normalized hashed bag of unigrams and bigrams."""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    words = tokenize(text)
+    counts = {}
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        counts[feature] = counts.get(feature, 0) + 1
+    for feature, count in counts.items():
+        dimension, sign = _feature(feature)
+        # Sublinear term frequency keeps repeated words from dominating
+        vector[dimension] += sign * (1.0 + np.log(count))
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+def database_items(database: Dict) -> List[Dict]:
+    """List every embedded item: one per entry and one per description bullet."""
+    items = []
+    for entry_id, entry in enumerate(database.get('entries', [])):
+        items.append({'kind': 'entry', 'entry': entry_id, 'section': entry.get('section', ''),
+                      'hash': content_hash(entry_text(entry)), 'text': entry_text(entry)})
+        for bullet_id, description in enumerate(entry.get('descriptions', [])):
+            items.append({'kind': 'bullet', 'entry': entry_id, 'bullet': bullet_id, 'section': entry.get('section', ''),
+                          'hash': content_hash(description), 'text': description})
+    return items
+
+def _read_id_map(map_path: str) -> Dict:
+    try:
+        with open(map_path, 'r', encoding='utf-8') as f:
+            id_map = json.load(f)
+        if id_map.get('version') == CACHE_VERSION and id_map.get('dimensions') == DIMENSIONS:
+            return id_map
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'dimensions': DIMENSIONS, 'rows': {}, 'items': []}
+
+def write_npy_rows(path: str, start: int, vectors: "np.ndarray") -> bool:
+    """
+    Write rows into a float32 matrix saved with np.save, in place.
+
+    The rows are written from row start on, the file is cut after them, and
+    the row count in the .npy header is updated last, so an interrupted
+    write leaves the earlier rows readable. Nothing before row start is
+    rewritten.
+
+    Returns:
+        True if the rows were written; False if the file is missing, is not
+        a float32 matrix of the same width with at least start rows, or its
+        header has no room for the new row count
+    """
+    try:
+        with open(path, 'r+b') as f:
+            if np.lib.format.read_magic(f) != (1, 0):
+                return False
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            offset = f.tell()
+            if (fortran_order or dtype != np.dtype('<f4') or len(shape) != 2
+                    or shape[1] != vectors.shape[1] or shape[0] < start):
+                return False
+            # np.save pads the header so the row count can grow without moving the data
+            header = io.BytesIO()
+            np.lib.format.write_array_header_1_0(header, {
+                'descr': dtype.str, 'fortran_order': False, 'shape': (start + len(vectors), shape[1])
+            })
+            if len(header.getvalue()) != offset:
+                return False
+            f.seek(offset + start * shape[1] * dtype.itemsize)
+            f.write(np.ascontiguousarray(vectors, dtype=dtype).tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(header.getvalue())
+    except (OSError, ValueError):
+        return False
+    return True
+
+def _open_matrix(matrix_path: str, rows: int) -> Optional["np.ndarray"]:
+    """Open the vector file memory-mapped, or None if it is missing or does not match the id map."""
+    try:
+        matrix = np.load(matrix_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if matrix.ndim != 2 or matrix.shape[1] != DIMENSIONS or matrix.shape[0] < rows:
+        return None
+    return matrix
+
+class EmbeddingCache:
+    """Memory-mapped entry and bullet vectors for one database."""
+
+    def __init__(self, matrix: "np.ndarray", id_map: Dict):
+        self.matrix = matrix
+        self.id_map = id_map
+        self.items = id_map['items']
+        # Row of every item, in item order
+        self.item_rows = np.array([id_map['rows'][item['hash']] for item in self.items], dtype=np.int64)
+
+    def similarities(self, query: str) -> "np.ndarray":
+        """Cosine similarity of every item to the query (one matrix-vector product)."""
+        if not len(self.item_rows):
+            return np.zeros(0, dtype=np.float32)
+        row_scores = np.asarray(self.matrix @ embed_text(query))
+        return row_scores[self.item_rows]
+
+    def entry_similarities(self, query: str, num_entries: int) -> "np.ndarray":
+        """
+        Score every entry against the query.
+
+        An entry's score is the mean of its whole-entry similarity and its
+        best bullet's similarity, so one strongly matching bullet counts.
+        """
+        scores = self.similarities(query)
+        whole = np.zeros(num_entries, dtype=np.float32)
+        best_bullet = np.zeros(num_entries, dtype=np.float32)
+        for item, score in zip(self.items, scores):
+            if item['kind'] == 'entry':
+                whole[item['entry']] = score
+            elif score > best_bullet[item['entry']]:
+                best_bullet[item['entry']] = score
+        return (whole + best_bullet) / 2
+
+def refresh_embedding_cache(database: Dict, database_path: str) -> Optional[Tuple[EmbeddingCache, int]]:
+    """
+    Bring the embedding cache up to date with the database.
+
+    Only texts whose content hash is not cached yet are vectorized, and
+    their vectors are appended to the file. Rows of texts that are no longer
+    used are dropped from the id map; the file is rewritten without them
+    once they exceed COMPACT_STALE_FRACTION of its rows. If the entries are unchanged since the last refresh (same digest), the
+    cache is returned without hashing any text.
+
+    Returns:
+        Tuple of (cache, number of newly embedded texts), or None without numpy
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    matrix_path, map_path = embedding_paths_for(database_path)
+    id_map = _read_id_map(map_path)
+    matrix = _open_matrix(matrix_path, max(id_map['rows'].values(), default=-1) + 1)
+    if matrix is None:
+        id_map['rows'] = {}
+    digest = database_digest(database)
+    if matrix is not None and id_map.get('database_digest') == digest:
+        return EmbeddingCache(matrix, id_map), 0
+
+    items = database_items(database)
+    texts = {}
+    for item in items:
+        texts.setdefault(item['hash'], item['text'])
+    rows = {h: row for h, row in id_map['rows'].items() if h in texts}
+    new_hashes = [h for h in texts if h not in rows]
+    stored_items = [{key: value for key, value in item.items() if key != 'text'} for item in items]
+
+    size = 0 if matrix is None else matrix.shape[0]
+    vectors = np.zeros((len(new_hashes), DIMENSIONS), dtype=np.float32)
+    for offset, h in enumerate(new_hashes):
+        vectors[offset] = embed_text(texts[h])
+    # Rows of removed texts stay in the file until they make up too much of it
+    stale = size - len(rows)
+    appended = (
+        matrix is not None
+        and stale <= COMPACT_STALE_FRACTION * (size + len(new_hashes))
+        and (not new_hashes or write_npy_rows(matrix_path, size, vectors))
+    )
+    if appended:
+        rows.update((h, size + offset) for offset, h in enumerate(new_hashes))
+    else:
+        # Compact: keep cached rows (copied, not recomputed) followed by the new vectors
+        kept = list(rows)
+        new_matrix = np.zeros((len(kept) + len(new_hashes), DIMENSIONS), dtype=np.float32)
+        if kept:
+            new_matrix[:len(kept)] = matrix[[rows[h] for h in kept]]
+        new_matrix[len(kept):] = vectors
+        rows = {h: row for row, h in enumerate(kept + new_hashes)}
+
+        temp_path = matrix_path + ".tmp.npy"
+        np.save(temp_path, new_matrix)
+        os.replace(temp_path, matrix_path)
+
+    if rows != id_map['rows'] or id_map['items'] != stored_items or id_map.get('database_digest') != digest:
+        id_map['rows'] = rows
+        id_map['items'] = stored_items
+        id_map['database_digest'] = digest
+        with open(map_path, 'w', encoding='utf-8') as f:
+            # json.dumps uses the C encoder; json.dump streams through the pure-Python one
+            f.write(json.dumps(id_map, separators=(',', ':')))
+
+    return EmbeddingCache(np.load(matrix_path, mmap_mode='r'), id_map), len(new_hashes)
+
+def update_embedding_cache(database: Dict, database_path: str) -> None:
+    """Refresh the cache and its ANN index after a save, reporting problems without failing the save."""
+    # Imported here because cv_ann_index builds on this module
+    from cv_ann_index import refresh_ann_index
+    try:
+        result = refresh_embedding_cache(database, database_path)
+        if result is None:
+            return
+        _, inserted, deleted = refresh_ann_index(result[0], database_path)
+    except OSError as e:
+        print(f"Warning: could not update embedding cache: {e}")
+        return
+    if result[1]:
+        print(f"Embedded {result[1]} new or changed texts: {embedding_paths_for(database_path)[0]}")
+    if inserted or deleted:
+        print(f"Updated nearest-neighbor index: {inserted} inserted, {deleted} deleted")
+
+def main():
+    """Main function to build the cache and optionally rank entries for a query."""
+    parser = argparse.ArgumentParser(description='Build the local embedding cache for a CV database.')
+    parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    parser.add_argument('--query', help='Rank entries against this text (or @file to read it from a file)')
+    parser.add_argument('--top', type=int, default=10, help='Number of entries to show for --query (default: 10)')
+
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("numpy is required for the embedding cache. Install with:")
+        print("pip install numpy")
+        sys.exit(1)
+
+    try:
+        with open(args.database, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+    except Exception as e:
+        print(f"Error loading JSON file: {e}")
+        sys.exit(1)
+
+    cache, embedded = refresh_embedding_cache(database, args.database)
+    print(f"Embedding cache has {len(cache.id_map['rows'])} vectors ({embedded} newly embedded)")
+
+    if args.query:
+        query = args.query
+        if query.startswith('@'):
+            with open(query[1:], 'r', encoding='utf-8') as f:
+                query = f.read()
+        entries = database.get('entries', [])
+        scores = cache.entry_similarities(query, len(entries))
+        for entry_id in np.argsort(-scores, kind='stable')[:args.top]:
+            entry = entries[entry_id]
+            print(f"  {scores[entry_id]:.3f}  [{entry_id}] {entry.get('title', 'Untitled')[:60]} ({entry.get('section', '')})")
+
+if __name__ == "__main__":
+    main()
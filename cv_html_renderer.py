@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Pure-Python HTML Renderer for Tailored CVs/Resumes
+
+An HTML preview through render.r pays for R start-up, the CSV round trip,
+knitr and pandoc on every document. This module renders the HTML directly
+from a tailored JSON file (or any database in the same format):
+
+    - the layout comes from the R Markdown template: its Aside and Main
+      sections, their headings and icons ({data-icon=...}), and which
+      print_section() / print_text_block() / print_contact_info() /
+      print_aside_section() call fills each section
+    - entries, text blocks, contact info and skills produce the markup that
+      pagedown's html_resume makes of print_section() and the other printing
+      functions in cv_printing_functions.r
+    - the template's stylesheets from css/ and its inline <style> block are
+      embedded, so the HTML is self-contained like the rendered one
+
+Templates are parsed once into a layout and the HTML snippets are
+precompiled string.Template objects, so batch output costs a few
+milliseconds per document. PDFs can still be printed with Chrome, with the
+warm pool of chrome_pool.py (--pdf).
+
+Not reproduced: the network logo and the Google Scholar citations chart
+(both need R), and pagedown's paged.js pagination in the browser preview.
+pagedown's own resume stylesheet is approximated by RESUME_BASE_CSS.
+
+Usage:
+    python cv_html_renderer.py tailored_json/CompanyX_2026-10-18.json
+    python cv_html_renderer.py tailored_json/*.json --output-dir output/previews --pdf
+    python ai_cv_generator.py --job-posting job.txt --format html
+"""
+
+import argparse
+import base64
+import html
+import json
+import os
+import re
+import sys
+import time
+from string import Template
+from typing import Dict, List, Optional
+
+from json_to_csv_converter import filter_entries, sort_entries
+
+TEMPLATE_DIRS = ["templates", "output"]
+
+FONT_AWESOME_CSS = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css"
+FONT_AWESOME_SHIMS_CSS = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/v4-shims.min.css"
+
+# Skill categories whose items are shown as code, as in the JSON to CSV converter
+CODE_KEYWORDS = ["software", "coding", "programming", "development", "package", "script"]
+
+# Skill categories per table before print_aside_section() starts a new page
+MAX_CATEGORIES_PER_PAGE = 3
+
+# Approximation of the layout of pagedown's html_resume stylesheet ('resume' in the template's css list)
+RESUME_BASE_CSS = """
+:root {
+  --content-width: 8.5in;
+  --sidebar-width: 15rem;
+  --sidebar-background-color: #f2f2f2;
+  --sidebar-horizontal-padding: 0.2in;
+  --main-width: calc(var(--content-width) - var(--sidebar-width));
+  --date-block-width: 0.6in;
+  --decorator-outer-dim: 9px;
+  --decorator-outer-offset-left: -5.5px;
+  --decorator-border: 2px solid #bdd7e7;
+}
+body { width: var(--content-width); margin: 0 auto; }
+.wrapper { display: flex; align-items: stretch; }
+.aside { flex: 0 0 var(--sidebar-width); background-color: var(--sidebar-background-color);
+  padding: 0.6in var(--sidebar-horizontal-padding); box-sizing: border-box; }
+.main { flex: 1 1 var(--main-width); padding: 0 0.25in 0 0.25in; }
+.main h2 { text-transform: uppercase; margin-top: 1.5em; }
+.main h2 .fa { margin-right: 0.5em; }
+.main-block .blocks { display: flex; margin-bottom: 0.6em; }
+.blocks .date { flex: 0 0 var(--date-block-width); text-align: center; font-size: 0.75em; padding-top: 0.25em; }
+.blocks .date span { display: block; }
+.blocks .date span + span::before { content: "|"; display: block; }
+.blocks .decorator { flex: 0 0 0; border-left: var(--decorator-border); position: relative; }
+.blocks .decorator::after { content: ""; position: absolute; top: 0.35em; left: var(--decorator-outer-offset-left);
+  width: var(--decorator-outer-dim); height: var(--decorator-outer-dim); border-radius: 50%;
+  background-color: #ffffff; border: var(--decorator-border); box-sizing: border-box; }
+.blocks .details { flex: 1; padding-left: 0.2in; }
+.details header { display: flex; flex-wrap: wrap; justify-content: space-between; }
+.details h3 { margin: 0; font-size: 1em; flex: 1 0 100%; }
+.details .place { flex: 1; }
+.details .location { text-align: right; }
+.details ul { margin: 0.2em 0 0 0; padding-left: 1.2em; }
+.concise .blocks { margin-bottom: 0.2em; }
+.aside ul { list-style: none; padding-left: 0; }
+.aside li { margin-bottom: 0.5em; line-height: 1.2; }
+"""
+
+# print_aside_section() emits this stylesheet before its tables
+SKILLS_CSS = """
+.skills-table { width: 100%; border-collapse: separate; border-spacing: 0 0.3em; }
+.skill-category-cell { font-weight: bold; padding-bottom: 0.2em; border-bottom: none; }
+.skill-items-cell { padding-top: 0; padding-bottom: 0.3em; border-top: none; }
+.skill-item { display: block; margin-bottom: 0.1em; line-height: 1.1; }
+tr.skill-row { page-break-inside: avoid !important; break-inside: avoid !important; }
+.page-break { page-break-before: always !important; break-before: page !important; display: block; width: 100%; height: 1px; }
+"""
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="author" content="$author">
+<title>$title</title>
+<link rel="stylesheet" href="$font_awesome">
+<link rel="stylesheet" href="$font_awesome_shims">
+<style>
+$css
+</style>
+</head>
+<body>
+<div class="wrapper">
+<div id="aside" class="section level1 aside" data-id="aside">
+$aside
+</div>
+<div id="main" class="section level1 main" data-id="main">
+$main
+</div>
+</div>
+</body>
+</html>
+""")
+SECTION_TEMPLATE = Template("""<div id="$id" class="$classes" data-id="$id"$attributes>
+<h2>$icon$title</h2>
+$content
+</div>""")
+BLOCK_TEMPLATE = Template("""<div class="section level3 blocks">
+<div class="date">$date</div>
+<div class="decorator"></div>
+<div class="details">
+<header>
+<h3>$title</h3>
+<span class="place">$place</span>
+<span class="location">$location</span>
+</header>
+$bullets
+</div>
+</div>""")
+CONTACT_ITEM_TEMPLATE = Template("<li><i class='fa fa-$icon'></i> $content</li>")
+SKILL_CATEGORY_TEMPLATE = Template("""<tr class="skill-row">
+  <td class="skill-category-cell">$name</td>
+</tr>
+<tr class="skill-row">
+  <td class="skill-items-cell">
+$items
+  </td>
+</tr>
+<tr class="spacer-row"><td style="height: 0.1em;"></td></tr>""")
+
+# Markdown links, strong and emphasis and inline code; everything else (HTML included) passes through
+_INLINE_RE = re.compile(r'\[((?:[^\[\]]|\[[^\]]*\])*)\]\(([^)\s]*)\)|\*\*(.+?)\*\*|\*([^*]+?)\*|`([^`]+)`', re.DOTALL)
+_FRONT_MATTER_RE = re.compile(r'\A---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_STYLE_RE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+_LEVEL1_RE = re.compile(r'^([^\n]+?)\s*\n={3,}\s*$', re.MULTILINE)
+_LEVEL2_RE = re.compile(r'^([^\n]+?)\s*\n-{3,}\s*$', re.MULTILINE)
+_ATTRIBUTES_RE = re.compile(r'\s*\{([^}]*)\}\s*$')
+_CALL_RE = re.compile(r'(print_section|print_text_block)\(\s*[\'"](\w+)[\'"]\s*\)|(print_contact_info|print_aside_section)\(')
+_YEAR_RE = re.compile(r'(?:19|20)\d{2}')
+
+_layout_cache = {}
+_stylesheet_cache = {}
+
+def markdown_inline(text: str) -> str:
+    """Render the inline markdown of a database string (links, emphasis, code) as HTML in one pass."""
+    if not text or text == "N/A":
+        return ""
+
+    def replace(match):
+        if match.group(2) is not None:
+            return f'<a href="{html.escape(match.group(2), quote=True)}">{markdown_inline(match.group(1))}</a>'
+        if match.group(3) is not None:
+            return f"<strong>{markdown_inline(match.group(3))}</strong>"
+        if match.group(4) is not None:
+            return f"<em>{markdown_inline(match.group(4))}</em>"
+        return f"<code>{match.group(5)}</code>"
+
+    return _INLINE_RE.sub(replace, str(text))
+
+def find_template(template: str) -> Optional[str]:
+    """Path of a template, looked up like render.r does (templates/ first, then output/)."""
+    if os.path.exists(template):
+        return template
+    for directory in TEMPLATE_DIRS:
+        path = os.path.join(directory, os.path.basename(template))
+        if os.path.exists(path):
+            return path
+    return None
+
+def _parse_attributes(header: str) -> Dict:
+    """Heading text and pandoc attributes ({#id data-icon=x data-concise=true}) of a section header."""
+    section = {"title": header.strip(), "id": None, "icon": None, "concise": False}
+    match = _ATTRIBUTES_RE.search(header)
+    if match:
+        section["title"] = header[:match.start()].strip()
+        for attribute in match.group(1).split():
+            if attribute.startswith("#"):
+                section["id"] = attribute[1:]
+            elif attribute.startswith("data-icon="):
+                section["icon"] = attribute.split("=", 1)[1]
+            elif attribute.startswith("data-concise="):
+                section["concise"] = attribute.split("=", 1)[1].lower() == "true"
+    if not section["id"]:
+        section["id"] = re.sub(r'[^a-z0-9]+', '-', section["title"].lower()).strip('-')
+    return section
+
+def parse_template(path: str) -> Dict:
+    """
+    Parse an R Markdown resume template into a layout.
+
+    Returns:
+        Layout with "title", "author", "css" (stylesheet paths), "style"
+        (inline CSS), and "aside" and "main" lists of sections, each with its
+        heading, ID, icon, concise flag and the printing calls that fill it
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    layout = {"title": "", "author": "", "css": [], "style": "", "aside": [], "main": []}
+    front_matter = _FRONT_MATTER_RE.match(source)
+    body = source[front_matter.end():] if front_matter else source
+    if front_matter:
+        for line in front_matter.group(1).splitlines():
+            stripped = line.strip()
+            if stripped.startswith("#"):
+                continue
+            if stripped.startswith("title:"):
+                layout["title"] = stripped[len("title:"):].strip().strip('"\'')
+            elif stripped.startswith("author:"):
+                layout["author"] = stripped[len("author:"):].strip().strip('"\'')
+            elif stripped.startswith("css:"):
+                names = [name.strip().strip('"\'') for name in stripped[len("css:"):].strip().strip("[]").split(",")]
+                template_dir = os.path.dirname(os.path.abspath(path))
+                # 'resume' is pagedown's own stylesheet; the others are paths relative to the rendered template
+                layout["css"] = [None if name == "resume" else os.path.normpath(os.path.join(template_dir, name))
+                                 for name in names if name]
+
+    body = _COMMENT_RE.sub("", body)
+    layout["style"] = "\n".join(match.strip() for match in _STYLE_RE.findall(body))
+
+    level1 = list(_LEVEL1_RE.finditer(body))
+    for index, match in enumerate(level1):
+        region = match.group(1).strip().lower()
+        if region not in ("aside", "main"):
+            continue
+        content = body[match.end():level1[index + 1].start() if index + 1 < len(level1) else len(body)]
+        headers = list(_LEVEL2_RE.finditer(content))
+        for position, header in enumerate(headers):
+            section = _parse_attributes(header.group(1))
+            section_body = content[header.end():headers[position + 1].start() if position + 1 < len(headers) else len(content)]
+            section["calls"] = [(call.group(1) or call.group(3), call.group(2)) for call in _CALL_RE.finditer(section_body)]
+            layout[region].append(section)
+    return layout
+
+def load_layout(template_path: str) -> Dict:
+    """Parsed layout of a template, cached until the template file changes."""
+    mtime = os.path.getmtime(template_path)
+    cached = _layout_cache.get(template_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, parse_template(template_path))
+        _layout_cache[template_path] = cached
+    return cached[1]
+
+def _stylesheet(path: Optional[str]) -> str:
+    if path is None:
+        return RESUME_BASE_CSS
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _stylesheet_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        text = ""
+        if mtime is not None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        cached = (mtime, text)
+        _stylesheet_cache[path] = cached
+    return cached[1]
+
+def _entry_year(entry: Dict, default: int) -> int:
+    """End year used by create_CV_object() to order entries (entries without one come first)."""
+    match = _YEAR_RE.search(str(entry.get("end") or ""))
+    return int(match.group(0)) if match else default
+
+def section_entries(entries: List[Dict], section_id: str) -> List[Dict]:
+    """Entries of a section in the order print_section() shows them: by end year, most recent first."""
+    selected = [entry for entry in entries if entry.get("section") == section_id]
+    future = time.localtime().tm_year + 10
+    return sorted(selected, key=lambda entry: -_entry_year(entry, future))
+
+def render_block(entry: Dict) -> str:
+    """One entry as pagedown lays out a print_section() block."""
+    start = str(entry.get("start") or "").strip()
+    end = str(entry.get("end") or "").strip()
+    start = "" if start in ("NULL", "N/A") else start
+    end = "" if end in ("NULL", "N/A") else end
+    if start:
+        dates = [end or "Current", start]
+    else:
+        dates = [end] if end else []
+    bullets = [markdown_inline(description) for description in entry.get("descriptions", []) if description]
+    return BLOCK_TEMPLATE.substitute(
+        date="".join(f"<span>{html.escape(date)}</span>" for date in dates),
+        title=markdown_inline(entry.get("title", "")),
+        place=markdown_inline(entry.get("loc", "")),
+        location=markdown_inline(entry.get("institution", "")),
+        bullets="<ul>\n" + "\n".join(f"<li>{bullet}</li>" for bullet in bullets) + "\n</ul>" if bullets else ""
+    )
+
+def render_text_block(data: Dict, block_id: str) -> str:
+    """A text block as print_text_block() shows it: paragraphs of inline markdown."""
+    for block in data.get("text_blocks", []):
+        if block.get("id") == block_id:
+            paragraphs = [paragraph.strip() for paragraph in re.split(r'\n\s*\n', block.get("content", "")) if paragraph.strip()]
+            return "\n".join(f"<p>{markdown_inline(paragraph)}</p>" for paragraph in paragraphs)
+    return ""
+
+def render_contact_info(data: Dict) -> str:
+    """Contact list as print_contact_info() shows it."""
+    items = []
+    for key, value in data.get("contact_info", {}).items():
+        icon = ""
+        if isinstance(value, dict):
+            content, icon = value.get("value", ""), value.get("icon", "")
+        else:
+            content = value
+        label = key.split("_", 1)[0] if key.count("_") == 1 else key
+        if not icon and "_" in key and key.count("_") == 1:
+            icon = key.split("_", 1)[1]
+        if not content and not label:
+            continue
+        if label == "email":
+            icon = icon or "envelope"
+            shown = html.escape(content)
+        elif content and _INLINE_RE.search(content):
+            shown = markdown_inline(content)
+        elif label in ("github", "linkedin", "website") and content:
+            shown = f'<a href="{html.escape(content, quote=True)}">{html.escape(content)}</a>'
+        else:
+            shown = markdown_inline(content) or html.escape(label)
+        if icon:
+            items.append(CONTACT_ITEM_TEMPLATE.substitute(icon=html.escape(icon, quote=True), content=shown))
+    return "<ul>\n" + "\n".join(items) + "\n</ul>" if items else ""
+
+def render_skills(data: Dict) -> str:
+    """Skill categories as print_aside_section() shows them: tables of at most MAX_CATEGORIES_PER_PAGE categories."""
+    categories = [category for category in data.get("skills", []) if category.get("entries")]
+    if not categories:
+        return ""
+    tables = []
+    for start in range(0, len(categories), MAX_CATEGORIES_PER_PAGE):
+        rows = []
+        for category in categories[start:start + MAX_CATEGORIES_PER_PAGE]:
+            is_code = any(keyword in category.get("category", "").lower() for keyword in CODE_KEYWORDS)
+            items = "\n".join(
+                f'    <span class="skill-item">{"<code>" + html.escape(skill.get("name", "")) + "</code>" if is_code else markdown_inline(skill.get("name", ""))}</span>'
+                for skill in category["entries"])
+            rows.append(SKILL_CATEGORY_TEMPLATE.substitute(name=html.escape(category.get("category", "")), items=items))
+        tables.append('<table class="skills-table">\n' + "\n".join(rows) + "\n</table>")
+    return '\n\n<div class="page-break"></div>\n\n'.join(tables)
+
+def render_section(section: Dict, data: Dict, entries: List[Dict]) -> str:
+    """One level-2 section of the template with the content its printing calls produce ("" if they produce nothing)."""
+    parts = []
+    has_blocks = False
+    for call, argument in section["calls"]:
+        if call == "print_section":
+            blocks = [render_block(entry) for entry in section_entries(entries, argument)]
+            has_blocks = has_blocks or bool(blocks)
+            parts.extend(blocks)
+        elif call == "print_text_block":
+            parts.append(render_text_block(data, argument))
+        elif call == "print_contact_info":
+            parts.append(render_contact_info(data))
+        elif call == "print_aside_section":
+            parts.append(render_skills(data))
+    if not any(parts):
+        return ""
+    classes = ["section", "level2"]
+    if has_blocks:
+        classes.append("main-block")
+    if section["concise"]:
+        classes.append("concise")
+    attributes = f' data-icon="{html.escape(section["icon"], quote=True)}"' if section["icon"] else ""
+    if section["concise"]:
+        attributes += ' data-concise="true"'
+    return SECTION_TEMPLATE.substitute(
+        id=html.escape(section["id"], quote=True),
+        classes=" ".join(classes),
+        attributes=attributes,
+        icon=f'<i class="fa fa-{html.escape(section["icon"], quote=True)}"></i> ' if section["icon"] else "",
+        title=html.escape(section["title"]),
+        content="\n".join(part for part in parts if part)
+    )
+
+def custom_image(image_path: Optional[str]) -> str:
+    """The custom aside image embedded as a data URI (PNG or JPEG), as display_custom_image() does."""
+    if not image_path or not os.path.exists(image_path):
+        return ""
+    extension = os.path.splitext(image_path)[1].lower().lstrip(".")
+    mime_type = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}.get(extension)
+    if not mime_type:
+        return ""
+    with open(image_path, 'rb') as f:
+        data_uri = f"data:{mime_type};base64,{base64.b64encode(f.read()).decode('ascii')}"
+    return f'<p><img src="{data_uri}" style="width:100%; height:200px;" alt="Custom image"></p>'
+
+def render_html(data: Dict, doc_type: str = "resume", template: Optional[str] = None,
+                image_path: Optional[str] = None) -> str:
+    """
+    Render a tailored JSON document as self-contained HTML.
+
+    Args:
+        data: Tailored JSON (the database format)
+        doc_type: Document type ('cv' or 'resume'); entries without this tag are left out
+        template: R Markdown template giving the layout (default: my_<doc_type>.rmd)
+        image_path: Custom image for the top of the aside (PNG or JPEG)
+
+    Returns:
+        The HTML document
+
+    Raises:
+        FileNotFoundError: If the template is not found
+    """
+    template_path = find_template(template or f"my_{doc_type}.rmd")
+    if not template_path:
+        raise FileNotFoundError(f"Template '{template or f'my_{doc_type}.rmd'}' not found in {' or '.join(TEMPLATE_DIRS)}/")
+    layout = load_layout(template_path)
+
+    entries = filter_entries(data.get("entries", []), doc_type)
+    sort_entries(entries)
+
+    # Sections filled only by R code (network logo, citations chart) are left out
+    aside = [custom_image(image_path)] + [render_section(section, data, entries) for section in layout["aside"] if section["calls"]]
+    main = [render_section(section, data, entries) for section in layout["main"] if section["calls"]]
+    css = [_stylesheet(path) for path in (layout["css"] or [None])] + [SKILLS_CSS, layout["style"]]
+    return PAGE_TEMPLATE.substitute(
+        author=html.escape(layout["author"], quote=True),
+        title=html.escape(layout["title"]),
+        font_awesome=FONT_AWESOME_CSS,
+        font_awesome_shims=FONT_AWESOME_SHIMS_CSS,
+        css="\n".join(part for part in css if part),
+        aside="\n".join(part for part in aside if part),
+        main="\n".join(part for part in main if part)
+    )
+
+def write_html(json_path: str, output_path: str, doc_type: str = "resume", template: Optional[str] = None,
+               image_path: Optional[str] = None, data: Optional[Dict] = None) -> float:
+    """
+    Render a tailored JSON file as HTML and write it.
+
+    Args:
+        json_path: Tailored JSON file (not read if data is given)
+        output_path: HTML file to write
+        doc_type: Document type ('cv' or 'resume')
+        template: R Markdown template giving the layout (default: my_<doc_type>.rmd)
+        image_path: Custom image for the top of the aside
+        data: Already loaded tailored JSON
+
+    Returns:
+        Seconds the rendering took
+    """
+    started = time.perf_counter()
+    if data is None:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    document = render_html(data, doc_type, template, image_path)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return time.perf_counter() - started
+
+def main():
+    """Main function to render tailored JSON files as HTML (and optionally PDF)."""
+    parser = argparse.ArgumentParser(description='Render tailored CV/resume JSON files as HTML without R.')
+    parser.add_argument('json_files', nargs='+', help='Tailored JSON files (or databases in the same format)')
+    parser.add_argument('--type', choices=['cv', 'resume'], default='resume', help='Document type to render (default: resume)')
+    parser.add_argument('--template', help='R Markdown template giving the layout (default: my_<type>.rmd)')
+    parser.add_argument('--output-dir', default='output', help='Directory for the HTML files (default: output)')
+    parser.add_argument('--image', help='Custom image (PNG or JPEG) for the top of the aside')
+    parser.add_argument('--pdf', action='store_true', help='Also print each HTML file to PDF with a warm Chrome pool')
+
+    args = parser.parse_args()
+
+    template = args.template or f"my_{args.type}.rmd"
+    if not find_template(template):
+        print(f"Error: Template '{template}' not found in {' or '.join(TEMPLATE_DIRS)}/")
+        sys.exit(1)
+
+    written = []
+    total = 0.0
+    for json_path in args.json_files:
+        output_path = os.path.join(args.output_dir, os.path.splitext(os.path.basename(json_path))[0] + ".html")
+        try:
+            seconds = write_html(json_path, output_path, args.type, template, args.image)
+        except (OSError, ValueError) as e:
+            print(f"Error rendering {json_path}: {e}")
+            continue
+        total += seconds
+        written.append(output_path)
+        print(f"Created {output_path} in {seconds * 1000:.1f} ms")
+    if written:
+        print(f"Rendered {len(written)} documents in {total * 1000:.1f} ms")
+
+    if args.pdf and written:
+        from chrome_pool import ChromeError, ChromePool
+        try:
+            pool = ChromePool()
+        except ChromeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        try:
+            for output_path in written:
+                pdf_path = os.path.splitext(output_path)[0] + ".pdf"
+                try:
+                    seconds = pool.print_pdf(output_path, pdf_path)
+                    print(f"Printed {pdf_path} in {seconds:.2f}s")
+                except ChromeError as e:
+                    print(f"Error printing {output_path}: {e}")
+        finally:
+            pool.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Placeholder Codec for Links and Markup in Descriptions
+
+Descriptions in the database carry inline markup: markdown links, <span>
+styles, <u> underlines, <br /> breaks and font-awesome icons. When the AI
+service rewrites descriptions, that markup costs tokens and is often dropped
+or mangled, which leaves broken links in the rendered documents.
+
+Before descriptions are sent, each link and each run of HTML markup is
+replaced with a short placeholder:
+
+    [<span style="color:red">*<i class="fa fa-link"></i>&nbsp;Sci Reports 2021*</span>](https://doi.org/...)
+        -> [[3|Sci Reports 2021]]
+    <u>ddPCR and qPCR</u>
+        -> [[4]]ddPCR and qPCR[[5]]
+
+Links keep their plain anchor text as a label so the model still knows what
+they point to. Placeholders are numbered across all descriptions of an
+entry. After the rewrite, decode_descriptions() puts the original markup
+back and reports every description whose placeholders did not survive
+exactly once, so only those descriptions need to be requested again.
+
+Usage:
+    from cv_markup_codec import encode_descriptions, decode_descriptions
+
+    encoded, tables = encode_descriptions(entry['descriptions'])
+    decoded, damaged = decode_descriptions(entry['descriptions'], rewritten)
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+PLACEHOLDER_INSTRUCTIONS = (
+    "Descriptions contain placeholders like [[1]] or [[2|label]] that stand for links and formatting. "
+    "Copy every placeholder exactly once, unchanged, into the rewritten version of the same description."
+)
+
+_MARKUP_RE = re.compile(r'\[([^\]]*)\]\(([^)\s]*)\)|(?:<[^>]+>|&nbsp;)+')
+_PLACEHOLDER_RE = re.compile(r'\[\[(\d+)(?:\|[^\]]*)?\]\]')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_BREAK_RE = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]*>')
+_EMPHASIS_RE = re.compile(r'\*+|`')
+_SPACE_RE = re.compile(r'\s+')
+
+def strip_markup(text: str) -> str:
+    """Reduce a database string to plain text: links become their text, tags and emphasis are removed."""
+    text = _LINK_RE.sub(r'\1', text)
+    text = _BREAK_RE.sub('; ', text)
+    text = _TAG_RE.sub('', text).replace('&nbsp;', ' ').replace('&amp;', '&')
+    text = _EMPHASIS_RE.sub('', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+def encode_markup(text: str, start: int = 1) -> Tuple[str, Dict[str, str]]:
+    """
+    Replace links and HTML markup runs with numbered placeholders.
+
+    Args:
+        text: Description text
+        start: Number of the first placeholder
+
+    Returns:
+        Tuple of (encoded text, placeholder number -> original markup)
+    """
+    table = {}
+
+    def replace(match):
+        number = str(start + len(table))
+        table[number] = match.group(0)
+        if match.group(1) is not None:
+            label = strip_markup(match.group(1)).replace('|', '/').replace(']', ')')
+            return f"[[{number}|{label}]]" if label else f"[[{number}]]"
+        return f"[[{number}]]"
+
+    return _MARKUP_RE.sub(replace, text), table
+
+def decode_markup(text: str, table: Dict[str, str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Restore the markup behind the placeholders of one description.
+
+    Returns:
+        Tuple of (decoded text, problems). The decoded text is None if any
+        placeholder is missing, repeated or unknown.
+    """
+    found = [match.group(1) for match in _PLACEHOLDER_RE.finditer(text)]
+    problems = []
+    for number in table:
+        count = found.count(number)
+        if count != 1:
+            problems.append(f"[[{number}]] {'missing' if count == 0 else 'repeated'}")
+    problems.extend(f"[[{number}]] unknown" for number in sorted(set(found) - set(table)))
+    if problems:
+        return None, problems
+    return _PLACEHOLDER_RE.sub(lambda match: table[match.group(1)], text), []
+
+def encode_descriptions(descriptions: List[str]) -> Tuple[List[str], List[Dict[str, str]]]:
+    """Encode the descriptions of one entry, numbering placeholders across all of them."""
+    encoded, tables = [], []
+    next_number = 1
+    for description in descriptions:
+        text, table = encode_markup(description, next_number)
+        next_number += len(table)
+        encoded.append(text)
+        tables.append(table)
+    return encoded, tables
+
+def decode_descriptions(originals: List[str], rewritten: List[str]) -> Tuple[List[Optional[str]], List[int]]:
+    """
+    Decode rewritten descriptions against the originals they replace, position by position.
+
+    Args:
+        originals: The descriptions as stored in the database
+        rewritten: The model's rewrites, one per original and in the same order
+
+    Returns:
+        Tuple of (decoded descriptions aligned with originals, positions that
+        need another attempt). Damaged positions and positions the model left
+        out are None in the decoded list.
+    """
+    _, tables = encode_descriptions(originals)
+    decoded, damaged = [], []
+    for position, table in enumerate(tables):
+        text = rewritten[position] if position < len(rewritten) else None
+        result = decode_markup(text, table)[0] if isinstance(text, str) and text.strip() else None
+        if result is None:
+            damaged.append(position)
+        decoded.append(result)
+    return decoded, damaged
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Cost-Aware Model Cascade for Entry Scoring
+
+Scoring every entry with the flagship model is the most expensive part of an
+entry-by-entry run, although most entries are clear accepts or clear
+rejects. With --cascade, the AI CV generator scores every entry with a cheap,
+fast model first and escalates only the entries whose selection is in doubt
+to the strong model:
+
+    - entries whose score is within the escalation margin of their section's
+      cutoff (midway between the last selected and the first rejected entry)
+    - selected entries whose score is within the margin of the minimum
+      relevance score (3), below which entries are dropped
+
+This module holds the routing rule, a client wrapper that meters calls,
+tokens and latency per model, and the cost report. Prices are list prices in
+USD per million tokens; models without a price are reported without costs.
+
+Usage:
+    from cv_model_cascade import UsageMeter, escalation_candidates, cascade_report
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+from cv_prompt_view import estimate_tokens
+
+DEFAULT_CHEAP_OPENAI_MODEL = "gpt-4o-mini"
+DEFAULT_CHEAP_CLAUDE_MODEL = "claude-3-5-haiku-20241022"
+DEFAULT_ESCALATION_MARGIN = 1.0
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "claude-3-7-sonnet-20250219": (3.00, 15.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+
+def model_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Cost in USD of the given tokens, or None if the model has no known price."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+class UsageMeter:
+    """Passes calls through to an AI client and meters calls, tokens and latency per model."""
+
+    def __init__(self, client: Any):
+        self.client = client
+        self.usage = {}
+        self._lock = threading.Lock()
+
+        # The attribute paths of the real clients
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_openai))
+        self.messages = SimpleNamespace(create=self._create_claude)
+
+    def _create_openai(self, **request):
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(**request)
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "prompt_tokens", None)
+        if input_tokens is None:
+            input_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in request.get("messages", []))
+        output_tokens = getattr(usage, "completion_tokens", None)
+        if output_tokens is None:
+            output_tokens = estimate_tokens(response.choices[0].message.content or "")
+        self._add(request.get("model"), input_tokens, output_tokens, time.perf_counter() - started)
+        return response
+
+    def _create_claude(self, **request):
+        started = time.perf_counter()
+        response = self.client.messages.create(**request)
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", None)
+        if input_tokens is None:
+            input_tokens = estimate_tokens(request.get("system", "")) + sum(
+                estimate_tokens(str(m.get("content", ""))) for m in request.get("messages", []))
+        output_tokens = getattr(usage, "output_tokens", None)
+        if output_tokens is None:
+            output_tokens = estimate_tokens(response.content[0].text)
+        self._add(request.get("model"), input_tokens, output_tokens, time.perf_counter() - started)
+        return response
+
+    def _add(self, model: str, input_tokens: int, output_tokens: int, seconds: float) -> None:
+        with self._lock:
+            usage = self.usage.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0})
+            usage["calls"] += 1
+            usage["input_tokens"] += input_tokens
+            usage["output_tokens"] += output_tokens
+            usage["seconds"] += seconds
+
+def escalation_candidates(scored_entries: List[Dict], max_entries_per_section: Dict[str, int],
+                          margin: float, min_score: float) -> Set[int]:
+    """
+    Clusters whose selection depends on a score close to a decision boundary.
+
+    Entries are ranked per section like the final selection: by score, best
+    variant of each near-duplicate cluster only.
+
+    Args:
+        scored_entries: Entries with "section", "_cluster" and "relevance_score"
+        max_entries_per_section: Entries kept per section (2 for sections not listed)
+        margin: Distance in score points from a boundary that triggers escalation
+        min_score: Minimum relevance score of a selected entry
+
+    Returns:
+        Cluster representatives (database positions) to score again with the strong model
+    """
+    sections = {}
+    for entry in scored_entries:
+        sections.setdefault(entry.get("section", "other"), []).append(entry)
+
+    candidates = set()
+    for section, entries in sections.items():
+        ranked = []
+        seen = set()
+        for entry in sorted(entries, key=lambda e: e.get("relevance_score", 0), reverse=True):
+            if entry["_cluster"] not in seen:
+                seen.add(entry["_cluster"])
+                ranked.append(entry)
+        quota = max_entries_per_section.get(section, 2)
+        if 0 < quota < len(ranked):
+            cutoff = (ranked[quota - 1]["relevance_score"] + ranked[quota]["relevance_score"]) / 2
+            candidates.update(e["_cluster"] for e in ranked if abs(e["relevance_score"] - cutoff) <= margin)
+        # Only entries ranked within the quota are kept or dropped by the minimum score
+        candidates.update(e["_cluster"] for e in ranked[:quota] if abs(e["relevance_score"] - min_score) <= margin)
+    return candidates
+
+def cascade_report(meter: UsageMeter, cheap_model: str, strong_model: str, scored: int, escalated: int,
+                   cheap_seconds: float, escalation_seconds: float) -> List[str]:
+    """
+    Lines describing a cascade run: escalation rate, latency and the cost saved.
+
+    The cost of scoring everything with the strong model is estimated from the
+    tokens of the cheap pass (the prompts are the same) at the strong model's prices.
+    """
+    cheap = meter.usage.get(cheap_model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+    strong = meter.usage.get(strong_model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+    lines = [
+        f"Model cascade: {cheap_model} scored {scored} entries, {escalated} escalated to {strong_model} "
+        f"({100 * escalated / max(scored, 1):.0f}%)",
+        f"  Cheap pass {cheap_seconds:.1f}s, escalation {escalation_seconds:.1f}s"
+    ]
+    cheap_cost = model_cost(cheap_model, cheap["input_tokens"], cheap["output_tokens"])
+    strong_cost = model_cost(strong_model, strong["input_tokens"], strong["output_tokens"])
+    all_strong_cost = model_cost(strong_model, cheap["input_tokens"], cheap["output_tokens"])
+    if None in (cheap_cost, strong_cost, all_strong_cost):
+        lines.append(f"  Tokens: {cheap['input_tokens'] + cheap['output_tokens']} with {cheap_model}, "
+                     f"{strong['input_tokens'] + strong['output_tokens']} with {strong_model} (no price known for a model)")
+        return lines
+    actual = cheap_cost + strong_cost
+    saved = all_strong_cost - actual
+    lines.append(f"  Estimated cost ${actual:.4f} instead of ${all_strong_cost:.4f} with {strong_model} alone "
+                 f"(saved ${saved:.4f}, {100 * saved / all_strong_cost if all_strong_cost else 0:.0f}%)")
+    return lines
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Job Posting Preprocessor
+
+Postings carry a lot of text that says nothing about the role: company
+introductions, benefits lists, equal opportunity statements, application
+instructions. Every prompt that includes the posting (job analysis, summary,
+entry scoring, prompt-only tailoring) pays for it in tokens and latency. This
+module cleans a posting locally before any of those calls:
+
+    - the posting is segmented into sections at heading lines ("Benefits:",
+      "## About Us", "WHAT WE OFFER")
+    - sections whose heading is boilerplate are dropped; requirement,
+      responsibility and skill sections are always kept
+    - in the remaining sections, lines and sentences matching a boilerplate
+      pattern (EEO statements, "competitive salary", accommodation notices)
+      are dropped, except for the list items of requirement sections
+    - repeated lines are kept once
+
+The built-in patterns are extended with learned ones: sentences that occur in
+several of your earlier postings (the same company footer on every listing)
+are saved to posting_boilerplate.json and dropped from then on.
+
+Usage:
+    python cv_posting_cleaner.py job_posting.txt
+    python cv_posting_cleaner.py job_posting.txt --output cleaned.txt
+    python cv_posting_cleaner.py --learn postings/*.txt --min-postings 3
+    python cv_posting_cleaner.py --list
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from cv_posting_index import normalize_posting
+from cv_prompt_view import estimate_tokens
+
+PATTERNS_VERSION = 1
+DEFAULT_PATTERNS_PATH = "posting_boilerplate.json"
+DEFAULT_MIN_POSTINGS = 2
+# Shorter sentences ("Requirements", "Apply now") are too generic to learn
+MIN_LEARNED_WORDS = 6
+
+# Headings (lowercased, without punctuation) of sections that are dropped whole
+BOILERPLATE_HEADINGS = [
+    r'about (us|the company|our company|the organi[sz]ation|the team)',
+    r'(who|why) (we are|join us|work (here|with us))',
+    r'(our )?(mission|values|culture|story)',
+    r'(our )?(company )?(benefits|perks)( and (perks|benefits))?',
+    r'(compensation|salary|pay|total rewards)( and benefits)?',
+    r'what we offer',
+    r'(equal (employment )?opportunity|eeo)( statement| employer)?',
+    r'(diversity|inclusion|diversity and inclusion|diversity equity and inclusion|dei)( statement)?',
+    r'(how to apply|application process|next steps)',
+    r'(applicant )?privacy( notice| policy)?',
+    r'(legal )?(disclaimer|notice to (agencies|recruiters))',
+]
+
+# Headings of sections that are never dropped and whose list items are always kept
+PROTECTED_HEADINGS = [
+    r'.*\b(requirements?|qualifications?|responsibilit(y|ies)|skills?|duties|experience|you will|you have|the role|role|job description|position)\b.*',
+]
+
+# Lines and sentences that are dropped wherever they appear, except as list items of protected sections
+BOILERPLATE_PATTERNS = [
+    r'\bequal (employment )?opportunity\b',
+    r'\bwithout regard to\b',
+    r'\b(race|color|religion|national origin|sexual orientation|gender identity|veteran status)\b.*\b(disability|protected)\b',
+    r'\breasonable accommodations?\b',
+    r'\be-verify\b',
+    r'\b(competitive|excellent|comprehensive|generous) (salary|compensation|pay|benefits)\b',
+    r'\b(401\s?\(?k\)?|paid time off|parental leave|dental and vision|health insurance)\b',
+    r'\bcommitted to (diversity|inclusion|building a diverse|creating an inclusive)\b',
+    r'\b(recruitment|staffing) agenc(y|ies)\b',
+    r'\bclick (apply|here)\b',
+]
+
+_HEADING_RE = re.compile(r'^\s*(?:#{1,6}\s*(?P<markdown>.+?)|(?P<colon>[^:.!?]{2,60}):|(?P<caps>[A-Z][A-Z &/-]{2,60}))\s*$')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9])')
+_BULLET_RE = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+
+def _compile(patterns: List[str], whole: bool = False) -> re.Pattern:
+    """One alternation of all patterns (full-match for headings)."""
+    alternation = "|".join(f"(?:{pattern})" for pattern in patterns)
+    return re.compile(f"^(?:{alternation})$" if whole else alternation, re.IGNORECASE)
+
+class BoilerplatePatterns:
+    """Built-in boilerplate patterns together with the learned ones."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_PATTERNS_PATH):
+        self.path = path
+        self.learned_headings, self.learned_phrases = self._read_learned()
+        self._headings = _compile(BOILERPLATE_HEADINGS, whole=True)
+        self._protected = _compile(PROTECTED_HEADINGS, whole=True)
+        self._patterns = _compile(BOILERPLATE_PATTERNS)
+        self._phrases = set(self.learned_phrases)
+
+    def _read_learned(self) -> Tuple[List[str], List[str]]:
+        if not self.path:
+            return [], []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == PATTERNS_VERSION:
+                return list(data.get('headings', [])), list(data.get('phrases', []))
+        except (OSError, ValueError):
+            pass
+        return [], []
+
+    def heading_is_boilerplate(self, heading: str) -> bool:
+        """Whether a section with this heading is dropped whole."""
+        normalized = normalize_posting(heading)
+        if not normalized or self._protected.match(normalized):
+            return False
+        return bool(self._headings.match(normalized)) or normalized in self.learned_headings
+
+    def heading_is_protected(self, heading: str) -> bool:
+        """Whether a section with this heading is never dropped and keeps its list items."""
+        return bool(self._protected.match(normalize_posting(heading)))
+
+    def is_boilerplate(self, text: str) -> bool:
+        """Whether a line or sentence is boilerplate."""
+        return bool(self._patterns.search(text)) or normalize_posting(text) in self._phrases
+
+    def learn(self, headings: List[str], phrases: List[str]) -> Tuple[int, int]:
+        """
+        Add learned headings and phrases and save them.
+
+        Returns:
+            Tuple of (new headings, new phrases)
+        """
+        new_headings = [h for h in dict.fromkeys(headings) if h not in self.learned_headings]
+        new_phrases = [p for p in dict.fromkeys(phrases) if p not in self._phrases]
+        self.learned_headings.extend(new_headings)
+        self.learned_phrases.extend(new_phrases)
+        self._phrases.update(new_phrases)
+        self.save()
+        return len(new_headings), len(new_phrases)
+
+    def save(self) -> None:
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': PATTERNS_VERSION, 'headings': self.learned_headings,
+                       'phrases': self.learned_phrases}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+def heading_of(line: str) -> Optional[str]:
+    """The heading text if a line is a section heading, otherwise None."""
+    match = _HEADING_RE.match(line)
+    if not match or _BULLET_RE.match(line):
+        return None
+    heading = match.group('markdown') or match.group('colon') or match.group('caps')
+    # A title-case line ending in ':' or an all-caps line of a few words; not a sentence
+    return heading.strip() if len(heading.split()) <= 8 else None
+
+def segment_posting(text: str) -> List[Dict]:
+    """
+    Split a posting into sections at heading lines.
+
+    Returns:
+        List of {"heading", "lines"} dictionaries; text before the first heading
+        is a section with an empty heading
+    """
+    sections = [{"heading": "", "lines": []}]
+    for line in text.splitlines():
+        heading = heading_of(line)
+        if heading is not None:
+            sections.append({"heading": heading, "lines": [line]})
+        else:
+            sections[-1]["lines"].append(line)
+    return [section for section in sections if section["heading"] or any(line.strip() for line in section["lines"])]
+
+def _sentences(line: str) -> List[str]:
+    return _SENTENCE_RE.split(line.strip())
+
+def clean_posting(text: str, patterns: Optional[BoilerplatePatterns] = None) -> Tuple[str, Dict]:
+    """
+    Remove boilerplate sections, lines and sentences and repeated lines from a posting.
+
+    Args:
+        text: Job posting text
+        patterns: Boilerplate patterns (default: built-in and learned from posting_boilerplate.json)
+
+    Returns:
+        Tuple of (cleaned posting, report); the report has the dropped section
+        headings, the numbers of dropped and duplicate lines, and the estimated
+        tokens before and after. A posting that would be emptied is returned unchanged.
+    """
+    patterns = patterns or BoilerplatePatterns()
+    report = {"sections_dropped": [], "lines_dropped": 0, "duplicate_lines": 0,
+              "tokens_before": estimate_tokens(text), "tokens_after": 0}
+    seen = set()
+    kept = []
+    for section in segment_posting(text):
+        if patterns.heading_is_boilerplate(section["heading"]):
+            report["sections_dropped"].append(section["heading"])
+            continue
+        protected = patterns.heading_is_protected(section["heading"])
+        for line in section["lines"]:
+            if not line.strip():
+                if kept and kept[-1]:
+                    kept.append("")
+                continue
+            key = normalize_posting(line)
+            if key and key in seen:
+                report["duplicate_lines"] += 1
+                continue
+            seen.add(key)
+            # List items of requirement sections are kept; trailing paragraphs (an EEO footer) are not
+            if not (protected and _BULLET_RE.match(line)) and patterns.is_boilerplate(line):
+                sentences = _sentences(line)
+                remaining = [sentence for sentence in sentences if not patterns.is_boilerplate(sentence)]
+                report["lines_dropped"] += len(sentences) - len(remaining)
+                if not remaining:
+                    continue
+                prefix = line[:len(line) - len(line.lstrip())]
+                line = prefix + " ".join(remaining)
+            kept.append(line.rstrip())
+
+    # Drop headings left without content
+    cleaned = []
+    for index, line in enumerate(kept):
+        following = next((later for later in kept[index + 1:] if later), None)
+        if line and heading_of(line) is not None and (following is None or heading_of(following) is not None):
+            continue
+        cleaned.append(line)
+    cleaned_text = "\n".join(cleaned).strip() + "\n"
+    if not cleaned_text.strip():
+        return text, dict(report, sections_dropped=[], lines_dropped=0, duplicate_lines=0,
+                          tokens_after=report["tokens_before"])
+    report["tokens_after"] = estimate_tokens(cleaned_text)
+    return cleaned_text, report
+
+def format_report(report: Dict) -> str:
+    """One-line summary of a cleaning report."""
+    saved = report["tokens_before"] - report["tokens_after"]
+    percent = 100 * saved / report["tokens_before"] if report["tokens_before"] else 0.0
+    parts = []
+    if report["sections_dropped"]:
+        parts.append(f"dropped {len(report['sections_dropped'])} sections ({', '.join(report['sections_dropped'])})")
+    if report["lines_dropped"]:
+        parts.append(f"{report['lines_dropped']} boilerplate lines/sentences")
+    if report["duplicate_lines"]:
+        parts.append(f"{report['duplicate_lines']} repeated lines")
+    removed = "; ".join(parts) if parts else "nothing to remove"
+    return f"{removed}; ~{saved} tokens saved in every prompt with the posting ({report['tokens_before']} -> {report['tokens_after']}, {percent:.0f}%)"
+
+def learn_boilerplate(postings: List[str], min_postings: int = DEFAULT_MIN_POSTINGS,
+                      patterns: Optional[BoilerplatePatterns] = None) -> Tuple[List[str], List[str]]:
+    """
+    Find headings and sentences shared by several postings.
+
+    Sentences in requirement, responsibility and skill sections are never learned.
+
+    Args:
+        postings: Texts of earlier job postings
+        min_postings: Number of postings a heading or sentence must occur in
+        patterns: Patterns that are already known (their matches are not learned again)
+
+    Returns:
+        Tuple of (headings, phrases), normalized
+    """
+    patterns = patterns or BoilerplatePatterns()
+    heading_counts, phrase_counts = {}, {}
+    for text in postings:
+        headings, phrases = set(), set()
+        for section in segment_posting(text):
+            if patterns.heading_is_protected(section["heading"]):
+                continue
+            heading = normalize_posting(section["heading"])
+            body = [line for line in section["lines"][1 if section["heading"] else 0:] if line.strip()]
+            # A heading is learned only with its section body, so "Location:" fields are left alone
+            if heading and body and not patterns.heading_is_boilerplate(section["heading"]):
+                headings.add(heading)
+            for line in body:
+                for sentence in _sentences(_BULLET_RE.sub("", line)):
+                    normalized = normalize_posting(sentence)
+                    if len(normalized.split()) >= MIN_LEARNED_WORDS and not patterns.is_boilerplate(sentence):
+                        phrases.add(normalized)
+        for heading in headings:
+            heading_counts[heading] = heading_counts.get(heading, 0) + 1
+        for phrase in phrases:
+            phrase_counts[phrase] = phrase_counts.get(phrase, 0) + 1
+    return ([heading for heading, count in heading_counts.items() if count >= min_postings],
+            [phrase for phrase, count in phrase_counts.items() if count >= min_postings])
+
+def main():
+    """Main function to clean a job posting or learn boilerplate from earlier postings."""
+    parser = argparse.ArgumentParser(description='Remove boilerplate from job postings before they are sent to the AI service.')
+    parser.add_argument('posting', nargs='?', help='Job posting file to clean')
+    parser.add_argument('--output', help='Write the cleaned posting to this file (default: print it)')
+    parser.add_argument('--patterns', default=DEFAULT_PATTERNS_PATH, help=f'Learned patterns file (default: {DEFAULT_PATTERNS_PATH})')
+    parser.add_argument('--learn', nargs='+', metavar='POSTING', help='Learn headings and sentences shared by these earlier postings')
+    parser.add_argument('--min-postings', type=int, default=DEFAULT_MIN_POSTINGS,
+                        help=f'With --learn, postings a sentence must occur in (default: {DEFAULT_MIN_POSTINGS})')
+    parser.add_argument('--list', action='store_true', help='List the learned headings and sentences')
+
+    args = parser.parse_args()
+    patterns = BoilerplatePatterns(args.patterns)
+
+    if args.learn:
+        postings = []
+        for path in args.learn:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    postings.append(f.read())
+            except OSError as e:
+                print(f"Error reading {path}: {e}")
+                sys.exit(1)
+        headings, phrases = learn_boilerplate(postings, args.min_postings, patterns)
+        new_headings, new_phrases = patterns.learn(headings, phrases)
+        print(f"Learned {new_headings} headings and {new_phrases} sentences from {len(postings)} postings; saved to {args.patterns}")
+        for phrase in phrases:
+            print(f"  {phrase}")
+        return
+
+    if args.list:
+        print(f"{len(patterns.learned_headings)} learned headings and {len(patterns.learned_phrases)} learned sentences in {args.patterns}")
+        for heading in patterns.learned_headings:
+            print(f"  [heading] {heading}")
+        for phrase in patterns.learned_phrases:
+            print(f"  {phrase}")
+        return
+
+    if not args.posting:
+        parser.error("a posting file, --learn or --list is required")
+    try:
+        with open(args.posting, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError as e:
+        print(f"Error reading job posting: {e}")
+        sys.exit(1)
+
+    cleaned, report = clean_posting(text, patterns)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(cleaned)
+        print(f"Wrote {args.output}")
+    else:
+        print(cleaned)
+    print(f"Cleaned {args.posting}: {format_report(report)}")
+
+if __name__ == "__main__":
+    main()
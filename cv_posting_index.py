@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Posting Index for Reusing Prior Tailoring Results
+
+Near-identical job postings (the same role at different sites, reposted
+listings) would otherwise each pay for a full job analysis and one scoring
+call per entry. This module remembers every posting the AI CV generator has
+processed, together with its job analysis and entry scores:
+
+    - postings are normalized (case, whitespace, punctuation) and fingerprinted
+      with a SHA-1 digest and a MinHash signature of their word shingles
+    - entry scores are keyed by a digest of the entry content, so entries that
+      changed since the earlier run are scored again; each score records the
+      model that produced it (the cheap or the main model of a cascade), and
+      failed scoring calls are not recorded
+
+A new posting whose estimated similarity to an earlier one reaches the
+threshold reuses that posting's analysis and entry scores; only the summary is
+regenerated.
+
+The index is stored in posting_index/index.json.
+
+Usage:
+    python cv_posting_index.py
+    python cv_posting_index.py --match job_posting.txt
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from cv_dedupe import estimated_similarity, minhash_signature, shingles
+
+INDEX_VERSION = 2
+DEFAULT_INDEX_DIR = "posting_index"
+DEFAULT_REUSE_THRESHOLD = 0.85
+
+# Serializes updates from concurrent runs in one process (tailoring_server.py)
+_INDEX_LOCK = threading.Lock()
+
+def normalize_posting(text: str) -> str:
+    """Lowercase a posting and collapse punctuation and whitespace."""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', text.lower())).strip()
+
+def fingerprint(text: str) -> str:
+    """SHA-1 digest of a normalized text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def entry_digest(entry: Dict) -> str:
+    """Digest of everything in an entry that can influence its score."""
+    return hashlib.sha1(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class PostingIndex:
+    """Persistent index of processed postings, their analyses and entry scores."""
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        self.path = os.path.join(index_dir, "index.json")
+        self.records = self._read_records()
+
+    def _read_records(self) -> List[Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data.get('postings', [])
+            if data.get('version') == 1:
+                # Version 1 stored bare [score, reasoning, improved_descriptions] lists without the model
+                postings = data.get('postings', [])
+                for record in postings:
+                    record['scores'] = {digest: {'result': result} for digest, result in record.get('scores', {}).items()}
+                return postings
+        except (OSError, ValueError):
+            pass
+        return []
+
+    def find_similar(self, job_posting: str, threshold: float = DEFAULT_REUSE_THRESHOLD) -> Tuple[Optional[Dict], float]:
+        """
+        Find the most similar earlier posting.
+
+        Returns:
+            Tuple of (record, similarity); record is None if nothing reaches the threshold
+        """
+        normalized = normalize_posting(job_posting)
+        digest = fingerprint(normalized)
+        signature = minhash_signature(shingles(normalized))
+        best, best_similarity = None, 0.0
+        for record in self.records:
+            if record['fingerprint'] == digest:
+                return record, 1.0
+            similarity = estimated_similarity(signature, record['signature'])
+            if similarity > best_similarity:
+                best, best_similarity = record, similarity
+        if best_similarity >= threshold:
+            return best, best_similarity
+        return None, best_similarity
+
+    def add(self, job_posting: str, posting_file: str, analysis: Dict, scores: Dict[str, Dict],
+            settings: Dict, output_name: str) -> Dict:
+        """Record a processed posting and save the index."""
+        normalized = normalize_posting(job_posting)
+        scores = successful_scores(scores)
+        with _INDEX_LOCK:
+            # Pick up postings recorded by other runs since this index was loaded
+            self.records = self._read_records()
+            return self._add_record(normalized, posting_file, analysis, scores, settings, output_name)
+
+    def _add_record(self, normalized: str, posting_file: str, analysis: Dict,
+                    scores: Dict[str, Dict], settings: Dict, output_name: str) -> Dict:
+        record = {
+            'id': f"posting_{max((int(r['id'].split('_')[-1]) for r in self.records), default=0) + 1:04d}",
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'posting_file': posting_file,
+            'output_name': output_name,
+            'fingerprint': fingerprint(normalized),
+            'signature': list(minhash_signature(shingles(normalized))),
+            'analysis': analysis,
+            'settings': settings,
+            'scores': scores,
+        }
+        # A posting seen again replaces its earlier record
+        self.records = [r for r in self.records if r['fingerprint'] != record['fingerprint']]
+        self.records.append(record)
+        self.save()
+        return record
+
+    def save(self) -> None:
+        os.makedirs(self.index_dir, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'postings': self.records}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+def successful_scores(scores: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Drop the results of failed scoring calls (reasoning "Error: ..."), which must not be reused."""
+    return {digest: score for digest, score in scores.items() if not str(score['result'][1]).startswith("Error:")}
+
+def reusable_scores(record: Dict, settings: Dict) -> Dict[str, Dict]:
+    """Entry scores of a record, if they were produced with the same scoring settings."""
+    if record.get('settings') != settings:
+        return {}
+    return successful_scores(record.get('scores', {}))
+
+def main():
+    """Main function to inspect the posting index."""
+    parser = argparse.ArgumentParser(description='Inspect the index of processed job postings.')
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR, help=f'Index directory (default: {DEFAULT_INDEX_DIR})')
+    parser.add_argument('--match', help='Show the closest indexed posting for this job posting file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REUSE_THRESHOLD,
+                        help=f'Similarity needed for reuse (default: {DEFAULT_REUSE_THRESHOLD})')
+
+    args = parser.parse_args()
+    index = PostingIndex(args.index_dir)
+
+    if args.match:
+        try:
+            with open(args.match, 'r', encoding='utf-8') as f:
+                job_posting = f.read()
+        except OSError as e:
+            print(f"Error reading job posting: {e}")
+            sys.exit(1)
+        record, similarity = index.find_similar(job_posting, args.threshold)
+        if record:
+            print(f"Would reuse {record['id']} ({record['posting_file']}, {record['date']}), similarity {similarity:.2f}")
+        else:
+            print(f"No posting above the {args.threshold:.2f} threshold (closest: {similarity:.2f})")
+        return
+
+    print(f"{len(index.records)} indexed postings in {index.path}")
+    for record in index.records:
+        print(f"  {record['id']}  {record['date']}  {record['posting_file']}  ({len(record['scores'])} entry scores)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Token-Minimized Prompt View of the CV Database
+
+The prompt-only approaches of the AI CV generator used to embed the database
+as indented JSON, including HTML spans, font-awesome icons, long URLs and
+fields the model never needs (tags, companies, importance). This module
+projects the database onto a compact view for prompts:
+
+    - entries are grouped by section and get stable short IDs ("e12" is
+      entry 12 of the database)
+    - field names are shortened (see VIEW_LEGEND) and empty fields are left out
+    - markup is stripped from titles and places; in descriptions, links and
+      HTML markup become short placeholders (cv_markup_codec.py) so rewritten
+      descriptions keep them; repeated bullets are dropped
+    - the JSON is written without whitespace
+
+The model answers with entry IDs (and rewritten descriptions, text blocks and
+skill order), and restore_from_view() maps the answer back onto the full
+entries, so everything the model did not rewrite keeps its formatting.
+
+Usage:
+    python cv_prompt_view.py --database cv_database.json
+"""
+
+import argparse
+import copy
+import json
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cv_markup_codec import decode_descriptions, encode_descriptions, strip_markup
+
+# tiktoken gives exact OpenAI token counts but is optional
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+VIEW_LEGEND = "id=entry ID, t=title, l=loc, i=institution, y=dates, d=descriptions"
+
+_ENCODING = None
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken if available, otherwise estimate ~4 characters per token."""
+    global _ENCODING
+    if TIKTOKEN_AVAILABLE:
+        if _ENCODING is None:
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+def entry_id(index: int) -> str:
+    """Short ID of the entry at a database position."""
+    return f"e{index}"
+
+def entry_index(short_id: str) -> Optional[int]:
+    """Database position of a short entry ID, or None if it is not one."""
+    if isinstance(short_id, str) and short_id.startswith('e') and short_id[1:].isdigit():
+        return int(short_id[1:])
+    return None
+
+def view_descriptions(entry: Dict) -> List[str]:
+    """Descriptions of an entry as sent in the view (repeated bullets dropped)."""
+    return list(dict.fromkeys(d for d in entry.get('descriptions', []) if d))
+
+def keep_originals(originals: List[str], rewritten: List[str]) -> List[str]:
+    """Decode rewritten descriptions, keeping the original wherever placeholders were lost."""
+    decoded, _ = decode_descriptions(originals, rewritten)
+    return [text if text is not None else original for text, original in zip(decoded, originals)]
+
+def view_entry(index: int, entry: Dict) -> Dict:
+    """Compact view of a single entry."""
+    view = {'id': entry_id(index)}
+    for field, key in (('title', 't'), ('loc', 'l'), ('institution', 'i')):
+        value = strip_markup(str(entry.get(field, '') or ''))
+        if value:
+            view[key] = value
+    dates = '-'.join(str(entry[field]) for field in ('start', 'end') if entry.get(field))
+    if dates:
+        view['y'] = dates
+    descriptions = view_descriptions(entry)
+    if descriptions:
+        view['d'] = encode_descriptions(descriptions)[0]
+    return view
+
+def build_prompt_view(cv_data: Dict, entry_indexes: Optional[List[int]] = None,
+                      include_profile: bool = True) -> Dict:
+    """
+    Project CV data onto the compact prompt view.
+
+    Args:
+        cv_data: The full CV data
+        entry_indexes: Database positions of the entries to include (default: all)
+        include_profile: Include text blocks and skills
+
+    Returns:
+        Dictionary with "entries" (section -> compact entries) and, with
+        include_profile, "text_blocks" (ID -> text) and "skills" (category -> names)
+    """
+    entries = cv_data.get('entries', [])
+    if entry_indexes is None:
+        entry_indexes = range(len(entries))
+    sections = {}
+    for index in entry_indexes:
+        entry = entries[index]
+        sections.setdefault(entry.get('section', 'other'), []).append(view_entry(index, entry))
+    view = {'entries': sections}
+    if include_profile:
+        view['text_blocks'] = {block.get('id'): strip_markup(block.get('content', ''))
+                               for block in cv_data.get('text_blocks', []) if block.get('id')}
+        view['skills'] = {category.get('category'): [skill.get('name') for skill in category.get('entries', category.get('skills', []))]
+                          for category in cv_data.get('skills', []) if category.get('category')}
+    return view
+
+def serialize_view(view: Dict) -> str:
+    """Serialize a view (or part of one) as whitespace-free JSON."""
+    return json.dumps(view, separators=(',', ':'), ensure_ascii=False)
+
+def view_entry_ids(view: Dict) -> set:
+    """All entry IDs in a view."""
+    return {entry['id'] for entries in view['entries'].values() for entry in entries}
+
+def restore_entries(selected: List, cv_data: Dict, allowed_ids: set,
+                    restore_descriptions: Callable[[List[str], List[str]], List[str]] = keep_originals) -> List[Dict]:
+    """
+    Map the model's entry selection back onto full entries.
+
+    Args:
+        selected: Items like {"id": "e12", "d": [rewritten descriptions]}
+        cv_data: The full CV data
+        allowed_ids: IDs that were in the prompt; anything else is ignored
+        restore_descriptions: Turns (view descriptions, rewrites with placeholders)
+            into final descriptions; by default damaged rewrites fall back to the original
+
+    Returns:
+        Copies of the selected entries in the model's order. Rewritten
+        descriptions replace the originals, which are kept in
+        original_descriptions.
+    """
+    entries = cv_data.get('entries', [])
+    restored = []
+    seen = set()
+    for item in selected if isinstance(selected, list) else []:
+        if isinstance(item, str):
+            item = {'id': item}
+        if not isinstance(item, dict) or item.get('id') not in allowed_ids or item['id'] in seen:
+            continue
+        seen.add(item['id'])
+        entry = copy.deepcopy(entries[entry_index(item['id'])])
+        descriptions = item.get('d')
+        if isinstance(descriptions, list) and descriptions and view_descriptions(entry):
+            entry['original_descriptions'] = entry.get('descriptions', [])
+            entry['descriptions'] = restore_descriptions(view_descriptions(entry), descriptions)
+        restored.append(entry)
+    return restored
+
+def restore_text_blocks(tailored: Dict, cv_data: Dict) -> List[Dict]:
+    """Original text blocks with the contents the model rewrote."""
+    blocks = []
+    for block in cv_data.get('text_blocks', []):
+        content = tailored.get(block.get('id')) if isinstance(tailored, dict) else None
+        blocks.append(dict(block, content=content) if isinstance(content, str) and content.strip() else dict(block))
+    return blocks
+
+def restore_skills(tailored: Dict, cv_data: Dict) -> List[Dict]:
+    """
+    Original skill categories in the model's order.
+
+    Categories and skills the model left out keep their place after the
+    ones it ordered, so nothing is lost.
+    """
+    original = cv_data.get('skills', [])
+    if not isinstance(tailored, dict):
+        return copy.deepcopy(original)
+    by_name = {category.get('category'): category for category in original}
+    ordered = [name for name in tailored if name in by_name]
+    ordered += [category.get('category') for category in original if category.get('category') not in ordered]
+    skills = []
+    for name in ordered:
+        category = copy.deepcopy(by_name[name])
+        key = 'entries' if 'entries' in category else 'skills'
+        names = [str(n).lower() for n in tailored.get(name, []) if isinstance(n, str)]
+        rank = {n: i for i, n in enumerate(names)}
+        if key in category:
+            category[key] = sorted(category[key], key=lambda skill: rank.get(str(skill.get('name', '')).lower(), len(rank)))
+        skills.append(category)
+    return skills
+
+def restore_from_view(response: Dict, cv_data: Dict, allowed_ids: set,
+                      restore_descriptions: Callable[[List[str], List[str]], List[str]] = keep_originals) -> Dict:
+    """
+    Build the full tailored CV from a model response in view form.
+
+    Args:
+        response: {"entries": [...], "text_blocks": {...}, "skills": {...}}
+        cv_data: The full CV data
+        allowed_ids: Entry IDs that were in the prompt
+        restore_descriptions: See restore_entries()
+
+    Returns:
+        Tailored CV data in the database structure
+    """
+    return {
+        'meta': cv_data.get('meta', {}),
+        'contact_info': cv_data.get('contact_info', {}),
+        'text_blocks': restore_text_blocks(response.get('text_blocks'), cv_data),
+        'skills': restore_skills(response.get('skills'), cv_data),
+        'entries': restore_entries(response.get('entries'), cv_data, allowed_ids, restore_descriptions),
+    }
+
+def view_token_report(cv_data: Dict, view: Dict) -> Tuple[int, int]:
+    """Return (tokens of the indented full JSON, tokens of the compact view)."""
+    return estimate_tokens(json.dumps(cv_data, indent=2)), estimate_tokens(serialize_view(view))
+
+def main():
+    """Main function to print the prompt view of a database and its token savings."""
+    parser = argparse.ArgumentParser(description='Show the compact prompt view of a CV database.')
+    parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    parser.add_argument('--print', action='store_true', help='Print the view itself')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.database, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+    except Exception as e:
+        print(f"Error loading JSON file: {e}")
+        sys.exit(1)
+
+    view = build_prompt_view(database)
+    if args.print:
+        print(serialize_view(view))
+    before, after = view_token_report(database, view)
+    counter = "tiktoken cl100k_base" if TIKTOKEN_AVAILABLE else "estimated at 4 characters per token"
+    print(f"Full JSON: {before} tokens, prompt view: {after} tokens "
+          f"({100 * (1 - after / max(before, 1)):.0f}% smaller; {counter})")
+
+if __name__ == "__main__":
+    main()
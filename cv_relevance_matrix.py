@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Requirement-by-Entry Relevance Matrix
+
+Entry-by-entry scoring sends the whole job analysis once per entry. Matrix
+scoring asks the model for a compact relevance matrix instead: rows are the
+requirements of the job analysis, columns are entry IDs, and each cell rates
+how well the entry shows the requirement:
+
+    0 = not at all, 1 = weakly, 2 = partly, 3 = strongly
+
+Entries are sent in chunks of about --matrix-chunk-cells cells per request,
+so a run needs roughly (requirements x entries) / chunk cells requests
+instead of one per entry. Everything else is computed locally from the
+matrix:
+
+    - entry scores (0-10): the best rating per requirement category, weighted
+      by category (DEFAULT_CATEGORY_WEIGHTS, overridable with --matrix-weights)
+    - coverage: which requirements the selected entries show, and which
+      requirements no entry shows at all
+
+The matrix is saved next to the tailored JSON (<output>_matrix.json), so
+categories can be re-weighted without new API calls:
+
+Usage:
+    python cv_relevance_matrix.py tailored_json/CompanyX_2026-10-18_matrix.json
+    python cv_relevance_matrix.py tailored_json/CompanyX_2026-10-18_matrix.json --weights '{"Soft skills emphasized": 0}'
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from cv_markup_codec import strip_markup
+from cv_prompt_view import entry_id
+
+MATRIX_VERSION = 1
+MATRIX_SCALE = 3
+
+# Rating from which a requirement counts as shown by an entry
+COVERED_RATING = 2
+
+DEFAULT_MATRIX_CHUNK_CELLS = 400
+
+DEFAULT_CATEGORY_WEIGHTS = {
+    "Required skills and technologies": 3.0,
+    "Desired experience areas": 2.0,
+    "Key responsibilities": 2.0,
+    "Industry and domain-specific knowledge required": 1.5,
+    "Soft skills emphasized": 0.5
+}
+
+# Weight of analysis categories not listed in DEFAULT_CATEGORY_WEIGHTS
+OTHER_CATEGORY_WEIGHT = 1.0
+
+def requirement_rows(job_analysis: Dict) -> List[Dict]:
+    """Requirements of the job analysis with short IDs ("r1", ...), repeated requirements dropped."""
+    rows = []
+    seen = set()
+    for category, items in job_analysis.items():
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, str) or not item.strip() or item.strip().lower() in seen:
+                continue
+            seen.add(item.strip().lower())
+            rows.append({"id": f"r{len(rows) + 1}", "category": category, "text": item.strip()})
+    return rows
+
+def matrix_entry(index: int, entry: Dict) -> Dict:
+    """Plain-text view of an entry for matrix prompts (nothing is rewritten, so markup is dropped)."""
+    view = {"id": entry_id(index), "t": strip_markup(str(entry.get("title", "") or ""))}
+    institution = strip_markup(str(entry.get("institution", "") or ""))
+    if institution:
+        view["i"] = institution
+    descriptions = [strip_markup(d) for d in dict.fromkeys(entry.get("descriptions", [])) if d]
+    if descriptions:
+        view["d"] = descriptions
+    return view
+
+def chunk_columns(entry_indexes: List[int], num_requirements: int, chunk_cells: int) -> List[List[int]]:
+    """Split the entries into chunks of about chunk_cells matrix cells each."""
+    per_chunk = max(1, chunk_cells // max(num_requirements, 1))
+    return [entry_indexes[start:start + per_chunk] for start in range(0, len(entry_indexes), per_chunk)]
+
+def parse_matrix_rows(response: Dict, requirements: List[Dict], column_ids: List[str]) -> Tuple[Dict[str, List[int]], int]:
+    """
+    Validate the rows of one chunk's response.
+
+    Returns:
+        Tuple of (requirement ID -> one rating per column, number of rows that
+        were missing or malformed; those are all zeros)
+    """
+    rows = response.get("rows", response) if isinstance(response, dict) else {}
+    parsed = {}
+    invalid = 0
+    for requirement in requirements:
+        row = rows.get(requirement["id"]) if isinstance(rows, dict) else None
+        if isinstance(row, list) and len(row) == len(column_ids):
+            try:
+                parsed[requirement["id"]] = [min(max(int(value), 0), MATRIX_SCALE) for value in row]
+                continue
+            except (TypeError, ValueError):
+                pass
+        invalid += 1
+        parsed[requirement["id"]] = [0] * len(column_ids)
+    return parsed, invalid
+
+def new_matrix(requirements: List[Dict], cv_data: Dict, entry_indexes: List[int]) -> Dict:
+    """Empty matrix document for the given requirements and entries."""
+    entries = cv_data.get("entries", [])
+    return {
+        "version": MATRIX_VERSION,
+        "requirements": requirements,
+        "entries": [{"id": entry_id(index), "section": entries[index].get("section", "other"),
+                     "title": strip_markup(str(entries[index].get("title", "") or ""))} for index in entry_indexes],
+        "rows": {requirement["id"]: [0] * len(entry_indexes) for requirement in requirements}
+    }
+
+def fill_columns(matrix: Dict, column_ids: List[str], rows: Dict[str, List[int]]) -> None:
+    """Write one chunk's ratings into the matrix."""
+    positions = {entry["id"]: position for position, entry in enumerate(matrix["entries"])}
+    for requirement_id, ratings in rows.items():
+        row = matrix["rows"][requirement_id]
+        for column_id, rating in zip(column_ids, ratings):
+            row[positions[column_id]] = rating
+
+def entry_scores(matrix: Dict, weights: Optional[Dict[str, float]] = None) -> Dict[str, Tuple[float, str]]:
+    """
+    Score every entry of a matrix on the 0-10 scale of entry-by-entry scoring.
+
+    For each requirement category, an entry's best rating is taken; the
+    category results are averaged with the category weights.
+
+    Args:
+        matrix: Matrix document
+        weights: Category weights overriding DEFAULT_CATEGORY_WEIGHTS
+
+    Returns:
+        Entry ID -> (score, reasoning)
+    """
+    weights = dict(DEFAULT_CATEGORY_WEIGHTS, **(weights or {}))
+    categories = list(dict.fromkeys(requirement["category"] for requirement in matrix["requirements"]))
+    total_weight = sum(max(weights.get(category, OTHER_CATEGORY_WEIGHT), 0.0) for category in categories)
+    scores = {}
+    for position, entry in enumerate(matrix["entries"]):
+        best = {}
+        matched = []
+        for requirement in matrix["requirements"]:
+            rating = matrix["rows"][requirement["id"]][position]
+            best[requirement["category"]] = max(best.get(requirement["category"], 0), rating)
+            if rating >= COVERED_RATING:
+                matched.append(requirement["text"])
+        weighted = sum(max(weights.get(category, OTHER_CATEGORY_WEIGHT), 0.0) * best.get(category, 0) / MATRIX_SCALE
+                       for category in categories)
+        score = round(10.0 * weighted / total_weight, 1) if total_weight > 0 else 0.0
+        reasoning = f"Shows {', '.join(matched[:5])}" + ("..." if len(matched) > 5 else "") if matched else "Shows none of the job requirements"
+        scores[entry["id"]] = (score, reasoning)
+    return scores
+
+def coverage(matrix: Dict, selected_ids: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Requirement coverage by the selected entries (or by all entries).
+
+    Returns:
+        One item per requirement with its best rating among the selected
+        entries, the IDs of the entries that show it, and its best rating
+        among all entries
+    """
+    positions = {entry["id"]: position for position, entry in enumerate(matrix["entries"])}
+    selected = [positions[i] for i in selected_ids if i in positions] if selected_ids is not None else list(positions.values())
+    report = []
+    for requirement in matrix["requirements"]:
+        row = matrix["rows"][requirement["id"]]
+        report.append({
+            "requirement": requirement["text"],
+            "category": requirement["category"],
+            "best": max((row[p] for p in selected), default=0),
+            "shown_by": [matrix["entries"][p]["id"] for p in selected if row[p] >= COVERED_RATING],
+            "best_overall": max(row, default=0)
+        })
+    return report
+
+def coverage_summary(report: List[Dict]) -> List[str]:
+    """Printable lines summarizing a coverage report."""
+    covered = [item for item in report if item["best"] >= COVERED_RATING]
+    lines = [f"Requirement coverage: {len(covered)} of {len(report)} requirements shown by the selected entries"]
+    missed = [item for item in report if item["best"] < COVERED_RATING]
+    available = [item["requirement"] for item in missed if item["best_overall"] >= COVERED_RATING]
+    absent = [item["requirement"] for item in missed if item["best_overall"] < COVERED_RATING]
+    if available:
+        lines.append(f"  Shown by entries that were not selected: {', '.join(available)}")
+    if absent:
+        lines.append(f"  Not shown by any entry: {', '.join(absent)}")
+    return lines
+
+def save_matrix(matrix: Dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(matrix, f, indent=2, ensure_ascii=False)
+
+def load_matrix(path: str) -> Dict:
+    """
+    Load a saved matrix.
+
+    Raises:
+        ValueError: If the file is from another version
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        matrix = json.load(f)
+    if matrix.get("version") != MATRIX_VERSION:
+        raise ValueError(f"Matrix {path} was written by an incompatible version")
+    return matrix
+
+def main():
+    """Main function to re-score and show coverage from a saved matrix with other weights."""
+    parser = argparse.ArgumentParser(description='Re-score entries from a saved relevance matrix.')
+    parser.add_argument('matrix', help='Matrix file written by --matrix-scoring (<output>_matrix.json)')
+    parser.add_argument('--weights', help='JSON string mapping requirement categories to weights')
+    parser.add_argument('--top', type=int, default=3, help='Entries shown per section (default: 3)')
+
+    args = parser.parse_args()
+
+    try:
+        matrix = load_matrix(args.matrix)
+        weights = json.loads(args.weights) if args.weights else matrix.get("weights")
+    except (OSError, ValueError) as e:
+        print(f"Error loading matrix: {e}")
+        sys.exit(1)
+
+    scores = entry_scores(matrix, weights)
+    print(f"{len(matrix['requirements'])} requirements x {len(matrix['entries'])} entries")
+    for category, weight in dict(DEFAULT_CATEGORY_WEIGHTS, **(weights or {})).items():
+        print(f"  weight {weight:g}: {category}")
+
+    sections = {}
+    for entry in matrix["entries"]:
+        sections.setdefault(entry["section"], []).append(entry)
+    top_ids = []
+    for section, entries in sections.items():
+        ranked = sorted(entries, key=lambda e: scores[e["id"]][0], reverse=True)[:args.top]
+        print(f"\n{section}:")
+        for entry in ranked:
+            score, reasoning = scores[entry["id"]]
+            print(f"  {score:4.1f}  {entry['id']:>6}  {entry['title'][:60]}  ({reasoning[:60]})")
+        top_ids.extend(entry["id"] for entry in ranked)
+
+    print()
+    for line in coverage_summary(coverage(matrix, top_ids)):
+        print(line)
+
+if __name__ == "__main__":
+    main()
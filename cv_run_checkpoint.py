@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Checkpoints for Resumable Tailoring Runs
+
+Every run of the AI CV generator gets a run directory under runs/ in which
+each completed stage is saved as soon as it finishes:
+
+    runs/<run-id>/run.json       - the run's arguments and completed stages
+    runs/<run-id>/posting.txt    - the job posting text
+    runs/<run-id>/entries.jsonl  - one line per entry scored by the AI service,
+                                   with the model that scored it
+
+If a run stops (network error, Ctrl-C, an API failure), running the generator
+with `--resume <run-id>` restores the arguments, skips every completed stage
+and only scores the entries that were not scored yet. Entry results are keyed
+by the entry's content digest, so entries edited in the meantime are scored
+again.
+
+Usage:
+    python cv_run_checkpoint.py            # list runs
+    python cv_run_checkpoint.py <run-id>   # show the stages of one run
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+DEFAULT_RUNS_DIR = "runs"
+CHECKPOINT_VERSION = 1
+
+class RunCheckpoint:
+    """Stage and entry checkpoints of one tailoring run."""
+
+    def __init__(self, run_dir: str, state: Dict):
+        self.run_dir = run_dir
+        self.run_id = os.path.basename(run_dir)
+        self.state = state
+        self.entries_path = os.path.join(run_dir, "entries.jsonl")
+
+    @classmethod
+    def create(cls, arguments: Dict, runs_dir: str = DEFAULT_RUNS_DIR) -> "RunCheckpoint":
+        """Start a new run directory for the given arguments."""
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(runs_dir, exist_ok=True)
+        run_dir = os.path.join(runs_dir, run_id)
+        suffix = 1
+        # Claim the directory atomically: runs started in the same second by
+        # concurrent workers each get their own suffix
+        while True:
+            try:
+                os.mkdir(run_dir)
+                break
+            except FileExistsError:
+                suffix += 1
+                run_dir = os.path.join(runs_dir, f"{run_id}_{suffix}")
+        checkpoint = cls(run_dir, {
+            'version': CHECKPOINT_VERSION,
+            'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'arguments': arguments,
+            'stages': {},
+            'completed': False,
+        })
+        checkpoint._write_state()
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str, runs_dir: str = DEFAULT_RUNS_DIR) -> "RunCheckpoint":
+        """
+        Open an existing run.
+
+        Raises:
+            FileNotFoundError: If the run does not exist
+            ValueError: If its state file is unreadable or from another version
+        """
+        run_dir = os.path.join(runs_dir, run_id)
+        with open(os.path.join(run_dir, "run.json"), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Run {run_id} was written by an incompatible version")
+        return cls(run_dir, state)
+
+    @property
+    def arguments(self) -> Dict:
+        return self.state['arguments']
+
+    def _write_state(self) -> None:
+        path = os.path.join(self.run_dir, "run.json")
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def stage(self, name: str) -> Optional[Any]:
+        """Return the saved result of a completed stage, or None."""
+        return self.state['stages'].get(name)
+
+    def complete_stage(self, name: str, result: Any = True) -> None:
+        """Save the result of a stage as soon as it completes."""
+        self.state['stages'][name] = result
+        self._write_state()
+
+    def mark_completed(self) -> None:
+        self.state['completed'] = True
+        self._write_state()
+
+    def save_posting(self, job_posting: str) -> None:
+        with open(os.path.join(self.run_dir, "posting.txt"), 'w', encoding='utf-8') as f:
+            f.write(job_posting)
+
+    def read_posting(self) -> str:
+        with open(os.path.join(self.run_dir, "posting.txt"), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def entry_records(self) -> Dict[str, Dict]:
+        """
+        Scored entries so far, keyed by entry digest.
+
+        Each record holds the result and, if it was saved, the model that
+        produced it; an entry scored again (an escalation) keeps its last record.
+        """
+        records = {}
+        try:
+            with open(self.entries_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short when the run stopped
+                        continue
+                    records[record['digest']] = record
+        except OSError:
+            pass
+        return records
+
+    def entry_results(self) -> Dict[str, List]:
+        """Scored entry results so far, keyed by entry digest."""
+        return {digest: record['result'] for digest, record in self.entry_records().items()}
+
+    def save_entry(self, digest: str, result: List, model: Optional[str] = None) -> None:
+        """Append one scored entry; the line is flushed to disk before returning."""
+        record = {'digest': digest, 'result': result}
+        if model:
+            record['model'] = model
+        with open(self.entries_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def list_runs(runs_dir: str = DEFAULT_RUNS_DIR) -> List[RunCheckpoint]:
+    """Return all readable runs, oldest first."""
+    runs = []
+    if not os.path.isdir(runs_dir):
+        return runs
+    for run_id in sorted(os.listdir(runs_dir)):
+        try:
+            runs.append(RunCheckpoint.load(run_id, runs_dir))
+        except (OSError, ValueError):
+            continue
+    return runs
+
+def main():
+    """Main function to list runs and their checkpoints."""
+    parser = argparse.ArgumentParser(description='List checkpointed AI CV generator runs.')
+    parser.add_argument('run_id', nargs='?', help='Show the stages of this run')
+    parser.add_argument('--runs-dir', default=DEFAULT_RUNS_DIR, help=f'Run directory (default: {DEFAULT_RUNS_DIR})')
+
+    args = parser.parse_args()
+
+    if args.run_id:
+        try:
+            run = RunCheckpoint.load(args.run_id, args.runs_dir)
+        except (OSError, ValueError) as e:
+            print(f"Error loading run {args.run_id}: {e}")
+            sys.exit(1)
+        print(f"Run {run.run_id} ({run.state['created']}), {'completed' if run.state['completed'] else 'not completed'}")
+        print(f"  Job posting: {run.arguments.get('job_posting')}")
+        for name in run.state['stages']:
+            print(f"  - {name}: done")
+        print(f"  Entries scored: {len(run.entry_results())}")
+        return
+
+    runs = list_runs(args.runs_dir)
+    print(f"{len(runs)} runs in {args.runs_dir}")
+    for run in runs:
+        status = "completed" if run.state['completed'] else f"stopped after {len(run.state['stages'])} stages"
+        print(f"  {run.run_id}  {run.arguments.get('job_posting')}  {status}, {len(run.entry_results())} entries scored")
+
+if __name__ == "__main__":
+    main()
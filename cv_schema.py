@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+CV Database Schema Validation
+
+This module validates cv_database.json (and tailored JSON files) at load time,
+so malformed entries are reported up front instead of surfacing deep inside
+the CSV writer or as R errors halfway through a render. Every error is
+reported in one pass with its JSON path, for example:
+
+    $.entries[12].descriptions: expected a list of strings, got str
+    $.entries[40].importance: expected a number, got str
+    $.entries[41].section: required field is missing
+
+The schema is compiled once into flat lists of checker functions, and
+databases that already passed validation are skipped by content hash (the
+cache lives in .cv_schema_cache.json next to the database).
+
+Usage:
+    python cv_schema.py --database cv_database.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bump when the schema changes so cached results are invalidated
+SCHEMA_VERSION = 1
+
+CACHE_FILE_NAME = ".cv_schema_cache.json"
+
+# ---------------------------------------------------------------------------
+# Type checkers. Each returns None when the value is valid, otherwise a short
+# description of what was expected.
+# ---------------------------------------------------------------------------
+
+def _type_name(value: Any) -> str:
+    """Return a JSON-flavoured type name for error messages."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list):
+        return "list"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+def _check_str(value: Any) -> Optional[str]:
+    return None if type(value) is str else "a string"
+
+def _check_number(value: Any) -> Optional[str]:
+    value_type = type(value)
+    return None if value_type is int or value_type is float else "a number"
+
+def _check_str_or_number(value: Any) -> Optional[str]:
+    value_type = type(value)
+    return None if value_type is str or value_type is int or value_type is float else "a string or number"
+
+def _check_str_list(value: Any) -> Optional[str]:
+    if type(value) is not list:
+        return "a list of strings"
+    for item in value:
+        if type(item) is not str:
+            return "a list of strings"
+    return None
+
+def _check_object(value: Any) -> Optional[str]:
+    return None if type(value) is dict else "an object"
+
+def _check_contact_value(value: Any) -> Optional[str]:
+    # Legacy format is a plain string; the current format is {"value": ..., "icon": ...}
+    if type(value) is str:
+        return None
+    if type(value) is dict and type(value.get('value')) is str and type(value.get('icon', '')) is str:
+        return None
+    return 'a string or an object with string "value" and "icon"'
+
+# ---------------------------------------------------------------------------
+# Schema definition: (field, checker, required) for each record type
+# ---------------------------------------------------------------------------
+
+ENTRY_FIELDS = [
+    ('section', _check_str, True),
+    ('title', _check_str, False),
+    ('loc', _check_str, False),
+    ('institution', _check_str, False),
+    ('start', _check_str, False),
+    ('end', _check_str, False),
+    ('descriptions', _check_str_list, False),
+    ('companies', _check_str_list, False),
+    ('tags', _check_str_list, False),
+    ('importance', _check_number, False),
+    # Added to tailored JSON files by ai_cv_generator.py
+    ('relevance_score', _check_number, False),
+    ('relevance_reasoning', _check_str, False),
+    ('original_descriptions', _check_str_list, False),
+]
+
+TEXT_BLOCK_FIELDS = [
+    ('id', _check_str, True),
+    ('content', _check_str, False),
+    ('tags', _check_str_list, False),
+]
+
+SKILL_CATEGORY_FIELDS = [
+    ('category', _check_str, True),
+    ('entries', None, False),  # Validated as a list of skill records below
+    ('skills', None, False),   # Older name for 'entries'
+    ('tags', _check_str_list, False),
+]
+
+SKILL_FIELDS = [
+    ('name', _check_str, True),
+    ('level', _check_str_or_number, False),
+]
+
+TOP_LEVEL_FIELDS = [
+    ('meta', _check_object, False),
+    ('contact_info', _check_object, False),
+    ('entries', None, True),
+    ('text_blocks', None, False),
+    ('skills', None, False),
+]
+
+Checker = Callable[[Any], Optional[str]]
+
+def compile_record_validator(fields: List[Tuple[str, Optional[Checker], bool]]) -> Callable[[Dict, str, List[str]], None]:
+    """
+    Compile a record field table into a single validation function.
+
+    The returned function appends error messages for a record to the error
+    list. Required and optional fields are split ahead of time so the hot
+    loop only does dictionary lookups and direct type checks.
+    """
+    required = tuple(name for name, _, is_required in fields if is_required)
+    checked = tuple((name, checker) for name, checker, _ in fields if checker is not None)
+
+    def validate_record(record: Any, path: str, errors: List[str]) -> None:
+        if type(record) is not dict:
+            errors.append(f"{path}: expected an object, got {_type_name(record)}")
+            return
+        for name in required:
+            if name not in record:
+                errors.append(f"{path}.{name}: required field is missing")
+        for name, checker in checked:
+            if name in record:
+                problem = checker(record[name])
+                if problem is not None:
+                    errors.append(f"{path}.{name}: expected {problem}, got {_type_name(record[name])}")
+
+    return validate_record
+
+_validate_entry = compile_record_validator(ENTRY_FIELDS)
+_validate_text_block = compile_record_validator(TEXT_BLOCK_FIELDS)
+_validate_skill_category = compile_record_validator(SKILL_CATEGORY_FIELDS)
+_validate_skill = compile_record_validator(SKILL_FIELDS)
+_validate_top_level = compile_record_validator(TOP_LEVEL_FIELDS)
+
+def _validate_list(data: Dict, key: str, validate_item: Callable[[Any, str, List[str]], None],
+                   path: str, errors: List[str]) -> List:
+    """Validate that data[key] is a list and run the item validator on every element."""
+    items = data.get(key)
+    if items is None:
+        return []
+    if type(items) is not list:
+        errors.append(f"{path}.{key}: expected a list, got {_type_name(items)}")
+        return []
+    item_path = f"{path}.{key}"
+    for index, item in enumerate(items):
+        validate_item(item, f"{item_path}[{index}]", errors)
+    return items
+
+def validate_database(data: Any) -> List[str]:
+    """
+    Validate a CV database and return every error found (empty if valid).
+
+    Args:
+        data: The parsed JSON data
+
+    Returns:
+        List of error messages, each prefixed with the JSON path of the problem
+    """
+    errors = []
+    _validate_top_level(data, "$", errors)
+    if type(data) is not dict:
+        return errors
+
+    _validate_list(data, 'entries', _validate_entry, "$", errors)
+    _validate_list(data, 'text_blocks', _validate_text_block, "$", errors)
+
+    categories = _validate_list(data, 'skills', _validate_skill_category, "$", errors)
+    for index, category in enumerate(categories):
+        if type(category) is dict:
+            for key in ('entries', 'skills'):
+                _validate_list(category, key, _validate_skill, f"$.skills[{index}]", errors)
+
+    contact_info = data.get('contact_info')
+    if type(contact_info) is dict:
+        for key, value in contact_info.items():
+            problem = _check_contact_value(value)
+            if problem is not None:
+                errors.append(f"$.contact_info.{key}: expected {problem}, got {_type_name(value)}")
+
+    return errors
+
+def _cache_path(database_path: str) -> str:
+    """Return the validation cache file that sits next to the database."""
+    return os.path.join(os.path.dirname(os.path.abspath(database_path)), CACHE_FILE_NAME)
+
+def _load_cache(database_path: str) -> Dict:
+    try:
+        with open(_cache_path(database_path), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('schema_version') == SCHEMA_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'schema_version': SCHEMA_VERSION, 'validated': {}}
+
+def is_known_valid(database_path: str, digest: str) -> bool:
+    """Check whether this exact file content already passed validation."""
+    cache = _load_cache(database_path)
+    return cache['validated'].get(os.path.basename(database_path)) == digest
+
+def remember_valid(database_path: str, digest: str) -> None:
+    """Record that this file content passed validation."""
+    cache = _load_cache(database_path)
+    cache['validated'][os.path.basename(database_path)] = digest
+    try:
+        with open(_cache_path(database_path), 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        # The cache is only an optimization; read-only directories are fine
+        pass
+
+def report_errors(errors: List[str], source: str, max_errors: int = 50) -> None:
+    """Print validation errors, truncating very long lists."""
+    print(f"Found {len(errors)} schema error{'s' if len(errors) != 1 else ''} in {source}:")
+    for error in errors[:max_errors]:
+        print(f"  - {error}")
+    if len(errors) > max_errors:
+        print(f"  ... and {len(errors) - max_errors} more")
+
+def validate_or_exit(data: Any, source: str, strict: bool = True) -> List[str]:
+    """
+    Validate in-memory data and report any errors.
+
+    Args:
+        data: The parsed JSON data
+        source: Name of the file or step the data came from (for messages)
+        strict: Exit the program if errors are found; otherwise only warn
+
+    Returns:
+        List of error messages
+    """
+    errors = validate_database(data)
+    if errors:
+        report_errors(errors, source)
+        if strict:
+            sys.exit(1)
+        print("Continuing despite schema errors.")
+    return errors
+
+def load_validated_json(json_path: str, strict: bool = True) -> Dict:
+    """
+    Load a CV database and validate it, skipping validation for unchanged files.
+
+    Args:
+        json_path: Path to the JSON file
+        strict: Exit the program if errors are found; otherwise only warn
+
+    Returns:
+        The parsed JSON data
+    """
+    try:
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+    except Exception as e:
+        print(f"Error loading JSON file: {e}")
+        sys.exit(1)
+
+    digest = hashlib.sha256(raw).hexdigest()
+    if is_known_valid(json_path, digest):
+        return data
+
+    errors = validate_or_exit(data, json_path, strict)
+    if not errors:
+        remember_valid(json_path, digest)
+    return data
+
+def main():
+    """Main function to validate a database from the command line."""
+    parser = argparse.ArgumentParser(description='Validate a CV database JSON file.')
+    parser.add_argument('--database', default='cv_database.json', help='Path to the database file')
+    parser.add_argument('--no-cache', action='store_true', help='Validate even if the file is unchanged since the last check')
+
+    args = parser.parse_args()
+
+    if args.no_cache:
+        try:
+            with open(args.database, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading JSON file: {e}")
+            sys.exit(1)
+        validate_or_exit(data, args.database)
+    else:
+        load_validated_json(args.database)
+    print(f"{args.database} is valid")
+
+if __name__ == "__main__":
+    main()
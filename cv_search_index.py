@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Index for the CV Database
+
+This module maintains a positional inverted index over entry titles,
+descriptions, institutions, tags, companies and sections. The index is
+persisted next to the database (cv_database.search_index.json for
+cv_database.json) and updated incrementally: only entries whose content
+changed since the last save are re-indexed.
+
+Query syntax:
+    methylation               - word anywhere in the entry
+    methyl*                   - prefix match
+    "cell-free DNA"           - phrase match
+    tag:software              - field-scoped (title, desc, institution, tag, company, section)
+    tag:software title:"Ph.D." - clauses are combined with AND
+
+Usage:
+    from cv_search_index import load_search_index, search_entries
+
+    index = load_search_index(database, "cv_database.json")
+    results = search_entries(index, 'tag:software title:"Ph.D."')
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+INDEX_VERSION = 2
+
+# Field name -> entry keys whose text is indexed under it
+INDEXED_FIELDS = {
+    'title': ['title'],
+    'desc': ['descriptions'],
+    'institution': ['institution', 'loc'],
+    'tag': ['tags'],
+    'company': ['companies'],
+    'section': ['section'],
+}
+
+# Alternative spellings accepted in field-scoped queries
+FIELD_ALIASES = {
+    'description': 'desc',
+    'descriptions': 'desc',
+    'inst': 'institution',
+    'loc': 'institution',
+    'tags': 'tag',
+    'companies': 'company',
+}
+
+# Title matches rank above matches elsewhere
+FIELD_WEIGHTS = {'title': 3.0, 'tag': 2.0, 'section': 2.0}
+
+_MARKDOWN_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_HTML_ENTITY_RE = re.compile(r'&[a-z]+;|&#\d+;')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_QUERY_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into words, ignoring link targets and HTML markup."""
+    text = _MARKDOWN_LINK_RE.sub(r'\1', text)
+    text = _HTML_TAG_RE.sub(' ', text)
+    text = _HTML_ENTITY_RE.sub(' ', text)
+    return _TOKEN_RE.findall(text.lower())
+
+def index_path_for(database_path: str) -> str:
+    """Return the path of the search index stored next to the database."""
+    return os.path.splitext(database_path)[0] + ".search_index.json"
+
+def entry_digest(entry: Dict) -> str:
+    """Hash the indexed content of an entry so unchanged entries can be skipped."""
+    content = {key: entry.get(key) for keys in INDEXED_FIELDS.values() for key in keys}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def _entry_field_tokens(entry: Dict) -> Dict[str, List[Optional[str]]]:
+    """
+    Return the token sequence of every indexed field of an entry.
+
+    Separate values (list items such as tags or bullets, or the title and
+    location of an institution) are divided by a None separator, which takes
+    up a position, so a phrase cannot match across two of them.
+    """
+    field_tokens = {}
+    for field, keys in INDEXED_FIELDS.items():
+        tokens = []
+        for key in keys:
+            value = entry.get(key)
+            items = value if isinstance(value, list) else [value] if value else []
+            for item in items:
+                item_tokens = tokenize(str(item))
+                if item_tokens:
+                    if tokens:
+                        tokens.append(None)
+                    tokens.extend(item_tokens)
+        if tokens:
+            field_tokens[field] = tokens
+    return field_tokens
+
+def new_search_index() -> Dict:
+    """Create an empty index."""
+    return {
+        'version': INDEX_VERSION,
+        'database_digest': '',
+        'entry_digests': [],
+        'doc_terms': {},
+        'postings': {field: {} for field in INDEXED_FIELDS},
+    }
+
+def _remove_document(index: Dict, doc: str) -> None:
+    """Remove all postings of one entry position."""
+    for field, terms in index['doc_terms'].pop(doc, {}).items():
+        field_postings = index['postings'][field]
+        for term in terms:
+            docs = field_postings.get(term)
+            if docs is not None:
+                docs.pop(doc, None)
+                if not docs:
+                    del field_postings[term]
+
+def _add_document(index: Dict, doc: str, entry: Dict) -> None:
+    """Add the postings of one entry position."""
+    doc_terms = {}
+    for field, tokens in _entry_field_tokens(entry).items():
+        field_postings = index['postings'][field]
+        for position, token in enumerate(tokens):
+            if token is not None:
+                field_postings.setdefault(token, {}).setdefault(doc, []).append(position)
+        doc_terms[field] = sorted(set(tokens) - {None})
+    index['doc_terms'][doc] = doc_terms
+
+def update_search_index(index: Dict, entries: List[Dict]) -> int:
+    """
+    Bring the index up to date with the entries, re-indexing only changed positions.
+
+    Args:
+        index: Index to update in place
+        entries: Current database entries (IDs are list positions, as in the editor)
+
+    Returns:
+        Number of entry positions that were re-indexed or removed
+    """
+    old_digests = index['entry_digests']
+    new_digests = [entry_digest(entry) for entry in entries]
+    changed = 0
+
+    for position, digest in enumerate(new_digests):
+        if position < len(old_digests) and old_digests[position] == digest:
+            continue
+        doc = str(position)
+        _remove_document(index, doc)
+        _add_document(index, doc, entries[position])
+        changed += 1
+
+    # Entries removed from the end of the list
+    for position in range(len(new_digests), len(old_digests)):
+        _remove_document(index, str(position))
+        changed += 1
+
+    index['entry_digests'] = new_digests
+    index.pop('_sorted_terms', None)
+    return changed
+
+def save_search_index(index: Dict, index_path: str) -> None:
+    """Write the index to disk."""
+    persisted = {key: value for key, value in index.items() if not key.startswith('_')}
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(persisted, f, ensure_ascii=False, separators=(',', ':'))
+
+def _read_search_index(index_path: str) -> Dict:
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return new_search_index()
+
+def database_digest(database: Dict) -> str:
+    """Digest of the database entries, used to tell whether an index is up to date."""
+    return hashlib.sha1(json.dumps(database.get('entries', []), sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def refresh_search_index(database: Dict, database_path: str) -> Tuple[Dict, int]:
+    """
+    Load the persisted index, update it incrementally and save it if anything changed.
+
+    Returns:
+        Tuple of (index, number of re-indexed entry positions)
+    """
+    index_path = index_path_for(database_path)
+    index = _read_search_index(index_path)
+    digest = database_digest(database)
+    if index['database_digest'] == digest:
+        return index, 0
+
+    changed = update_search_index(index, database.get('entries', []))
+    index['database_digest'] = digest
+    try:
+        save_search_index(index, index_path)
+    except OSError as e:
+        print(f"Warning: could not save search index {index_path}: {e}")
+    return index, changed
+
+def load_search_index(database: Dict, database_path: str) -> Dict:
+    """Return an up-to-date index for the database, building or updating it as needed."""
+    index, _ = refresh_search_index(database, database_path)
+    return index
+
+def parse_query(query: str) -> List[Dict]:
+    """
+    Parse a query string into clauses.
+
+    Each clause has: field (None for all fields), tokens, phrase (bool) and prefix (bool).
+    """
+    clauses = []
+    for field, quoted, bare in _QUERY_RE.findall(query):
+        if field:
+            field = FIELD_ALIASES.get(field.lower(), field.lower())
+            if field not in INDEXED_FIELDS:
+                # Not a known field, e.g. "http://..." - search the whole text instead
+                bare = f"{field}:{quoted or bare}"
+                field, quoted = None, ''
+        else:
+            field = None
+        text = quoted if quoted else bare
+        prefix = not quoted and text.endswith('*')
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        clauses.append({
+            'field': field,
+            'tokens': tokens,
+            # Unquoted values like Ph.D. split into several tokens and must stay adjacent
+            'phrase': len(tokens) > 1,
+            'prefix': prefix,
+        })
+    return clauses
+
+def _sorted_terms(index: Dict, field: str) -> List[str]:
+    cache = index.setdefault('_sorted_terms', {})
+    if field not in cache:
+        cache[field] = sorted(index['postings'][field])
+    return cache[field]
+
+def _match_term(index: Dict, field: str, token: str, prefix: bool) -> Dict[str, List[int]]:
+    """Return {doc: positions} for a single token (or all tokens with the prefix)."""
+    field_postings = index['postings'][field]
+    if not prefix:
+        return field_postings.get(token, {})
+
+    matches = {}
+    terms = _sorted_terms(index, field)
+    start = bisect.bisect_left(terms, token)
+    for term in terms[start:]:
+        if not term.startswith(token):
+            break
+        for doc, positions in field_postings[term].items():
+            matches.setdefault(doc, []).extend(positions)
+    return matches
+
+def _match_clause_in_field(index: Dict, field: str, clause: Dict) -> Dict[str, int]:
+    """Return {doc: number of matches} for a clause within one field."""
+    tokens = clause['tokens']
+    last = len(tokens) - 1
+    postings = [_match_term(index, field, token, clause['prefix'] and i == last) for i, token in enumerate(tokens)]
+    if not all(postings):
+        return {}
+
+    if not clause['phrase']:
+        return {doc: len(positions) for doc, positions in postings[0].items()}
+
+    # Phrase: every token must appear at consecutive positions
+    candidates = set(postings[0])
+    for token_postings in postings[1:]:
+        candidates &= token_postings.keys()
+    matches = {}
+    for doc in candidates:
+        following = [set(token_postings[doc]) for token_postings in postings[1:]]
+        count = sum(
+            1 for start in postings[0][doc]
+            if all(start + offset + 1 in positions for offset, positions in enumerate(following))
+        )
+        if count:
+            matches[doc] = count
+    return matches
+
+def search_entries(index: Dict, query: str) -> List[Tuple[int, float]]:
+    """
+    Run a query against the index.
+
+    Returns:
+        List of (entry ID, score) tuples, best matches first
+    """
+    clauses = parse_query(query)
+    if not clauses:
+        return []
+
+    scores = None
+    for clause in clauses:
+        fields = [clause['field']] if clause['field'] else list(INDEXED_FIELDS)
+        clause_scores = {}
+        for field in fields:
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for doc, count in _match_clause_in_field(index, field, clause).items():
+                clause_scores[doc] = clause_scores.get(doc, 0.0) + weight * count
+        if scores is None:
+            scores = clause_scores
+        else:
+            scores = {doc: score + clause_scores[doc] for doc, score in scores.items() if doc in clause_scores}
+        if not scores:
+            return []
+
+    return sorted(((int(doc), score) for doc, score in scores.items()), key=lambda item: (-item[1], item[0]))
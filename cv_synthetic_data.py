@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Synthetic CV Database Generator
+
+This script generates realistic, reproducible CV databases in the same format
+as cv_database.json for performance testing. Entries get varied sections,
+tags and companies, and HTML-laden descriptions (font-awesome icons, styled
+spans and markdown links) like the hand-written ones.
+
+Entries are streamed to disk, so databases with a million entries can be
+generated without holding the whole document in memory.
+
+Usage:
+    python cv_synthetic_data.py --entries 1000 --output synthetic_cv_database.json
+    python cv_synthetic_data.py --entries 1000000 --output big_cv_database.json --seed 7
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime
+from typing import Dict, Iterator
+
+SECTIONS = [
+    "education", "current_position", "research_positions", "industry_positions",
+    "teaching_positions", "academic_articles", "preprints", "poster_presentations",
+    "awards_and_honors", "invited_speaker", "software", "service", "mentorship"
+]
+
+# Section weights roughly follow a long academic CV: many publications and talks
+SECTION_WEIGHTS = [2, 1, 6, 4, 4, 25, 6, 10, 8, 10, 6, 4, 3]
+
+COMPANIES = ["biotech", "academic", "pharma", "dropletbiosciences", "merck", "ozette", "startup", "government"]
+
+TOPIC_TAGS = [
+    "bioinformatics", "machine_learning", "genomics", "single_cell", "spatial_transcriptomics",
+    "epigenetics", "liquid_biopsy", "statistics", "software_engineering", "leadership",
+    "publications", "teaching", "cloud_computing", "diagnostics"
+]
+
+INSTITUTIONS = [
+    "Johns Hopkins University", "National Institutes of Health", "Stanford University",
+    "University of Washington", "Broad Institute", "Fred Hutchinson Cancer Center",
+    "Genentech", "Illumina", "Merck & Co.", "Droplet Biosciences"
+]
+
+LOCATIONS = ["Baltimore, MD", "Bethesda, MD", "Seattle, WA", "Boston, MA", "San Francisco, CA", "Remote"]
+
+TITLE_WORDS = [
+    "Single-cell", "Spatial", "Transcriptomics", "Methylation", "Biomarkers", "Deconvolution",
+    "Cell-free DNA", "Pipeline", "Clinical", "Diagnostics", "Machine Learning", "Analysis",
+    "Genomic", "Variability", "Cancer", "Epigenetic", "Liquid Biopsy", "Statistical", "Model"
+]
+
+DESCRIPTION_PHRASES = [
+    "Developed computational pipelines for analysis of single-cell and spatial-omics data",
+    "Assessed DNA methylation in patient plasma as a multicancer marker",
+    "Built machine learning models to predict clinical outcomes",
+    "Mentored graduate and undergraduate students in bioinformatics",
+    "Optimized droplet digital PCR assays for low-input samples",
+    "Led cross-functional collaborations with clinical partners",
+    "Implemented reproducible workflows on high-performance computing clusters",
+    "Presented findings at international conferences"
+]
+
+JOURNALS = ["Sci Reports", "Nature Communications", "Genome Biology", "Bioinformatics", "Clinical Epigenetics"]
+
+def _make_description(rng: random.Random) -> str:
+    """Create one description bullet, sometimes with inline links, icons and styling."""
+    text = rng.choice(DESCRIPTION_PHRASES)
+    style = rng.random()
+    year = rng.randint(2008, 2025)
+    doi = f"https://doi.org/10.{rng.randint(1000, 9999)}/s{rng.randint(10000, 99999)}-{year}"
+    if style < 0.3:
+        journal = rng.choice(JOURNALS)
+        return f"{text} | [<span style=\"color:red\">*<i class=\"fa fa-link\"></i>&nbsp;{journal} {year}*</span>]({doi})"
+    if style < 0.5:
+        return f"[<i class=\"fa fa-link\"></i>&nbsp;{text}]({doi})"
+    if style < 0.6:
+        return f"{text} using <u>{rng.choice(TITLE_WORDS).lower()}</u> approaches"
+    return text
+
+def make_entry(index: int, rng: random.Random) -> Dict:
+    """Create one synthetic entry in the cv_database.json format."""
+    section = rng.choices(SECTIONS, weights=SECTION_WEIGHTS)[0]
+    end_year = rng.randint(2005, 2025)
+    start = str(end_year - rng.randint(0, 6)) if rng.random() < 0.6 else ""
+    end = "Current" if rng.random() < 0.05 else str(end_year)
+
+    title = " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 5)))
+    if section in ("academic_articles", "preprints") and rng.random() < 0.5:
+        title = f"[{title}](https://doi.org/10.{rng.randint(1000, 9999)}/{index})"
+
+    loc = rng.choice(INSTITUTIONS)
+    if rng.random() < 0.2:
+        loc += "<br />Advisor - Dr. " + rng.choice(["Fan", "Elnitski", "Pisanic", "Smith"])
+
+    tags = ["cv"]
+    if rng.random() < 0.35:
+        tags.append("resume")
+    tags.append(section)
+    tags.extend(rng.sample(TOPIC_TAGS, rng.randint(0, 3)))
+
+    return {
+        "section": section,
+        "title": title,
+        "loc": loc,
+        "institution": rng.choice(LOCATIONS),
+        "start": start,
+        "end": end,
+        "descriptions": [_make_description(rng) for _ in range(rng.choice([0, 1, 1, 2, 2, 3, 4]))],
+        "companies": rng.sample(COMPANIES, rng.choice([0, 0, 1, 1, 2])),
+        "tags": tags,
+        "importance": rng.randint(0, 100)
+    }
+
+def iter_synthetic_entries(num_entries: int, seed: int = 0) -> Iterator[Dict]:
+    """Yield synthetic entries one at a time (reproducible for a given seed)."""
+    rng = random.Random(seed)
+    for index in range(num_entries):
+        yield make_entry(index, rng)
+
+def make_skeleton(seed: int = 0) -> Dict:
+    """Create the non-entry parts of a synthetic database."""
+    rng = random.Random(seed)
+    skills = []
+    for category in ["Biology", "Data Analysis", "Software/Coding"]:
+        skills.append({
+            "category": category,
+            "entries": [{"name": word, "level": ""} for word in rng.sample(TITLE_WORDS, 6)],
+            "tags": ["cv", "resume"]
+        })
+    return {
+        "meta": {
+            "last_updated": datetime.now().strftime("%Y-%m-%d"),
+            "generated_by": "cv_synthetic_data.py"
+        },
+        "contact_info": {
+            "email": {"value": "jane.doe@example.com", "icon": "envelope"},
+            "github": {"value": "https://github.com/example", "icon": "github"},
+            "website": {"value": "https://example.com/", "icon": "globe"}
+        },
+        "text_blocks": [
+            {"id": "intro", "content": "Computational biologist building <u>single-cell</u> analysis tools.", "tags": ["cv", "resume"]},
+            {"id": "professional_summary", "content": "Scientist with experience in genomics and machine learning.", "tags": ["cv", "resume"]}
+        ],
+        "skills": skills
+    }
+
+def generate_database(num_entries: int, seed: int = 0) -> Dict:
+    """Build a complete synthetic database in memory."""
+    database = make_skeleton(seed)
+    database["entries"] = list(iter_synthetic_entries(num_entries, seed))
+    return database
+
+def write_synthetic_database(output_path: str, num_entries: int, seed: int = 0) -> None:
+    """Stream a synthetic database to a JSON file without materializing all entries."""
+    skeleton = make_skeleton(seed)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("{\n")
+        for key in ["meta", "contact_info", "text_blocks", "skills"]:
+            f.write(f"  {json.dumps(key)}: {json.dumps(skeleton[key], ensure_ascii=False)},\n")
+        f.write('  "entries": [\n')
+        for index, entry in enumerate(iter_synthetic_entries(num_entries, seed)):
+            if index:
+                f.write(",\n")
+            f.write("    " + json.dumps(entry, ensure_ascii=False))
+        f.write("\n  ]\n}\n")
+    print(f"Wrote synthetic database with {num_entries} entries: {output_path}")
+
+def main():
+    """Main function to parse arguments and generate a synthetic database."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic CV database for performance testing.')
+    parser.add_argument('--entries', type=int, default=1000, help='Number of entries to generate (default: 1000)')
+    parser.add_argument('--output', default='synthetic_cv_database.json', help='Path to save the JSON file')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for reproducible output (default: 0)')
+
+    args = parser.parse_args()
+    write_synthetic_database(args.output, args.entries, args.seed)
+
+if __name__ == "__main__":
+    main()
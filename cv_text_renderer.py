@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Plain-Text and Markdown Renderer for Tailored CVs/Resumes
+
+generate_plain_text_cv() in cv_printing_functions.r only runs inside the R
+render, so an ATS-friendly text version needed R, readr and the CSV round
+trip. This module renders plain text and markdown directly from a tailored
+JSON file (or any database in the same format) in a few milliseconds:
+
+    - HTML and markup are stripped in a single pass over each string, with
+      one precompiled pattern for links, tags, entities and emphasis
+    - links are kept as text: "label (https://...)" in plain text and
+      "[label](https://...)" in markdown
+    - entries are filtered by document type and ordered like the JSON to CSV
+      converter does, grouped into sections with the headings of the templates
+
+The AI CV generator uses it in-process for --format txt and --format md:
+
+    python ai_cv_generator.py --job-posting job.txt --format txt
+
+Usage:
+    python cv_text_renderer.py tailored_json/CompanyX_2026-10-18.json --type resume
+    python cv_text_renderer.py tailored_json/CompanyX_2026-10-18.json --format md --output output/CompanyX.md
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from json_to_csv_converter import filter_entries, sort_entries
+
+TEXT_FORMATS = ["txt", "md"]
+
+# Headings of the template sections; sections named <id>_<suffix> (e.g.
+# current_position_merck) use the heading of <id>
+SECTION_TITLES = {
+    "current_position": "Current Position",
+    "education": "Education",
+    "industry_positions": "Industry Experience",
+    "research_positions": "Research Experience",
+    "additional_research": "Additional Research",
+    "teaching_positions": "Teaching Experience",
+    "academic_articles": "Selected Publications, Posters, and Patents",
+    "preprints": "Preprints",
+    "poster_presentations": "Poster Presentations",
+    "invited_speaker": "Invited Talks",
+    "software": "Statistical Software",
+    "awards_and_honors": "Awards and Honors",
+    "service": "Service",
+    "reference": "References"
+}
+SECTION_ORDER = list(SECTION_TITLES)
+
+# Links (markdown and HTML), line breaks, other tags, entities and emphasis, in one alternation
+_MARKUP_RE = re.compile(
+    r'\[([^\]]*)\]\(([^)\s]*)\)'
+    r'|<a\s[^>]*?href\s*=\s*["\']([^"\']*)["\'][^>]*>(.*?)</a\s*>'
+    r'|(<br\s*/?>)'
+    r'|<[^>]*>'
+    r'|&(#?\w+);'
+    r'|\*+|`',
+    re.IGNORECASE | re.DOTALL
+)
+_SPACE_RE = re.compile(r'[ \t\r\n\u00a0]+')
+
+def html_to_text(text: str, markdown_links: bool = False) -> str:
+    """
+    Convert a database string with HTML and markdown markup to plain text.
+
+    Args:
+        text: String with links, tags, entities and emphasis
+        markdown_links: Keep links as [label](url) instead of "label (url)"
+
+    Returns:
+        Plain text on one line
+    """
+    if not text or text == "N/A":
+        return ""
+
+    def replace(match):
+        if match.group(2) is not None or match.group(3) is not None:
+            url = match.group(2) if match.group(2) is not None else match.group(3)
+            label = html_to_text(match.group(1) if match.group(2) is not None else match.group(4))
+            if markdown_links and url:
+                return f"[{label or url}]({url})"
+            if not url or label == url or label == url.replace("mailto:", ""):
+                return label or url
+            return f"{label} ({url})" if label else url
+        if match.group(5):
+            return "; "
+        if match.group(6):
+            return html.unescape(match.group(0))
+        return ""
+
+    return _SPACE_RE.sub(" ", _MARKUP_RE.sub(replace, str(text))).strip(" ;")
+
+def section_title(section: str) -> str:
+    """Heading of a section, from SECTION_TITLES or the section ID."""
+    for known in sorted(SECTION_TITLES, key=len, reverse=True):
+        if section == known or section.startswith(known + "_"):
+            return SECTION_TITLES[known]
+    return section.replace("_", " ").strip().title()
+
+def timeline(entry: Dict) -> str:
+    """Timeline of an entry as the templates show it ("2023 - 2020", "Current - 2020", "2019")."""
+    start = str(entry.get("start") or "").strip()
+    end = str(entry.get("end") or "").strip()
+    start = "" if start in ("NULL", "N/A") else start
+    end = "" if end in ("NULL", "N/A") else end
+    if start and end:
+        return f"{end} - {start}"
+    if start:
+        return f"Current - {start}"
+    return end
+
+def grouped_sections(entries: List[Dict]) -> List[List[Dict]]:
+    """Entries grouped by heading: known sections in SECTION_ORDER, others in order of first appearance."""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(section_title(entry.get("section", "other")), []).append(entry)
+    order = [SECTION_TITLES[section] for section in SECTION_ORDER]
+    return [groups[title] for title in sorted(groups, key=lambda t: order.index(t) if t in order else len(order))]
+
+def profile_text(data: Dict) -> str:
+    """The tailored professional summary, or the intro text block."""
+    blocks = {block.get("id"): block.get("content", "") for block in data.get("text_blocks", [])}
+    return blocks.get("professional_summary") or blocks.get("intro") or ""
+
+def render_text(data: Dict, doc_type: str = "resume", fmt: str = "txt") -> str:
+    """
+    Render a tailored JSON document as plain text or markdown.
+
+    Args:
+        data: Tailored JSON (the database format)
+        doc_type: Document type ('cv' or 'resume'); entries without this tag are left out
+        fmt: "txt" for ATS plain text or "md" for markdown
+
+    Returns:
+        The rendered document
+    """
+    markdown = fmt == "md"
+    lines = []
+
+    def heading(title: str) -> None:
+        if markdown:
+            lines.extend([f"## {title}", ""])
+        else:
+            lines.extend([title.upper(), "=" * len(title), ""])
+
+    def clean(text: str) -> str:
+        return html_to_text(text, markdown_links=markdown)
+
+    contact_info = data.get("contact_info", {})
+    if contact_info:
+        heading("Contact Information")
+        for key, value in contact_info.items():
+            value = value.get("value", "") if isinstance(value, dict) else value
+            label = key.replace("_", " ").title()
+            lines.append(f"- **{label}:** {clean(value)}" if markdown else f"{label}: {clean(value)}")
+        lines.append("")
+
+    profile = clean(profile_text(data))
+    if profile:
+        heading("Profile")
+        lines.extend([profile, ""])
+
+    entries = filter_entries(data.get("entries", []), doc_type)
+    sort_entries(entries)
+    for section_entries in grouped_sections(entries):
+        heading(section_title(section_entries[0].get("section", "other")))
+        for entry in section_entries:
+            details = [clean(entry.get("loc", "")), clean(entry.get("institution", "")), timeline(entry)]
+            details = [detail for detail in details if detail]
+            if markdown:
+                lines.append(f"### {clean(entry.get('title', ''))}")
+                if details:
+                    lines.extend(["", " | ".join(details)])
+            else:
+                lines.append(clean(entry.get("title", "")))
+                lines.extend(details)
+            bullets = [clean(description) for description in entry.get("descriptions", [])]
+            bullets = [bullet for bullet in bullets if bullet]
+            if bullets:
+                lines.append("")
+                lines.extend(("- " if markdown else "• ") + bullet for bullet in bullets)
+            lines.append("")
+
+    skills = [category for category in data.get("skills", []) if category.get("entries")]
+    if skills:
+        heading("Expertise")
+        for category in skills:
+            names = ", ".join(clean(skill.get("name", "")) for skill in category["entries"])
+            lines.append(f"- **{category.get('category', '')}:** {names}" if markdown else f"{category.get('category', '')}: {names}")
+        lines.append("")
+
+    lines.append(f"Last updated: {datetime.now().strftime('%B %d, %Y')}")
+    return "\n".join(lines) + "\n"
+
+def write_text(json_path: str, output_path: str, doc_type: str = "resume", fmt: str = "txt",
+               data: Optional[Dict] = None) -> float:
+    """
+    Render a tailored JSON file as text and write it.
+
+    Args:
+        json_path: Tailored JSON file (not read if data is given)
+        output_path: Text or markdown file to write
+        doc_type: Document type ('cv' or 'resume')
+        fmt: "txt" or "md"
+        data: Already loaded tailored JSON
+
+    Returns:
+        Seconds the rendering took
+    """
+    started = time.perf_counter()
+    if data is None:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    text = render_text(data, doc_type, fmt)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return time.perf_counter() - started
+
+def main():
+    """Main function to render a tailored JSON file as plain text or markdown."""
+    parser = argparse.ArgumentParser(description='Render a tailored CV/resume JSON file as plain text or markdown.')
+    parser.add_argument('json_file', help='Tailored JSON file (or a database in the same format)')
+    parser.add_argument('--type', choices=['cv', 'resume'], default='resume', help='Document type to render (default: resume)')
+    parser.add_argument('--format', choices=TEXT_FORMATS, default='txt', help='Output format (default: txt)')
+    parser.add_argument('--output', help='Output file (default: output/<json name>.<format>)')
+
+    args = parser.parse_args()
+    output_path = args.output or os.path.join(
+        "output", os.path.splitext(os.path.basename(args.json_file))[0] + f".{args.format}")
+
+    try:
+        seconds = write_text(args.json_file, output_path, args.type, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error rendering {args.json_file}: {e}")
+        sys.exit(1)
+    print(f"Created {output_path} in {seconds * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
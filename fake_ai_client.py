@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Fake AI Client for Benchmarks and Offline Runs
+
+FakeAIClient stands in for the OpenAI and Anthropic clients returned by
+setup_ai_client(). It implements the two calls the generator makes,
+chat.completions.create() and messages.create(), and answers every prompt
+type of the pipeline with well-formed responses:
+
+    Job Analysis                   - the five requirement categories
+    Job-Specific Summary           - a plain-text summary
+    Entry Scoring                  - a score derived from the entry text and its
+                                     descriptions echoed back with placeholders intact
+    Relevance Matrix               - ratings derived from the requirement and entry IDs
+    Description Placeholder Repair - the descriptions echoed back
+    CV Tailoring (prompt-only,
+    per section, text blocks)      - the first entries of each section by ID
+
+Latency, failures and response sizes are controllable, so the cost of the
+local code can be separated from the cost of waiting on the API. Every call is
+counted together with its estimated input and output tokens.
+
+The batch endpoints are implemented too (files, batches and messages.batches),
+so batch runs (--batch-api, cv_batch_api.py) can be tested without API access.
+A batch ends batch_delay seconds after it is submitted; its requests are then
+answered like interactive calls, with failures reported per request.
+
+Usage:
+    from fake_ai_client import FakeAIClient
+
+    client = FakeAIClient(latency=0.2, failure_rate=0.01, response_words=50)
+    run_tailoring_pipeline(args, ai_client=client, service="openai")
+    print(client.stats())
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from cv_api_recorder import claude_response, openai_response
+from cv_prompt_view import estimate_tokens
+
+FAKE_ANALYSIS = {
+    "Required skills and technologies": ["Python", "R", "Machine learning", "Single-cell analysis", "Cloud computing"],
+    "Desired experience areas": ["Bioinformatics", "Genomics", "Statistical modeling"],
+    "Key responsibilities": ["Develop analysis pipelines", "Collaborate with scientists", "Communicate results"],
+    "Industry and domain-specific knowledge required": ["Biotechnology", "Diagnostics"],
+    "Soft skills emphasized": ["Communication", "Teamwork", "Mentorship"]
+}
+
+FILLER_WORDS = ["relevant", "experience", "analysis", "pipeline", "genomics", "results", "team", "data"]
+
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.+?)\s*```', re.DOTALL)
+_NUMBERED_RE = re.compile(r'^\s*\d+\. (.*)$', re.MULTILINE)
+_QUOTA_RE = re.compile(r'at most (\d+) entries')
+
+class FakeAPIError(Exception):
+    """Simulated API failure (timeouts, rate limits, server errors)."""
+
+class FakeAIClient:
+    """Stand-in for the OpenAI and Anthropic clients with controllable latency, failures and response sizes."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0,
+                 response_words: int = 0, seed: int = 0, batch_delay: float = 0.0):
+        """
+        Args:
+            latency: Seconds every call takes
+            jitter: Extra random seconds (0 to jitter) added to every call
+            failure_rate: Probability (0-1) that a call raises FakeAPIError
+            response_words: Filler words added to every free-text field of a response
+            seed: Seed for the jitter and failures
+            batch_delay: Seconds from submitting a batch until it ends
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.response_words = response_words
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.batch_delay = batch_delay
+        self._stats = {"calls": 0, "failures": 0, "input_tokens": 0, "output_tokens": 0, "batches": 0, "batch_requests": 0}
+        self._ids = itertools.count(1)
+        self._files = {}
+        self._batches = {}
+
+        # The attribute paths of the real clients, including their batch endpoints
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_openai))
+        self.messages = SimpleNamespace(create=self._create_claude, batches=SimpleNamespace(
+            create=self._create_claude_batch, retrieve=self._retrieve_claude_batch, results=self._claude_batch_results))
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_openai_batch, retrieve=self._retrieve_openai_batch)
+
+    def stats(self) -> Dict[str, int]:
+        """Calls, failures and estimated tokens so far."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _create_openai(self, model: str = "", messages: List[Dict] = (), **kwargs):
+        system = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+        user = "\n".join(m["content"] for m in messages if m.get("role") != "system")
+        return openai_response(model, *self._respond(system, user))
+
+    def _create_claude(self, model: str = "", messages: List[Dict] = (), system: str = "", **kwargs):
+        user = "\n".join(m["content"] for m in messages)
+        return claude_response(model, *self._respond(system, user))
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}_fake{next(self._ids):06d}"
+
+    def _submit_batch(self, prefix: str, requests: List[Tuple[str, str, Dict]]) -> Dict:
+        batch = {"id": self._new_id(prefix), "created": time.monotonic(), "requests": requests, "results": None}
+        with self._lock:
+            self._batches[batch["id"]] = batch
+            self._stats["batches"] += 1
+            self._stats["batch_requests"] += len(requests)
+        return batch
+
+    def _finish_batch(self, batch_id: str) -> Optional[Dict]:
+        """The batch with its results once batch_delay has passed, None while it is in progress."""
+        batch = self._batches[batch_id]
+        if time.monotonic() - batch["created"] < self.batch_delay:
+            return None
+        if batch["results"] is None:
+            results = []
+            for custom_id, endpoint, request in batch["requests"]:
+                create = self._create_openai if endpoint == "openai" else self._create_claude
+                try:
+                    results.append((custom_id, create(**request), None))
+                except FakeAPIError as e:
+                    results.append((custom_id, None, str(e)))
+            batch["results"] = results
+        return batch
+
+    def _create_file(self, file=None, purpose: str = "batch", **kwargs):
+        name, content = file if isinstance(file, tuple) else (getattr(file, "name", "upload"), file.read())
+        file_id = self._new_id("file")
+        self._files[file_id] = content.decode("utf-8") if isinstance(content, bytes) else content
+        return SimpleNamespace(id=file_id, filename=name, purpose=purpose)
+
+    def _file_content(self, file_id: str):
+        return SimpleNamespace(text=self._files[file_id])
+
+    def _create_openai_batch(self, input_file_id: str = "", endpoint: str = "", completion_window: str = "24h", **kwargs):
+        requests = [(line["custom_id"], "openai", line["body"])
+                    for line in map(json.loads, self._files[input_file_id].splitlines()) if line]
+        return self._retrieve_openai_batch(self._submit_batch("batch", requests)["id"])
+
+    def _retrieve_openai_batch(self, batch_id: str):
+        batch = self._finish_batch(batch_id)
+        if batch is None:
+            return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None, error_file_id=None)
+        if "output_file_id" not in batch:
+            output = [{"id": f"req_{custom_id[:12]}", "custom_id": custom_id, "response": {"status_code": 200, "body": {
+                           "model": response.model,
+                           "choices": [{"index": 0, "message": {"role": "assistant", "content": response.choices[0].message.content},
+                                        "finish_reason": "stop"}],
+                           "usage": {"prompt_tokens": response.usage.prompt_tokens,
+                                     "completion_tokens": response.usage.completion_tokens}}}, "error": None}
+                      for custom_id, response, error in batch["results"] if error is None]
+            errors = [{"id": f"req_{custom_id[:12]}", "custom_id": custom_id, "response": {"status_code": 500, "body": {
+                           "error": {"message": error}}}, "error": None}
+                      for custom_id, response, error in batch["results"] if error is not None]
+            batch["output_file_id"] = self._store_lines(output)
+            batch["error_file_id"] = self._store_lines(errors)
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id=batch["output_file_id"],
+                               error_file_id=batch["error_file_id"])
+
+    def _store_lines(self, lines: List[Dict]) -> Optional[str]:
+        if not lines:
+            return None
+        file_id = self._new_id("file")
+        self._files[file_id] = "".join(json.dumps(line) + "\n" for line in lines)
+        return file_id
+
+    def _create_claude_batch(self, requests: List[Dict] = (), **kwargs):
+        batch = self._submit_batch("msgbatch", [(request["custom_id"], "claude", request["params"]) for request in requests])
+        return self._retrieve_claude_batch(batch["id"])
+
+    def _retrieve_claude_batch(self, batch_id: str):
+        batch = self._finish_batch(batch_id)
+        return SimpleNamespace(id=batch_id, processing_status="in_progress" if batch is None else "ended")
+
+    def _claude_batch_results(self, batch_id: str):
+        batch = self._finish_batch(batch_id)
+        for custom_id, response, error in batch["results"] if batch else []:
+            if error is None:
+                yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=response))
+            else:
+                yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(
+                    type="errored", error=SimpleNamespace(type="api_error", message=error)))
+
+    def _respond(self, system: str, user: str) -> Tuple[str, int, int]:
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate > 0 and self._random.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(delay)
+        input_tokens = estimate_tokens(system) + estimate_tokens(user)
+        if fail:
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["failures"] += 1
+                self._stats["input_tokens"] += input_tokens
+            raise FakeAPIError("Simulated API failure")
+        text = fake_response(system, user, self.response_words)
+        output_tokens = estimate_tokens(text)
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["input_tokens"] += input_tokens
+            self._stats["output_tokens"] += output_tokens
+        return text, input_tokens, output_tokens
+
+def filler(words: int) -> str:
+    """Deterministic filler text of the given length (with a leading space)."""
+    if words <= 0:
+        return ""
+    return " " + " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(words))
+
+def _json_block(user: str):
+    match = _JSON_BLOCK_RE.search(user)
+    if not match:
+        return {}
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return {}
+
+def fake_response(system: str, user: str, response_words: int = 0) -> str:
+    """
+    Answer a pipeline prompt with a well-formed response.
+
+    Args:
+        system: System prompt
+        user: User prompt
+        response_words: Filler words added to free-text fields
+
+    Returns:
+        The response text (JSON for every prompt type except the summary)
+    """
+    if "Analyze the job posting" in system:
+        return json.dumps(FAKE_ANALYSIS)
+
+    if "professional summaries" in system:
+        return "Data scientist with experience building analysis pipelines for genomics." + filler(response_words)
+
+    if "Score the relevance" in system:
+        descriptions = []
+        if "Descriptions:" in user:
+            descriptions = _NUMBERED_RE.findall(user.split("Descriptions:", 1)[1].split("Tags:", 1)[0])
+        # The score depends only on the entry, so results do not depend on call order
+        score = zlib.crc32(user.split("Job Details:", 1)[0].encode("utf-8")) % 11
+        return json.dumps({
+            "score": score,
+            "reasoning": "Simulated relevance score." + filler(response_words),
+            "improved_descriptions": [text + filler(response_words) for text in descriptions]
+        })
+
+    if "Rate how well each CV/resume entry shows each job requirement" in system:
+        chunk = _json_block(user)
+        column_ids = [entry.get("id") for entry in chunk.get("entries", [])]
+        # Ratings depend only on the requirement and entry, so results do not depend on chunking
+        return json.dumps({"rows": {requirement: [zlib.crc32(f"{requirement}:{column}".encode("utf-8")) % 4 for column in column_ids]
+                                    for requirement in chunk.get("requirements", {})}})
+
+    if "Each item holds a CV description" in system:
+        try:
+            items = json.loads(user.split("\n\nYou MUST respond", 1)[0])
+        except ValueError:
+            items = []
+        return json.dumps({"descriptions": [item.get("description", "") for item in items if isinstance(item, dict)]})
+
+    if "ONE section of a CV/resume database" in system:
+        entries = _json_block(user)
+        quota = _QUOTA_RE.search(user)
+        quota = int(quota.group(1)) if quota else 2
+        selected = entries[:quota] if isinstance(entries, list) else []
+        return json.dumps({"entries": [{"id": entry["id"], "d": [text + filler(response_words) for text in entry.get("d", [])]}
+                                       for entry in selected]})
+
+    if "text blocks (ID -> text) and skills" in system:
+        profile = _json_block(user)
+        return json.dumps({
+            "text_blocks": {key: text + filler(response_words) for key, text in profile.get("text_blocks", {}).items()},
+            "skills": profile.get("skills", {})
+        })
+
+    if "tailored version of the CV/resume" in system:
+        view = _json_block(user)
+        entries = [{"id": entry["id"], "d": [text + filler(response_words) for text in entry.get("d", [])]}
+                   for section in view.get("entries", {}).values() for entry in section[:2]]
+        return json.dumps({
+            "entries": entries,
+            "text_blocks": {key: text + filler(response_words) for key, text in view.get("text_blocks", {}).items()},
+            "skills": view.get("skills", {})
+        })
+
+    return "{}"
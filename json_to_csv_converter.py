@@ -9,6 +9,9 @@ Usage:
     python json_to_csv_converter.py --json cv_data.json --output-dir my_cv_data --type cv
     python json_to_csv_converter.py --json cv_data.json --output-dir my_resume_data --type resume
     python json_to_csv_converter.py --json cv_data.json --output-dir my_cv_data --type cv --filter-company biotech
+    python json_to_csv_converter.py --json cv_data.json --output-dir my_resume_data --type resume --watch
+    python json_to_csv_converter.py --json cv_data.json --variants "cv=my_cv_data;resume=my_resume_data;resume:biotech=biotech_resume_data"
+    python json_to_csv_converter.py --json cv_data.json --variants variants.json
 """
 
 import argparse
@@ -16,17 +19,29 @@ import json
 import os
 import csv
 import sys
-from typing import Dict, List, Optional, Any, Set
+import time
+import glob
+import hashlib
+import shutil
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 
+from cv_schema import load_validated_json
+
+# Optional YAML support for --variants files
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# Files that only affect rendering (not the CSV data) in --watch mode
+WATCH_TEMPLATE_PATTERNS = ["templates/*.rmd", "templates/*.Rmd", "cv_printing_functions.r"]
+WATCH_STYLE_PATTERNS = ["css/*.css"]
+
 def load_json_data(json_path: str) -> Dict:
-    """Load and parse the JSON data from the specified file."""
-    try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading JSON file: {e}")
-        sys.exit(1)
+    """Load, parse and schema-validate the JSON data from the specified file."""
+    return load_validated_json(json_path)
 
 def ensure_output_dir(output_dir: str) -> None:
     """Ensure the output directory exists."""
@@ -34,24 +49,23 @@ def ensure_output_dir(output_dir: str) -> None:
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
 
-def write_entries_csv(data: Dict, output_dir: str, doc_type: str, 
-                     company_filters: Optional[List[str]] = None, 
-                     tag_filters: Optional[List[str]] = None,
-                     filter_logic: str = 'and') -> None:
+def filter_entries(entries: List[Dict], doc_type: str,
+                   company_filters: Optional[List[str]] = None,
+                   tag_filters: Optional[List[str]] = None,
+                   filter_logic: str = 'and') -> List[Dict]:
     """
-    Write entries data to a CSV file.
+    Filter entries by document type, companies, and tags.
     
     Args:
-        data: The JSON data
-        output_dir: Directory to write the CSV file
+        entries: The entries from the JSON data
         doc_type: Type of document ('cv' or 'resume')
         company_filters: Optional list of company filters
         tag_filters: Optional list of tag filters
         filter_logic: Logic to apply for filtering ('and' or 'or')
+        
+    Returns:
+        The entries that pass all filters, in their original order
     """
-    entries = data.get('entries', [])
-    
-    # Filter entries based on document type, companies, and tags
     filtered_entries = []
     for entry in entries:
         entry_tags = set(entry.get('tags', []))
@@ -87,15 +101,65 @@ def write_entries_csv(data: Dict, output_dir: str, doc_type: str,
                 
         filtered_entries.append(entry)
     
-    # Sort entries by importance and then by end date (most recent first)
-    filtered_entries.sort(key=lambda x: (
-        -x.get('importance', 0),
+    return filtered_entries
+
+def entry_sort_key(entry: Dict) -> Tuple:
+    """Sort key putting entries by importance and then by end date (most recent first)."""
+    return (
+        -entry.get('importance', 0),
         # Sort "Current" at the top
-        0 if x.get('end', '') == 'Current' else 1,
+        0 if entry.get('end', '') == 'Current' else 1,
         # Sort by year in descending order 
-        -int(x.get('end', '0')) if x.get('end', '').isdigit() else 0
-    ))
+        -int(entry.get('end', '0')) if entry.get('end', '').isdigit() else 0
+    )
+
+def sort_entries(entries: List[Dict]) -> None:
+    """Sort entries in place by importance and then by end date (most recent first)."""
+    entries.sort(key=entry_sort_key)
+
+def collect_company_names(entries: List[Dict]) -> List[str]:
+    """Return all unique company names across the entries (one company_* column each)."""
+    all_companies = set()
+    for entry in entries:
+        all_companies.update(entry.get('companies', []))
+    return list(all_companies)
+
+def build_entry_row_parts(entry: Dict, company_names: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Build the parts of an entry's CSV row that do not depend on the other entries.
+    
+    Returns:
+        Tuple of (leading columns, descriptions, trailing in_resume and company flag columns)
+    """
+    leading = [
+        entry.get('section', ''),
+        entry.get('title', ''),
+        entry.get('loc', ''),
+        entry.get('institution', ''),
+        entry.get('start', ''),
+        entry.get('end', '')
+    ]
+    
+    # Add in_resume flag (defaulting to TRUE for resume-tagged entries)
+    trailing = ['TRUE' if 'resume' in entry.get('tags', []) else 'FALSE']
+    
+    # Add company flags
+    entry_companies = entry.get('companies', [])
+    for company in company_names:
+        trailing.append('TRUE' if company in entry_companies else 'FALSE')
     
+    return leading, entry.get('descriptions', []), trailing
+
+def write_entries_rows(output_dir: str, row_parts: List[Tuple[List[str], List[str], List[str]]],
+                       company_names: List[str]) -> None:
+    """
+    Write prepared entry rows to entries.csv in the format render.r expects.
+    
+    Args:
+        output_dir: Directory to write the CSV file
+        row_parts: Row parts from build_entry_row_parts, in output order
+        company_names: Company names in the same order used to build the rows
+    """
     output_file = os.path.join(output_dir, "entries.csv")
     
     # Define CSV headers - match the existing format
@@ -104,19 +168,14 @@ def write_entries_csv(data: Dict, output_dir: str, doc_type: str,
     ]
     
     # Add description columns
-    max_descriptions = max([len(entry.get('descriptions', [])) for entry in filtered_entries], default=0)
+    max_descriptions = max([len(descriptions) for _, descriptions, _ in row_parts], default=0)
     description_headers = [f"description_{i+1}" for i in range(max_descriptions)]
     
     # Add in_resume column and company columns
     headers.extend(description_headers)
     headers.append("in_resume")
     
-    # Find all unique company names
-    all_companies = set()
-    for entry in entries:
-        all_companies.update(entry.get('companies', []))
-    
-    company_headers = [f"company_{company}" for company in all_companies]
+    company_headers = [f"company_{company}" for company in company_names]
     headers.extend(company_headers)
     
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
@@ -140,33 +199,40 @@ def write_entries_csv(data: Dict, output_dir: str, doc_type: str,
         writer.writerow(header_explanation)
         writer.writerow(headers)
         
-        # Write data rows
-        for entry in filtered_entries:
-            row = [
-                entry.get('section', ''),
-                entry.get('title', ''),
-                entry.get('loc', ''),
-                entry.get('institution', ''),
-                entry.get('start', ''),
-                entry.get('end', '')
-            ]
-            
-            # Add descriptions, padding with empty strings if needed
-            descriptions = entry.get('descriptions', [])
-            row.extend(descriptions + [''] * (max_descriptions - len(descriptions)))
-            
-            # Add in_resume flag (defaulting to TRUE for resume-tagged entries)
-            row.append('TRUE' if 'resume' in entry.get('tags', []) else 'FALSE')
-            
-            # Add company flags
-            for company in all_companies:
-                is_company_match = company in entry.get('companies', [])
-                row.append('TRUE' if is_company_match else 'FALSE')
-            
-            writer.writerow(row)
+        # Write data rows, padding descriptions with empty strings if needed
+        for leading, descriptions, trailing in row_parts:
+            writer.writerow(leading + descriptions + [''] * (max_descriptions - len(descriptions)) + trailing)
     
     print(f"Created entries CSV file: {output_file}")
-    print(f"Wrote {len(filtered_entries)} entries")
+    print(f"Wrote {len(row_parts)} entries")
+
+def write_entries_csv(data: Dict, output_dir: str, doc_type: str, 
+                     company_filters: Optional[List[str]] = None, 
+                     tag_filters: Optional[List[str]] = None,
+                     filter_logic: str = 'and') -> None:
+    """
+    Write entries data to a CSV file.
+    
+    Args:
+        data: The JSON data
+        output_dir: Directory to write the CSV file
+        doc_type: Type of document ('cv' or 'resume')
+        company_filters: Optional list of company filters
+        tag_filters: Optional list of tag filters
+        filter_logic: Logic to apply for filtering ('and' or 'or')
+    """
+    entries = data.get('entries', [])
+    
+    # Filter entries based on document type, companies, and tags
+    filtered_entries = filter_entries(entries, doc_type, company_filters, tag_filters, filter_logic)
+    
+    # Sort entries by importance and then by end date (most recent first)
+    sort_entries(filtered_entries)
+    
+    # Company columns cover all entries, not just the filtered ones
+    company_names = collect_company_names(entries)
+    row_parts = [build_entry_row_parts(entry, company_names) for entry in filtered_entries]
+    write_entries_rows(output_dir, row_parts, company_names)
 
 def write_contact_info_csv(data: Dict, output_dir: str) -> None:
     """Write contact info data to a CSV file."""
@@ -404,20 +470,320 @@ def convert_json_to_csv(json_path: str, output_dir: str, doc_type: str,
     
     print(f"Conversion completed. CSV files created in {output_dir}")
 
+def _split_filter_values(value: Any) -> Optional[List[str]]:
+    """Normalize a filter given as a comma-separated string or a list."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    values = [str(item).strip() for item in value if str(item).strip()]
+    return values or None
+
+def parse_variants_spec(spec: str) -> List[Dict]:
+    """
+    Parse a --variants specification into a list of variant dictionaries.
+    
+    The spec is either a path to a JSON (or YAML, if PyYAML is installed) file
+    containing a list of variants, or an inline string of the form
+    "TYPE[:COMPANIES]=OUTPUT_DIR;..." such as
+    "cv=my_cv_data;resume=my_resume_data;resume:biotech,pharma=biotech_resume_data".
+    
+    Each variant has the keys: type, output_dir, filter_company, filter_tag and filter_logic.
+    """
+    if os.path.exists(spec):
+        with open(spec, 'r', encoding='utf-8') as f:
+            if spec.lower().endswith(('.yml', '.yaml')):
+                if not YAML_AVAILABLE:
+                    print("Error: PyYAML is required for YAML variant files. Install with: pip install pyyaml")
+                    sys.exit(1)
+                raw_variants = yaml.safe_load(f)
+            else:
+                raw_variants = json.load(f)
+        if isinstance(raw_variants, dict):
+            raw_variants = raw_variants.get('variants', [])
+    else:
+        raw_variants = []
+        for item in spec.split(';'):
+            item = item.strip()
+            if not item:
+                continue
+            if '=' not in item:
+                print(f"Error: Invalid variant '{item}'. Expected TYPE[:COMPANIES]=OUTPUT_DIR")
+                sys.exit(1)
+            selector, output_dir = item.split('=', 1)
+            doc_type, _, companies = selector.partition(':')
+            raw_variants.append({
+                'type': doc_type.strip(),
+                'output_dir': output_dir.strip(),
+                'filter_company': companies
+            })
+    
+    variants = []
+    for raw in raw_variants:
+        doc_type = raw.get('type')
+        if doc_type not in ('cv', 'resume') or not raw.get('output_dir'):
+            print(f"Error: Invalid variant {raw}. Each variant needs a type (cv or resume) and an output_dir")
+            sys.exit(1)
+        variants.append({
+            'type': doc_type,
+            'output_dir': raw['output_dir'],
+            'filter_company': _split_filter_values(raw.get('filter_company')),
+            'filter_tag': _split_filter_values(raw.get('filter_tag')),
+            'filter_logic': raw.get('filter_logic', 'and')
+        })
+    return variants
+
+def build_filter_indexes(entries: List[Dict]) -> Dict[str, Dict[str, Set[int]]]:
+    """Build tag -> entry positions and company -> entry positions lookup tables."""
+    tag_index = {}
+    company_index = {}
+    for position, entry in enumerate(entries):
+        for tag in entry.get('tags', []):
+            tag_index.setdefault(tag, set()).add(position)
+        for company in entry.get('companies', []):
+            company_index.setdefault(company, set()).add(position)
+    return {'tags': tag_index, 'companies': company_index}
+
+def select_with_indexes(indexes: Dict[str, Dict[str, Set[int]]], doc_type: str,
+                        company_filters: Optional[List[str]] = None,
+                        tag_filters: Optional[List[str]] = None,
+                        filter_logic: str = 'and') -> Set[int]:
+    """Set-based equivalent of filter_entries, returning entry positions."""
+    selected = set(indexes['tags'].get(doc_type, set()))
+    combine = set.intersection if filter_logic.lower() == 'and' else set.union
+    for index_name, filters in (('companies', company_filters), ('tags', tag_filters)):
+        if filters:
+            matches = [indexes[index_name].get(value, set()) for value in filters]
+            selected &= combine(*matches)
+    return selected
+
+def convert_json_to_csv_variants(json_path: str, variants: List[Dict]) -> None:
+    """
+    Export several document variants from a single load of the database.
+    
+    The database is loaded, indexed and sorted once. Each entry's CSV row is
+    built at most once and shared by every variant that includes it. Files that
+    do not depend on the variant (contact info, skills and aside files) are
+    written once and copied, and text blocks are written once per document type.
+    
+    Args:
+        json_path: Path to the JSON file
+        variants: Variants from parse_variants_spec
+    """
+    data = load_json_data(json_path)
+    entries = data.get('entries', [])
+    
+    # Sorting commutes with filtering (the sort is stable), so sort once for every variant
+    sorted_positions = sorted(range(len(entries)), key=lambda position: entry_sort_key(entries[position]))
+    indexes = build_filter_indexes(entries)
+    company_names = collect_company_names(entries)
+    row_cache = {}
+    
+    shared_dir = None
+    text_block_dirs = {}
+    shared_files = ["contact_info.csv", "language_skills.csv", "aside_sections.csv", "aside_entries.csv"]
+    
+    for variant in variants:
+        output_dir = variant['output_dir']
+        doc_type = variant['type']
+        print(f"\nExporting {doc_type} variant to {output_dir}"
+              + (f" (companies: {', '.join(variant['filter_company'])})" if variant['filter_company'] else "")
+              + (f" (tags: {', '.join(variant['filter_tag'])})" if variant['filter_tag'] else ""))
+        ensure_output_dir(output_dir)
+        
+        selected = select_with_indexes(indexes, doc_type, variant['filter_company'],
+                                       variant['filter_tag'], variant['filter_logic'])
+        row_parts = []
+        for position in sorted_positions:
+            if position in selected:
+                if position not in row_cache:
+                    row_cache[position] = build_entry_row_parts(entries[position], company_names)
+                row_parts.append(row_cache[position])
+        write_entries_rows(output_dir, row_parts, company_names)
+        
+        # Text blocks only depend on the document type
+        if doc_type in text_block_dirs:
+            shutil.copyfile(os.path.join(text_block_dirs[doc_type], "text_blocks.csv"),
+                            os.path.join(output_dir, "text_blocks.csv"))
+            print(f"Reused text blocks CSV file from {text_block_dirs[doc_type]}")
+        else:
+            write_text_blocks_csv(data, output_dir, doc_type)
+            text_block_dirs[doc_type] = output_dir
+        
+        # Everything else is identical for all variants
+        if shared_dir is None:
+            write_contact_info_csv(data, output_dir)
+            write_skills_csv(data, output_dir)
+            write_aside_entries_csv(data, output_dir, doc_type)
+            shared_dir = output_dir
+        elif os.path.abspath(shared_dir) != os.path.abspath(output_dir):
+            for file_name in shared_files:
+                source = os.path.join(shared_dir, file_name)
+                if os.path.exists(source):
+                    shutil.copyfile(source, os.path.join(output_dir, file_name))
+            print(f"Reused shared CSV files from {shared_dir}")
+    
+    print(f"\nConversion completed. Exported {len(variants)} variants from {json_path}")
+
+def snapshot_files(patterns: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Return a {path: (mtime_ns, size)} snapshot of all files matching the patterns."""
+    snapshot = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # File was removed between glob and stat
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 digest of a file's contents (empty string if unreadable)."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+def watch_and_rebuild(json_path: str, output_dir: str, doc_type: str,
+                      company_filters: Optional[List[str]] = None,
+                      tag_filters: Optional[List[str]] = None,
+                      filter_logic: str = 'and',
+                      render: bool = True,
+                      template: Optional[str] = None,
+                      output_name: Optional[str] = None,
+                      html_too: bool = False,
+                      interval: float = 0.5,
+                      debounce: float = 0.75) -> None:
+    """
+    Watch the database, templates and stylesheets and rebuild only what changed.
+    
+    Data changes regenerate the CSV files (and re-render, since the document is
+    built from them). Template and CSS changes only re-render. Rendering goes
+    through a persistent render.r worker, so R start-up is paid once.
+    
+    Args:
+        json_path: Path to the JSON file
+        output_dir: Directory to write CSV files
+        doc_type: Type of document ('cv' or 'resume')
+        company_filters: Optional filter for company
+        tag_filters: Optional filter for tag
+        filter_logic: Logic to apply for filtering multiple tags/companies
+        render: Whether to re-render the document after changes
+        template: Template to render (defaults to my_<doc_type>.rmd)
+        output_name: Base name for rendered files (defaults to <doc_type>_preview)
+        html_too: Whether to keep the HTML output as well as the PDF
+        interval: Seconds between filesystem polls
+        debounce: Seconds the files must be quiet before a rebuild starts
+    """
+    template = template or f"my_{doc_type}.rmd"
+    output_name = output_name or f"{doc_type}_preview"
+    render_patterns = WATCH_TEMPLATE_PATTERNS + WATCH_STYLE_PATTERNS
+    
+    worker = None
+    if render:
+        # Imported lazily so plain conversions never need the render worker
+        from render_worker import RenderWorker
+        worker = RenderWorker()
+    
+    def rebuild(data_changed: bool, render_changed: bool) -> None:
+        started = time.time()
+        if data_changed:
+            try:
+                convert_json_to_csv(json_path, output_dir, doc_type, company_filters, tag_filters, filter_logic)
+            except SystemExit:
+                # Invalid JSON or schema errors were already reported; keep watching
+                print("Skipping rebuild until the database is fixed. Watching for changes (Ctrl-C to stop)...")
+                return
+        if worker and (data_changed or render_changed):
+            worker.render(template, output_name, data_dir=output_dir, html_too=html_too)
+        print(f"Rebuild finished in {time.time() - started:.2f}s. Watching for changes (Ctrl-C to stop)...")
+    
+    data_digest = file_digest(json_path)
+    data_snapshot = snapshot_files([json_path])
+    render_snapshot = snapshot_files(render_patterns)
+    rebuild(data_changed=True, render_changed=True)
+    
+    try:
+        while True:
+            time.sleep(interval)
+            new_data_snapshot = snapshot_files([json_path])
+            new_render_snapshot = snapshot_files(render_patterns)
+            if new_data_snapshot == data_snapshot and new_render_snapshot == render_snapshot:
+                continue
+            
+            # Debounce: wait until editors have finished writing
+            while True:
+                time.sleep(debounce)
+                settled_data = snapshot_files([json_path])
+                settled_render = snapshot_files(render_patterns)
+                if settled_data == new_data_snapshot and settled_render == new_render_snapshot:
+                    break
+                new_data_snapshot, new_render_snapshot = settled_data, settled_render
+            
+            # Ignore saves that did not actually change the database contents
+            data_changed = False
+            if new_data_snapshot != data_snapshot:
+                new_digest = file_digest(json_path)
+                data_changed = new_digest != data_digest
+                data_digest = new_digest
+            render_changed = new_render_snapshot != render_snapshot
+            data_snapshot, render_snapshot = new_data_snapshot, new_render_snapshot
+            
+            if data_changed or render_changed:
+                changed = []
+                if data_changed:
+                    changed.append(json_path)
+                if render_changed:
+                    changed.extend(sorted(
+                        path for path in set(render_snapshot) | set(new_render_snapshot)
+                        if render_snapshot.get(path) != new_render_snapshot.get(path)
+                    ))
+                print(f"\nChange detected: {', '.join(changed)}")
+                rebuild(data_changed, render_changed)
+    except KeyboardInterrupt:
+        print("\nStopping watch mode.")
+    finally:
+        if worker:
+            worker.close()
+
 def main():
     """Main function to parse arguments and run the conversion."""
     parser = argparse.ArgumentParser(description='Convert JSON CV/Resume data to CSV format.')
     parser.add_argument('--json', required=True, help='Path to the JSON data file')
-    parser.add_argument('--output-dir', required=True, help='Directory to output CSV files')
-    parser.add_argument('--type', choices=['cv', 'resume'], required=True, 
-                       help='Type of document to generate (cv or resume)')
+    parser.add_argument('--output-dir', help='Directory to output CSV files (required unless --variants is used)')
+    parser.add_argument('--type', choices=['cv', 'resume'],
+                       help='Type of document to generate (cv or resume; required unless --variants is used)')
+    parser.add_argument('--variants',
+                       help='Export several variants in one pass: a JSON/YAML file, or "TYPE[:COMPANIES]=OUTPUT_DIR;..."')
     parser.add_argument('--filter-company', help='Filter entries by company. Use comma-separated values for multiple companies')
     parser.add_argument('--filter-tag', help='Filter entries by tag. Use comma-separated values for multiple tags')
     parser.add_argument('--filter-logic', choices=['and', 'or'], default='and',
                        help='Logic to apply for filtering multiple tags/companies: "and" requires all filters to match, "or" requires any filter to match')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and rebuild when the database, templates or CSS change')
+    parser.add_argument('--no-render', action='store_true',
+                       help='In --watch mode, only regenerate CSV files without re-rendering the document')
+    parser.add_argument('--template', help='Template to render in --watch mode (default: my_<type>.rmd)')
+    parser.add_argument('--render-output', help='Base name for documents rendered in --watch mode (default: <type>_preview)')
+    parser.add_argument('--html', action='store_true', help='In --watch mode, keep the HTML output as well as the PDF')
+    parser.add_argument('--watch-interval', type=float, default=0.5,
+                       help='Seconds between filesystem polls in --watch mode (default: 0.5)')
+    parser.add_argument('--debounce', type=float, default=0.75,
+                       help='Seconds files must be unchanged before rebuilding in --watch mode (default: 0.75)')
     
     args = parser.parse_args()
     
+    if args.variants:
+        if args.watch:
+            parser.error('--watch cannot be combined with --variants')
+        convert_json_to_csv_variants(args.json, parse_variants_spec(args.variants))
+        return
+    
+    if not args.output_dir or not args.type:
+        parser.error('--output-dir and --type are required unless --variants is used')
+    
     # Convert comma-separated filters to lists if provided
     company_filters = None
     if args.filter_company:
@@ -427,6 +793,23 @@ def main():
     if args.filter_tag:
         tag_filters = [tag.strip() for tag in args.filter_tag.split(',')]
     
+    if args.watch:
+        watch_and_rebuild(
+            args.json,
+            args.output_dir,
+            args.type,
+            company_filters,
+            tag_filters,
+            args.filter_logic,
+            render=not args.no_render,
+            template=args.template,
+            output_name=args.render_output,
+            html_too=args.html,
+            interval=args.watch_interval,
+            debounce=args.debounce
+        )
+        return
+    
     convert_json_to_csv(
         args.json, 
         args.output_dir, 
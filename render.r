@@ -3,6 +3,8 @@
 # This script builds both the HTML and PDF versions of your CV or resume
 # It supports command-line arguments for customization
 # Usage: Rscript render.r --template my_cv.rmd --output MyCV --html --plaintext --image logo.png --data-dir my_cv_data
+# Worker mode: Rscript render.r --worker (reads one JSON render request per line from stdin)
+# PDFs are printed with the Chrome pool of chrome_pool.py when CV_CHROME_POOL is set
 
 # Load required packages
 suppressPackageStartupMessages({
@@ -22,6 +24,30 @@ info <- function(text) cat(cyan(paste0("ℹ ", text, "\n")))
 warning_msg <- function(text) cat(yellow(paste0("⚠ ", text, "\n")))
 error_msg <- function(text) cat(red(bold(paste0("✗ ", text, "\n"))))
 
+# Print an HTML file with the warm Chrome pool of chrome_pool.py (CV_CHROME_POOL=http://host:port).
+# Sends a plain HTTP/1.0 request over a base R socket; stops with an error if the pool cannot print.
+pool_print <- function(pool_url, html_path, pdf_path, timeout = 120) {
+  parts <- regmatches(pool_url, regexec("^http://([^:/]+):([0-9]+)/?$", pool_url))[[1]]
+  if (length(parts) != 3) stop("CV_CHROME_POOL must look like http://127.0.0.1:8766")
+  # The pool may run in another directory, so paths are sent as absolute paths
+  body <- as.character(jsonlite::toJSON(list(
+    input = normalizePath(html_path),
+    output = file.path(normalizePath(dirname(pdf_path)), basename(pdf_path)),
+    timeout = timeout
+  ), auto_unbox = TRUE))
+  con <- socketConnection(host = parts[2], port = as.integer(parts[3]), open = "r+", blocking = TRUE, timeout = timeout + 10)
+  on.exit(close(con))
+  writeLines(paste0(
+    "POST /print HTTP/1.0\r\nHost: ", parts[2], "\r\nContent-Type: application/json\r\n",
+    "Content-Length: ", nchar(body, type = "bytes"), "\r\n\r\n", body
+  ), con, sep = "")
+  response <- readLines(con, warn = FALSE)
+  if (length(response) == 0 || !grepl("^HTTP/[0-9.]+ 200", response[1])) {
+    stop(paste("pool answered", if (length(response)) paste(response[1], tail(response, 1)) else "nothing"))
+  }
+  invisible(TRUE)
+}
+
 # Create a function with parameters for customization
 render_document <- function(
   # Template file (default: my_cv.rmd)
@@ -339,6 +365,22 @@ render_document <- function(
   if (!skip_pdf) {
     info("Generating PDF using Chrome...")
     
+    # Use the warm Chrome pool if one is running; fall back to pagedown otherwise
+    printed_by_pool <- FALSE
+    pool_url <- Sys.getenv("CV_CHROME_POOL")
+    if (nzchar(pool_url)) {
+      printed_by_pool <- tryCatch({
+        pool_print(pool_url, html_output, pdf_output)
+        success(paste0("PDF ", doc_type, " created with the Chrome pool: ", pdf_output))
+        TRUE
+      }, error = function(e) {
+        warning_msg(paste0("Chrome pool at ", pool_url, " could not print (", conditionMessage(e), "); using pagedown instead"))
+        FALSE
+      })
+    }
+  }
+  
+  if (!skip_pdf && !printed_by_pool) {
     if (!is.null(chrome_path)) {
       # Set Chrome path explicitly
       Sys.setenv(PAGEDOWN_CHROME = chrome_path)
@@ -393,7 +435,7 @@ render_document <- function(
       # Force HTML to be kept even if html_too is FALSE
       html_too <<- TRUE
     })
-  } else {
+  } else if (skip_pdf) {
     info("Skipping PDF generation as requested")
     # Force HTML to be kept since we're skipping PDF
     html_too <- TRUE
@@ -446,23 +488,56 @@ if (!interactive()) {
     make_option(c("-i", "--image"), type="character", default=NULL,
                 help="Path to custom image (PNG or JPEG) to use instead of network logo [default: none]"),
     make_option(c("-d", "--data-dir"), type="character", default=NULL,
-                help="Data directory to use (e.g., my_cv_data or my_resume_data) [default: determined by template]")
+                help="Data directory to use (e.g., my_cv_data or my_resume_data) [default: determined by template]"),
+    make_option(c("--worker"), action="store_true", default=FALSE,
+                help="Stay running and render one JSON request per stdin line (used by render_worker.py) [default: %default]")
   )
   
   # Parse command-line arguments
   opt_parser <- OptionParser(option_list=option_list)
   opts <- parse_args(opt_parser)
   
-  # Run with provided arguments
-  render_document(
-    template = opts$template,
-    output_filename = opts$output,
-    html_too = opts$html,
-    skip_pdf = opts$`skip-pdf`,
-    plain_text_too = opts$plaintext,
-    custom_image_path = opts$image,
-    data_dir = opts$`data-dir`
-  )
+  if (opts$worker) {
+    # Keep R and the rendering packages warm between requests.
+    # Each stdin line is a JSON object; each request ends with a sentinel line.
+    suppressPackageStartupMessages(library(jsonlite))
+    stdin_con <- file("stdin")
+    open(stdin_con)
+    info("Render worker ready")
+    while (length(line <- readLines(stdin_con, n = 1)) > 0) {
+      if (!nzchar(trimws(line))) next
+      status <- tryCatch({
+        request <- jsonlite::fromJSON(line)
+        render_document(
+          template = if (is.null(request$template)) opts$template else request$template,
+          output_filename = request$output,
+          html_too = isTRUE(request$html),
+          skip_pdf = isTRUE(request$skip_pdf),
+          plain_text_too = isTRUE(request$plaintext),
+          custom_image_path = request$image,
+          data_dir = request$data_dir
+        )
+        "ok"
+      }, error = function(e) {
+        error_msg(paste0("Render failed: ", conditionMessage(e)))
+        paste("error", gsub("[\r\n]+", " ", conditionMessage(e)))
+      })
+      cat(paste0("__RENDER_DONE__ ", status, "\n"))
+      flush(stdout())
+    }
+    close(stdin_con)
+  } else {
+    # Run with provided arguments
+    render_document(
+      template = opts$template,
+      output_filename = opts$output,
+      html_too = opts$html,
+      skip_pdf = opts$`skip-pdf`,
+      plain_text_too = opts$plaintext,
+      custom_image_path = opts$image,
+      data_dir = opts$`data-dir`
+    )
+  }
 } else {
   # If being sourced in an interactive session, don't automatically run
   cat("Function 'render_document()' is available for use.\n")
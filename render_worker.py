@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Persistent R Render Worker
+
+This module keeps a single `Rscript render.r --worker` process alive so that
+R start-up and package loading (rmarkdown, pagedown, knitr, dplyr, ...) are
+paid once instead of on every render. Requests are sent to the worker as one
+JSON object per line on stdin; the worker echoes its normal progress output
+and finishes each request with a sentinel line.
+
+Usage:
+    from render_worker import RenderWorker
+
+    worker = RenderWorker()
+    worker.render("my_resume.rmd", "MyResume", data_dir="my_resume_data", html_too=True)
+    worker.close()
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Optional
+
+# Sentinel printed by render.r in worker mode after each request
+RENDER_DONE_MARKER = "__RENDER_DONE__"
+
+class RenderWorker:
+    """A long-lived render.r process that renders documents on request."""
+
+    def __init__(self, render_script: str = "render.r", rscript: str = "Rscript",
+                 echo: bool = True, env: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            render_script: Path to the render.r script
+            rscript: Rscript executable to use
+            echo: Whether to print the worker's progress output
+            env: Extra environment variables for the worker process
+        """
+        self.render_script = render_script
+        self.rscript = rscript
+        self.echo = echo
+        self.env = env
+        self.process = None
+        self.renders = 0
+
+    def start(self) -> None:
+        """Start the R worker process if it is not already running."""
+        if self.is_alive():
+            return
+
+        if not os.path.exists(self.render_script):
+            raise FileNotFoundError(f"Render script '{self.render_script}' not found in the current directory.")
+
+        process_env = os.environ.copy()
+        if self.env:
+            process_env.update(self.env)
+
+        cmd = [self.rscript, self.render_script, "--worker"]
+        print(f"Starting render worker: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=process_env
+        )
+
+    def is_alive(self) -> bool:
+        """Check whether the worker process is running."""
+        return self.process is not None and self.process.poll() is None
+
+    def render(self, template: str, output_name: str, data_dir: Optional[str] = None,
+               html_too: bool = False, skip_pdf: bool = False,
+               plain_text_too: bool = False) -> bool:
+        """
+        Render a document with the warm worker.
+
+        Args:
+            template: Template file to use (e.g., my_resume.rmd)
+            output_name: Base name for output files (without extension)
+            data_dir: Directory containing the CSV data files
+            html_too: Whether to keep the HTML output as well
+            skip_pdf: Whether to skip PDF generation
+            plain_text_too: Whether to write a plain text version as well
+
+        Returns:
+            True if successful, False otherwise
+        """
+        request = {
+            "template": template,
+            "output": output_name,
+            "data_dir": data_dir,
+            "html": html_too,
+            "skip_pdf": skip_pdf,
+            "plaintext": plain_text_too
+        }
+
+        # Restart the worker once if it died since the last request
+        for attempt in range(2):
+            try:
+                self.start()
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+                return self._read_until_done()
+            except (BrokenPipeError, OSError) as e:
+                print(f"Render worker unavailable ({e}), restarting...")
+                self.close()
+        return False
+
+    def _read_until_done(self) -> bool:
+        """Relay worker output until the end-of-request sentinel is seen."""
+        for line in self.process.stdout:
+            if line.startswith(RENDER_DONE_MARKER):
+                status = line[len(RENDER_DONE_MARKER):].strip()
+                self.renders += 1
+                if status.startswith("ok"):
+                    return True
+                print(f"Error running render worker: {status}")
+                return False
+            if self.echo:
+                sys.stdout.write(line)
+
+        # stdout closed without a sentinel: the worker exited
+        raise BrokenPipeError("render worker exited unexpectedly")
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
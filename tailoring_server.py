@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Local HTTP Tailoring Service
+
+This script runs the AI CV generator as a long-lived local service, so other
+tools can request tailored documents without shelling out to
+ai_cv_generator.py for every posting. Start-up costs are paid once:
+
+    - AI clients are created once per service and shared by all jobs
+    - the CV database is loaded once (and reloaded when the file changes)
+    - each worker keeps a warm `render.r --worker` process (render_worker.py)
+    - PDFs are printed by a shared pool of warm headless Chrome instances
+      (chrome_pool.py) instead of a new Chrome per PDF
+    - JSON to CSV conversion runs in-process
+
+Jobs are processed by a bounded pool of worker threads. Every job is persisted
+under jobs/<job-id>/ (job.json and posting.txt), so queued and interrupted
+jobs are picked up again when the service restarts. Submitting a posting that
+is identical to a queued or running job (same text and options) returns the
+existing job instead of starting a second run.
+
+API:
+    POST /jobs                          {"posting": "...", "options": {"type": "resume", ...}}
+    GET  /jobs                          list jobs
+    GET  /jobs/<job-id>                 job status
+    GET  /jobs/<job-id>/artifacts/json  tailored JSON
+    GET  /jobs/<job-id>/artifacts/csv   zip of the CSV files
+    GET  /jobs/<job-id>/artifacts/pdf   rendered PDF (also: html, txt, md)
+    GET  /health
+
+Options are the ai_cv_generator.py flags without dashes, e.g. "type",
+"ai_service", "temperature", "improve_descriptions", "use_prompt_only",
+"local_scoring", "entries_per_section", "html_too", "no_reuse".
+
+Usage:
+    python tailoring_server.py --port 8765 --workers 2
+    python tailoring_server.py --chrome-pool 4 --chrome-max-prints 100
+    curl -X POST localhost:8765/jobs -d '{"posting": "...", "options": {"type": "resume"}}'
+"""
+
+import argparse
+import copy
+import hashlib
+import io
+import json
+import os
+import threading
+import traceback
+import uuid
+import zipfile
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import ai_cv_generator
+import json_to_csv_converter
+from chrome_pool import DEFAULT_MAX_PRINTS, ChromeError, ChromePool, serve_pool
+from render_worker import RenderWorker
+
+DEFAULT_JOBS_DIR = "jobs"
+
+# Job options accepted over HTTP and the ai_cv_generator.py flag each one maps to
+VALUE_OPTIONS = {
+    "type": "--type",
+    "format": "--format",
+    "ai_service": "--ai-service",
+    "openai_model": "--openai-model",
+    "claude_model": "--claude-model",
+    "temperature": "--temperature",
+    "entries_per_section": "--entries-per-section",
+    "dedupe_threshold": "--dedupe-threshold",
+    "reuse_threshold": "--reuse-threshold",
+    "cheap_openai_model": "--cheap-openai-model",
+    "cheap_claude_model": "--cheap-claude-model",
+    "escalation_margin": "--escalation-margin",
+    "matrix_weights": "--matrix-weights",
+    "matrix_chunk_cells": "--matrix-chunk-cells",
+    "max_workers": "--max-workers",
+}
+FLAG_OPTIONS = {
+    "improve_descriptions": "--improve-descriptions",
+    "use_prompt_only": "--use-prompt-only",
+    "map_reduce": "--map-reduce",
+    "html_too": "--html-too",
+    "local_scoring": "--local-scoring",
+    "cascade": "--cascade",
+    "matrix_scoring": "--matrix-scoring",
+    "keep_boilerplate": "--keep-boilerplate",
+    "no_dedupe": "--no-dedupe",
+    "no_reuse": "--no-reuse",
+    "verbose": "--verbose",
+}
+
+class JobError(Exception):
+    """A submission that cannot be accepted (reported to the client as 400)."""
+
+class OptionsParser(argparse.ArgumentParser):
+    """The generator's argument parser, reporting invalid options as JobError instead of exiting."""
+
+    def error(self, message: str):
+        raise JobError(message)
+
+def options_to_argv(options: Dict[str, Any]) -> List[str]:
+    """Translate job options into ai_cv_generator.py arguments."""
+    argv = []
+    for name, value in options.items():
+        if name in VALUE_OPTIONS:
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            argv.extend([VALUE_OPTIONS[name], str(value)])
+        elif name in FLAG_OPTIONS:
+            if value:
+                argv.append(FLAG_OPTIONS[name])
+        else:
+            raise JobError(f"Unknown option '{name}'")
+    return argv
+
+def coalescing_key(posting: str, options: Dict[str, Any]) -> str:
+    """Identical posting text and options produce the same key."""
+    payload = json.dumps({"posting": posting.strip(), "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def convert_in_process(json_path: str, output_dir: str, doc_type: str) -> bool:
+    """In-process replacement for run_converter_script."""
+    try:
+        json_to_csv_converter.convert_json_to_csv(json_path, output_dir, doc_type)
+        return True
+    except SystemExit:
+        print(f"Error converting {json_path} to CSV")
+        return False
+    except Exception as e:
+        print(f"Error converting {json_path} to CSV: {e}")
+        return False
+
+class TailoringService:
+    """Persistent job queue, bounded worker pool and warm shared resources."""
+
+    def __init__(self, jobs_dir: str = DEFAULT_JOBS_DIR, workers: int = 2, max_queue: int = 50,
+                 cv_data_path: str = "cv_database.json", ai_service: str = "openai", use_render_worker: bool = True,
+                 chrome_pool_size: int = 2, chrome_max_prints: int = DEFAULT_MAX_PRINTS):
+        self.jobs_dir = jobs_dir
+        self.num_workers = workers
+        self.max_queue = max_queue
+        self.cv_data_path = cv_data_path
+        self.default_service = ai_service
+        self.use_render_worker = use_render_worker
+        self.chrome_pool_size = chrome_pool_size if use_render_worker else 0
+        self.chrome_max_prints = chrome_max_prints
+        self.chrome_pool = None
+        self.chrome_pool_server = None
+        self.chrome_pool_url = None
+
+        self.jobs = {}
+        self.in_flight = {}
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.threads = []
+
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+        self.database = None
+        self.database_mtime = None
+        self.database_lock = threading.Lock()
+
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _save_job(self, job: Dict) -> None:
+        path = os.path.join(self._job_dir(job["id"]), "job.json")
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2)
+        os.replace(temp_path, path)
+
+    def restore_jobs(self) -> int:
+        """Load persisted jobs and queue the ones that never finished."""
+        restored = []
+        for job_id in sorted(os.listdir(self.jobs_dir)):
+            path = os.path.join(self._job_dir(job_id), "job.json")
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self.jobs[job["id"]] = job
+            if job["status"] in ("queued", "running"):
+                job["status"] = "queued"
+                restored.append(job)
+        restored.sort(key=lambda job: job["created"])
+        for job in restored:
+            self._save_job(job)
+            self.in_flight[job["key"]] = job["id"]
+            self.pending.append(job["id"])
+        return len(restored)
+
+    # ------------------------------------------------------------------
+    # Submission and status
+    # ------------------------------------------------------------------
+
+    def submit(self, posting: str, options: Dict[str, Any]) -> Tuple[Dict, bool]:
+        """
+        Queue a tailoring job, or return the identical job already in flight.
+
+        Returns:
+            Tuple of (job, coalesced)
+        """
+        if not isinstance(posting, str) or not posting.strip():
+            raise JobError("'posting' must be a non-empty string")
+        if not isinstance(options, dict):
+            raise JobError("'options' must be an object")
+        if not isinstance(options.get("entries_per_section", {}), dict):
+            raise JobError("'entries_per_section' must map sections to entry counts")
+        argv = options_to_argv(options)
+        # Validate the options with the generator's own parser
+        ai_cv_generator.build_arg_parser(OptionsParser).parse_args(["--job-posting", "-"] + argv)
+
+        key = coalescing_key(posting, options)
+        with self.condition:
+            existing = self.in_flight.get(key)
+            if existing:
+                job = self.jobs[existing]
+                job["coalesced"] = job.get("coalesced", 0) + 1
+                self._save_job(job)
+                return job, True
+            if len(self.pending) >= self.max_queue:
+                raise OverflowError(f"Queue is full ({self.max_queue} jobs waiting)")
+
+            job_id = datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+            os.makedirs(self._job_dir(job_id), exist_ok=True)
+            with open(os.path.join(self._job_dir(job_id), "posting.txt"), 'w', encoding='utf-8') as f:
+                f.write(posting)
+            job = {
+                "id": job_id,
+                "key": key,
+                "status": "queued",
+                "options": options,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "started": None,
+                "finished": None,
+                "artifacts": {},
+                "error": None,
+                "coalesced": 0,
+            }
+            self.jobs[job_id] = job
+            self.in_flight[key] = job_id
+            self._save_job(job)
+            self.pending.append(job_id)
+            self.condition.notify()
+            return job, False
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return self.jobs.get(job_id)
+
+    def public_job(self, job: Dict) -> Dict:
+        """Job status as returned by the API."""
+        with self.condition:
+            status = {key: value for key, value in job.items() if key != "key"}
+            if job["status"] == "queued" and job["id"] in self.pending:
+                status["queue_position"] = list(self.pending).index(job["id"]) + 1
+        return status
+
+    def list_jobs(self) -> List[Dict]:
+        """Status of every job, newest first, taken as one consistent snapshot."""
+        with self.condition:
+            statuses = [self.public_job(job) for job in self.jobs.values()]
+        return sorted(statuses, key=lambda status: status["created"], reverse=True)
+
+    # ------------------------------------------------------------------
+    # Warm resources
+    # ------------------------------------------------------------------
+
+    def client_for(self, service: str) -> Tuple[Any, str]:
+        """Return the shared AI client for a service, creating it once."""
+        with self.clients_lock:
+            if service not in self.clients:
+                env_key = "OPENAI_API_KEY" if service == "openai" else "ANTHROPIC_API_KEY"
+                if service != self.default_service and not os.environ.get(env_key):
+                    raise RuntimeError(f"{env_key} is not set")
+                self.clients[service] = ai_cv_generator.setup_ai_client(service)
+            return self.clients[service]
+
+    def cv_data(self) -> Dict:
+        """Return a private copy of the database, reloading it only when the file changed."""
+        with self.database_lock:
+            mtime = os.path.getmtime(self.cv_data_path)
+            if self.database is None or mtime != self.database_mtime:
+                self.database = ai_cv_generator.load_json_data(self.cv_data_path)
+                self.database_mtime = mtime
+            return copy.deepcopy(self.database)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Warm the default client, start the Chrome pool and start the worker threads."""
+        self.client_for(self.default_service)
+        self.cv_data()
+        if self.chrome_pool_size > 0:
+            try:
+                self.chrome_pool = ChromePool(self.chrome_pool_size, self.chrome_max_prints)
+                self.chrome_pool_server, self.chrome_pool_url = serve_pool(self.chrome_pool)
+                print(f"Chrome pool with {self.chrome_pool_size} instances at {self.chrome_pool_url}")
+            except ChromeError as e:
+                print(f"Chrome pool disabled: {e}; render workers print with pagedown")
+        for index in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"tailoring-worker-{index + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if self.chrome_pool_server:
+            self.chrome_pool_server.shutdown()
+            self.chrome_pool_server.server_close()
+        if self.chrome_pool:
+            self.chrome_pool.close()
+
+    def _worker_loop(self) -> None:
+        pool_env = {"CV_CHROME_POOL": self.chrome_pool_url} if self.chrome_pool_url else None
+        render_worker = RenderWorker(env=pool_env) if self.use_render_worker else None
+
+        def render(template, output_name, html_too=False, data_dir=None):
+            return render_worker.render(template, output_name, data_dir=data_dir, html_too=html_too)
+
+        try:
+            while True:
+                with self.condition:
+                    while not self.pending and not self.stopping:
+                        self.condition.wait()
+                    if self.stopping:
+                        return
+                    job = self.jobs[self.pending.popleft()]
+                    job["status"] = "running"
+                    job["started"] = datetime.now().isoformat(timespec="seconds")
+                    self._save_job(job)
+                self._run_job(job, render if render_worker else None)
+        finally:
+            if render_worker:
+                render_worker.close()
+
+    def _run_job(self, job: Dict, renderer) -> None:
+        print(f"[{threading.current_thread().name}] Running job {job['id']}")
+        try:
+            posting_path = os.path.join(self._job_dir(job["id"]), "posting.txt")
+            argv = ["--job-posting", posting_path, "--cv-data", self.cv_data_path,
+                    "--output-name", job["id"]] + options_to_argv(job["options"])
+            args = ai_cv_generator.build_arg_parser().parse_args(argv)
+            ai_client, service = self.client_for(args.ai_service)
+            artifacts = ai_cv_generator.run_tailoring_pipeline(
+                args,
+                ai_client=ai_client,
+                service=service,
+                cv_data=self.cv_data(),
+                converter=convert_in_process,
+                renderer=renderer
+            )
+            outcome = {"artifacts": artifacts, "status": "done"}
+        except SystemExit:
+            outcome = {"status": "failed", "error": "The tailoring run stopped with an error; see the service output"}
+        except Exception as e:
+            traceback.print_exc()
+            outcome = {"status": "failed", "error": str(e)}
+        outcome["finished"] = datetime.now().isoformat(timespec="seconds")
+        # Applied under the lock so job listings never see a half-finished job
+        with self.condition:
+            job.update(outcome)
+            self.in_flight.pop(job["key"], None)
+            self._save_job(job)
+        print(f"[{threading.current_thread().name}] Job {job['id']} {job['status']}")
+
+def make_handler(service: TailoringService):
+    """Create the request handler class bound to a service."""
+
+    class TailoringRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_bytes(self, content: bytes, content_type: str, filename: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                job, coalesced = service.submit(request.get("posting"), request.get("options", {}))
+            except (ValueError, AttributeError):
+                self._send_json(400, {"error": "Request body must be a JSON object"})
+                return
+            except JobError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            except OverflowError as e:
+                self._send_json(429, {"error": str(e)})
+                return
+            payload = service.public_job(job)
+            payload["coalesced_request"] = coalesced
+            self._send_json(200 if coalesced else 202, payload)
+
+        def do_GET(self):
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+            if parts == ["health"]:
+                payload = {"status": "ok", "workers": service.num_workers, "queued": len(service.pending)}
+                if service.chrome_pool:
+                    payload["chrome_pool"] = service.chrome_pool.stats()
+                self._send_json(200, payload)
+            elif parts == ["jobs"]:
+                self._send_json(200, service.list_jobs())
+            elif len(parts) == 2 and parts[0] == "jobs":
+                job = service.get_job(parts[1])
+                if job:
+                    self._send_json(200, service.public_job(job))
+                else:
+                    self._send_json(404, {"error": f"Unknown job {parts[1]}"})
+            elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "artifacts":
+                self._send_artifact(parts[1], parts[3])
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def _send_artifact(self, job_id: str, kind: str) -> None:
+            job = service.get_job(job_id)
+            if not job:
+                self._send_json(404, {"error": f"Unknown job {job_id}"})
+                return
+            if job["status"] != "done":
+                self._send_json(409, {"error": f"Job is {job['status']}"})
+                return
+            artifacts = job["artifacts"]
+            if kind == "csv":
+                csv_dir = artifacts.get("csv_dir", "")
+                if not os.path.isdir(csv_dir):
+                    self._send_json(404, {"error": "CSV files not found"})
+                    return
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                    for name in sorted(os.listdir(csv_dir)):
+                        archive.write(os.path.join(csv_dir, name), name)
+                self._send_bytes(buffer.getvalue(), "application/zip", f"{job_id}_csv.zip")
+                return
+            content_types = {"json": "application/json", "pdf": "application/pdf", "html": "text/html",
+                             "txt": "text/plain; charset=utf-8", "md": "text/markdown; charset=utf-8"}
+            path = artifacts.get(kind)
+            if kind not in content_types or not path or not os.path.exists(path):
+                self._send_json(404, {"error": f"No {kind} artifact for job {job_id}"})
+                return
+            with open(path, 'rb') as f:
+                self._send_bytes(f.read(), content_types[kind], os.path.basename(path))
+
+        def log_message(self, format, *args):
+            print(f"[http] {self.address_string()} {format % args}")
+
+    return TailoringRequestHandler
+
+def main():
+    """Main function to run the tailoring service."""
+    parser = argparse.ArgumentParser(description='Run the AI CV generator as a local HTTP service.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--workers', type=int, default=2, help='Number of jobs processed concurrently (default: 2)')
+    parser.add_argument('--max-queue', type=int, default=50, help='Maximum number of waiting jobs (default: 50)')
+    parser.add_argument('--jobs-dir', default=DEFAULT_JOBS_DIR, help=f'Directory for the persistent job queue (default: {DEFAULT_JOBS_DIR})')
+    parser.add_argument('--cv-data', default='cv_database.json', help='Path to the CV/resume JSON data file')
+    parser.add_argument('--ai-service', choices=['openai', 'claude'], default='openai', help='AI service to warm up at start-up')
+    parser.add_argument('--no-render-worker', action='store_true', help='Render with a new Rscript process per job instead of a warm worker')
+    parser.add_argument('--chrome-pool', type=int, default=2, help='Warm Chrome instances shared by the render workers for PDF printing (default: 2, 0 to print with pagedown)')
+    parser.add_argument('--chrome-max-prints', type=int, default=DEFAULT_MAX_PRINTS, help=f'Prints after which a Chrome instance is replaced (default: {DEFAULT_MAX_PRINTS})')
+
+    args = parser.parse_args()
+
+    service = TailoringService(args.jobs_dir, args.workers, args.max_queue, args.cv_data,
+                               args.ai_service, use_render_worker=not args.no_render_worker,
+                               chrome_pool_size=args.chrome_pool, chrome_max_prints=args.chrome_max_prints)
+    restored = service.restore_jobs()
+    if restored:
+        print(f"Restored {restored} unfinished jobs from {args.jobs_dir}")
+    service.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"Tailoring service listening on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        service.stop()
+
+if __name__ == "__main__":
+    main()